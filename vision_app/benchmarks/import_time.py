@@ -0,0 +1,68 @@
+"""
+Mede o custo de importação da vision_library para cada caminho de uso.
+
+Cada cenário roda em um interpretador novo (sem cache de módulos), várias vezes; o resultado é
+a mediana do tempo de importação, o pico de memória residente (RSS) e se o dlib foi carregado.
+
+Uso (a partir do diretório vision_app/):
+    python benchmarks/import_time.py [repetições]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "pacote": "import vision_library",
+    "contagem": "from vision_library import PeopleCounter; PeopleCounter()",
+    "rostos": "from vision_library import face_detection, face_recognition",
+    "tudo": "import vision_library as v; [getattr(v, n) for n in v.__all__]",
+}
+
+PROBE = """
+import json, resource, sys, time
+inicio = time.perf_counter()
+{code}
+duracao = time.perf_counter() - inicio
+print(json.dumps({{
+    "seconds": duracao,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "dlib": "dlib" in sys.modules,
+    "modules": len(sys.modules),
+}}))
+"""
+
+def measure(code: str, repeat: int) -> Dict[str, float]:
+    """
+    Executa um trecho de importação em interpretadores novos e resume as medições.
+
+    Args:
+        code (str): O código a medir.
+        repeat (int): O número de execuções.
+
+    Returns:
+        Dict[str, float]: A mediana de "seconds" e "rss_mb", além de "dlib" e "modules" da última execução.
+    """
+    runs: List[Dict[str, float]] = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(code=code)], cwd=APP_DIR,
+                             capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        "seconds": statistics.median(r["seconds"] for r in runs),
+        "rss_mb": statistics.median(r["rss_mb"] for r in runs),
+        "dlib": runs[-1]["dlib"],
+        "modules": runs[-1]["modules"],
+    }
+
+if __name__ == '__main__':
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{'cenário':10s} {'tempo':>9s} {'RSS':>9s} {'módulos':>8s}  dlib")
+    for nome, codigo in SCENARIOS.items():
+        r = measure(codigo, repeticoes)
+        print(f"{nome:10s} {r['seconds'] * 1000:7.1f}ms {r['rss_mb']:7.1f}MB {r['modules']:8d}  {'sim' if r['dlib'] else 'não'}")
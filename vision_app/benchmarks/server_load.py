@@ -0,0 +1,103 @@
+"""
+Teste de carga do servidor local de inferência: vazão e latência (p50/p99) sob concorrência.
+
+O servidor é iniciado em um processo separado, em um socket Unix temporário, e aquecido antes da
+medição. Para cada nível de concorrência, N threads clientes enviam requisições à rota escolhida
+durante alguns segundos; o tamanho médio dos lotes de encoding vem de /health.
+
+Uso (a partir do diretório vision_app/):
+    python benchmarks/server_load.py [segundos] [rota: detect | encode | verify]
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from vision_library import config, utils
+from vision_library.inference_client import InferenceClient
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONCURRENCY = (1, 4, 16, 32)
+
+def start_server(path: str) -> subprocess.Popen:
+    """Inicia o servidor em outro processo e espera até que ele responda."""
+    server = subprocess.Popen([sys.executable, "-m", "vision_library.inference_server", path], cwd=APP_DIR)
+    client = InferenceClient(unix_socket=path)
+    deadline = time.monotonic() + 300.0
+    while True:
+        try:
+            client.health()
+            client.close()
+            return server
+        except OSError:
+            if server.poll() is not None or time.monotonic() > deadline:
+                server.kill()
+                raise RuntimeError("O servidor de inferência não iniciou.")
+            time.sleep(0.1)
+
+def load_test(client: InferenceClient, call: Callable[[], Any], threads: int, seconds: float) -> Dict[str, float]:
+    """Executa `call` em `threads` threads durante `seconds` segundos e mede cada requisição."""
+    latencies: List[List[float]] = [[] for _ in range(threads)]
+    stop = time.perf_counter() + seconds
+
+    def worker(i: int) -> None:
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            call()
+            latencies[i].append(time.perf_counter() - start)
+        client.close()
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    duration = time.perf_counter() - start
+    ms = np.concatenate([np.array(v) for v in latencies]) * 1000.0
+    return {"requests": ms.size, "throughput": ms.size / duration,
+            "p50": float(np.percentile(ms, 50)), "p99": float(np.percentile(ms, 99))}
+
+if __name__ == '__main__':
+    segundos = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    rota = sys.argv[2] if len(sys.argv) > 2 else "encode"
+
+    caminho = os.path.join(APP_DIR, config.FACE_COMPARISON["test_image"])
+    imagem, _ = utils.load_image_scaled(caminho, scale=1.0)
+    if imagem is None:
+        imagem = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+
+    socket_path = os.path.join(tempfile.mkdtemp(), "inference.sock")
+    servidor = start_server(socket_path)
+    try:
+        cliente = InferenceClient(unix_socket=socket_path)
+        rostos = cliente.locate_faces(imagem)
+        if not rostos:
+            h, w = imagem.shape[:2]
+            rostos = [(h // 2 - 100, w // 2 + 100, h // 2 + 100, w // 2 - 100)]
+        referencia = np.zeros(128)
+        chamadas: Dict[str, Callable[[], Any]] = {
+            "detect": lambda: cliente.locate_faces(imagem),
+            "encode": lambda: cliente.get_face_encodings(imagem, rostos[:1]),
+            "verify": lambda: cliente.compare_faces(referencia, imagem, rostos[:1]),
+        }
+        print(f"rota /{rota} | imagem {imagem.shape[1]}x{imagem.shape[0]} | {segundos:.0f} s por nível")
+        lotes = cliente.health()["batching"]
+        for n in CONCURRENCY:
+            resultado = load_test(cliente, chamadas[rota], n, segundos)
+            antes, lotes = lotes, cliente.health()["batching"]
+            itens, quantos = lotes["items"] - antes.get("items", 0), lotes["batches"] - antes.get("batches", 0)
+            lote_medio = itens / quantos if quantos else 0.0
+            print(f"{n:3d} clientes: {resultado['throughput']:7.1f} req/s | p50 {resultado['p50']:7.1f} ms | "
+                  f"p99 {resultado['p99']:7.1f} ms | lote médio {lote_medio:4.1f}")
+    finally:
+        servidor.send_signal(signal.SIGINT)  # Encerramento limpo (remove o socket)
+        servidor.wait()
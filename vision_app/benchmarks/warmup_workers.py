@@ -0,0 +1,82 @@
+"""
+Mede a latência da primeira requisição e a memória por worker, com e sem `models.warmup()` antes do fork.
+
+Para cada modo são criados N workers com `fork`. No modo "lazy" cada worker carrega os modelos na
+primeira requisição; no modo "warm" o processo pai chama `warmup()` antes de criar os workers. Todos
+os workers ficam vivos ao mesmo tempo enquanto medem a memória em /proc/self/smaps_rollup (Linux):
+"private" é a memória exclusiva do worker e "pss" divide as páginas compartilhadas entre os processos.
+
+Uso (a partir do diretório vision_app/):
+    python benchmarks/warmup_workers.py [workers]
+"""
+
+import multiprocessing as mp
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+def memory_kb() -> Dict[str, int]:
+    """Lê Pss e memória privada (Private_Clean + Private_Dirty) do processo atual, em kB."""
+    values: Dict[str, int] = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                values[parts[0][:-1]] = int(parts[1])
+    return {"pss": values.get("Pss", 0), "private": values.get("Private_Clean", 0) + values.get("Private_Dirty", 0)}
+
+def request(image: np.ndarray) -> float:
+    """Uma requisição típica: detecção seguida do encoding de um rosto; retorna a duração em segundos."""
+    start = time.perf_counter()
+    # No modo "lazy" a primeira requisição inclui a carga dos modelos
+    from vision_library import face_detection, face_recognition
+    h, w = image.shape[:2]
+    face_detection.locate_faces(image)
+    face_recognition.get_face_encodings(image, [(h // 4, w // 2 + h // 4, 3 * h // 4, w // 2 - h // 4)])
+    return time.perf_counter() - start
+
+def worker(image: np.ndarray, barrier: Any, results: Any) -> None:
+    first = request(image)
+    second = request(image)
+    barrier.wait()          # Todos os workers vivos e com os modelos carregados
+    memory = memory_kb()
+    barrier.wait()          # Ninguém sai antes de todos medirem
+    results.put({"first": first, "second": second, **memory})
+
+def run(mode: str, workers: int, image: np.ndarray) -> List[Dict[str, Any]]:
+    """Executa os workers em um processo intermediário, para que o modo "warm" não contamine o "lazy"."""
+    ctx = mp.get_context("fork")
+    results = ctx.Queue()
+
+    def parent() -> None:
+        if mode == "warm":
+            from vision_library import models
+            models.warmup()
+        barrier = ctx.Barrier(workers)
+        procs = [ctx.Process(target=worker, args=(image, barrier, results)) for _ in range(workers)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+
+    p = ctx.Process(target=parent)
+    p.start()
+    collected = [results.get() for _ in range(workers)]
+    p.join()
+    return collected
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    imagem = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    for modo in ("lazy", "warm"):
+        r = run(modo, n, imagem)
+        print(f"{modo:5s} | primeira requisição: {statistics.median(x['first'] for x in r) * 1000:7.1f} ms "
+              f"| seguintes: {statistics.median(x['second'] for x in r) * 1000:6.1f} ms "
+              f"| privada/worker: {statistics.median(x['private'] for x in r) / 1024:6.1f} MB "
+              f"| PSS/worker: {statistics.median(x['pss'] for x in r) / 1024:6.1f} MB")
@@ -5,24 +5,118 @@ Este pacote contém a lógica principal para a aplicação de visão computacion
 Ele expõe as seguintes classes e funções para serem usadas por interfaces externas:
 
 - PeopleCounter: Uma classe para contar pessoas em um fluxo de vídeo.
+- create_counter: Cria o motor de contagem definido na configuração.
 - face_detection: Um módulo para encontrar rostos em imagens.
 - face_recognition: Um módulo para comparar e reconhecer rostos.
+- face_clustering: Um módulo para agrupar por pessoa rostos de coleções sem rótulos.
+- online_clustering: Um módulo para agrupar em tempo real rostos desconhecidos.
+- face_gallery: Uma galeria de identidades com busca compacta em dois estágios.
+- concurrent_gallery: Uma galeria com cadastro e busca simultâneos sobre snapshots imutáveis.
+- gallery_store: Persistência da galeria com log de escrita antecipada e checkpoints.
+- pipeline: Um pipeline em estágios com filas limitadas e contrapressão.
+- realtime: Um modo tempo real que analisa sempre o quadro mais recente.
+- micro_batching: Micro-lotes entre fluxos para o cálculo de encodings.
+- multi_stream: Um executor de contagem para várias câmeras com pool compartilhado.
+- offline_counting: Contagem paralela de vídeos longos, dividida em trechos.
+- background_counting: Contagem por subtração de fundo com sentido de passagem.
+- line_counting: Contagem barata por perfil de pixels ao longo de linhas.
+- calibration: Calibração vetorizada do limiar e da histerese da contagem.
+- roi_recording: Gravação compacta dos recortes da ROI para reanálise offline.
+- timed_counting: Contagem com histerese temporal, independente da taxa de quadros.
+- heatmap: Mapa de calor de ocupação acumulado ao longo de um fluxo.
+- crowd_density: Densidade de ocupação por célula de uma grade, com médias móveis e alertas.
+- image_cache: Cache LRU de imagens decodificadas com orçamento de bytes.
+- frame_pool: Pool de quadros em memória compartilhada para pipelines multiprocesso.
+- models: Aquecimento explícito dos modelos e compartilhamento antes do fork.
+- inference_server: Servidor local de inferência com modelos aquecidos e micro-lotes.
+- inference_client: Cliente do servidor de inferência com as assinaturas das funções locais.
+- scheduling: Agendador de tarefas com classes de prioridade, prazos e justiça entre tenants.
 - utils: Funções de utilidade, como carregar mídias.
 - config: Módulo de configuração para acesso a parâmetros.
 """
 
-# Importa as principais classes e módulos para o nível do pacote
-from .people_counting import PeopleCounter
-from . import face_detection
-from . import face_recognition
-from . import utils
+import importlib
+from typing import Any, List
 from . import config
 
+# Classes e submódulos são importados sob demanda (PEP 562, `__getattr__` de módulo): um worker que só
+# conta pessoas não carrega o face_recognition/dlib nem os seus modelos
+_ATTRIBUTES = {
+    "PeopleCounter": "people_counting",
+    "create_counter": "people_counting",
+}
+_SUBMODULES = (
+    "face_detection",
+    "face_recognition",
+    "face_clustering",
+    "online_clustering",
+    "face_gallery",
+    "concurrent_gallery",
+    "gallery_store",
+    "pipeline",
+    "realtime",
+    "micro_batching",
+    "multi_stream",
+    "offline_counting",
+    "background_counting",
+    "line_counting",
+    "calibration",
+    "roi_recording",
+    "timed_counting",
+    "heatmap",
+    "crowd_density",
+    "image_cache",
+    "frame_pool",
+    "models",
+    "inference_server",
+    "inference_client",
+    "scheduling",
+    "utils",
+)
+
+def __getattr__(name: str) -> Any:
+    """Importa uma classe ou submódulo do pacote no primeiro acesso."""
+    if name in _ATTRIBUTES:
+        value = getattr(importlib.import_module(f".{_ATTRIBUTES[name]}", __name__), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+def __dir__() -> List[str]:
+    return sorted(__all__)
+
 # Define o que é exportado quando se usa 'from meu_projeto.src import *'
 __all__ = [
     "PeopleCounter",
+    "create_counter",
     "face_detection",
     "face_recognition",
+    "face_clustering",
+    "online_clustering",
+    "face_gallery",
+    "concurrent_gallery",
+    "gallery_store",
+    "pipeline",
+    "realtime",
+    "micro_batching",
+    "multi_stream",
+    "offline_counting",
+    "background_counting",
+    "line_counting",
+    "calibration",
+    "roi_recording",
+    "timed_counting",
+    "heatmap",
+    "crowd_density",
+    "image_cache",
+    "frame_pool",
+    "models",
+    "inference_server",
+    "inference_client",
+    "scheduling",
     "utils",
     "config"
 ]
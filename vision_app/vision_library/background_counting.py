@@ -0,0 +1,203 @@
+
+import cv2
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+from . import config, utils
+
+class _Track:
+    """Um objeto acompanhado entre quadros pelo seu centróide."""
+
+    def __init__(self, track_id: int, centroid: Tuple[float, float], zone: int) -> None:
+        self.track_id = track_id
+        self.centroid = centroid
+        self.missed = 0
+        # Última zona extrema (antes da linha de entrada ou depois da linha de saída) visitada
+        self.anchor: Optional[int] = zone if zone != 1 else None
+
+class BackgroundSubtractionCounter:
+    """
+    Conta pessoas por subtração de fundo (MOG2 ou KNN) e indica o sentido de cada passagem.
+
+    A subtração de fundo é calculada apenas dentro da ROI ampliada por uma margem. Os objetos em
+    primeiro plano são separados por componentes conectados e acompanhados pelo centróide. Duas
+    linhas paralelas (entrada e saída) dividem a ROI em três zonas: um objeto que vai da zona antes
+    da entrada até a zona depois da saída conta como "entrada", e o caminho inverso como "saída".
+    A faixa entre as linhas funciona como histerese contra objetos que oscilam sobre uma linha.
+    """
+
+    def __init__(self, roi_coords: Optional[Tuple[int, int, int, int]] = None,
+                 lines: Optional[Tuple[int, int]] = None, method: Optional[str] = None) -> None:
+        """
+        Inicializa o contador com as configurações do projeto.
+
+        Args:
+            roi_coords (Optional[Tuple[int, int, int, int]]): A ROI (x, y, w, h). Padrão de `config.PEOPLE_COUNTING`.
+            lines (Optional[Tuple[int, int]]): As posições das linhas de entrada e de saída ao longo do eixo
+                configurado, em coordenadas do quadro. Padrão: a 1/3 e 2/3 da ROI.
+            method (Optional[str]): "MOG2" ou "KNN". Padrão de `config.BACKGROUND_COUNTING`.
+        """
+        cfg = config.BACKGROUND_COUNTING
+        self.roi_coords: Tuple[int, int, int, int] = roi_coords or config.PEOPLE_COUNTING["roi_coords"]
+        self.axis: int = 1 if cfg["axis"] == "y" else 0
+        x, y, w, h = self.roi_coords
+        start, length = (y, h) if self.axis == 1 else (x, w)
+        self.lines: Tuple[int, int] = lines or cfg["lines"] or (start + length // 3, start + 2 * length // 3)
+        self.pad: int = cfg["pad"]
+        self.min_area: int = cfg["min_area"]
+        self.max_distance: float = cfg["max_distance"]
+        self.max_missed: int = cfg["max_missed"]
+        self.font: int = cv2.FONT_HERSHEY_SIMPLEX
+
+        method = method or cfg["method"]
+        if method == "MOG2":
+            self.subtractor = cv2.createBackgroundSubtractorMOG2(history=cfg["history"], detectShadows=True)
+        elif method == "KNN":
+            self.subtractor = cv2.createBackgroundSubtractorKNN(history=cfg["history"], detectShadows=True)
+        else:
+            raise ValueError(f"Método de subtração de fundo inválido: {method}")
+        self._kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+
+        self.in_count: int = 0
+        self.out_count: int = 0
+        self.tracks: List[_Track] = []
+        self._next_id: int = 0
+
+    @property
+    def contador(self) -> int:
+        """O número total de passagens (entradas + saídas)."""
+        return self.in_count + self.out_count
+
+    @property
+    def occupancy(self) -> int:
+        """A ocupação líquida (entradas - saídas)."""
+        return self.in_count - self.out_count
+
+    def _zone(self, centroid: Tuple[float, float]) -> int:
+        """Retorna 0 antes da linha de entrada, 1 entre as linhas e 2 depois da linha de saída."""
+        pos = centroid[self.axis]
+        entry, exit_ = self.lines
+        if entry <= exit_:
+            return 0 if pos < entry else (2 if pos > exit_ else 1)
+        return 0 if pos > entry else (2 if pos < exit_ else 1)
+
+    def _detect(self, frame: np.ndarray) -> List[Tuple[float, float]]:
+        """Retorna os centróides (em coordenadas do quadro) dos objetos em primeiro plano dentro da ROI."""
+        x0, y0, x1, y1 = utils.padded_roi(self.roi_coords, self.pad, frame.shape)
+        mask = self.subtractor.apply(frame[y0:y1, x0:x1])
+        # Descarta sombras (marcadas com 127 pelo subtrator) e ruído fino
+        _, mask = cv2.threshold(mask, 200, 255, cv2.THRESH_BINARY)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self._kernel)
+        n, _, stats, centroids = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        x, y, w, h = self.roi_coords
+        found = []
+        for i in range(1, n):
+            if stats[i, cv2.CC_STAT_AREA] < self.min_area:
+                continue
+            cx, cy = centroids[i][0] + x0, centroids[i][1] + y0
+            if x <= cx < x + w and y <= cy < y + h:
+                found.append((float(cx), float(cy)))
+        return found
+
+    def _track(self, detections: List[Tuple[float, float]]) -> None:
+        """Associa detecções a trilhas (vizinho mais próximo, guloso) e conta as passagens completas."""
+        unmatched = list(range(len(detections)))
+        if self.tracks and detections:
+            prev = np.array([t.centroid for t in self.tracks])
+            cur = np.array(detections)
+            dist = np.linalg.norm(prev[:, None, :] - cur[None, :, :], axis=2)
+            for flat in np.argsort(dist, axis=None):
+                ti, di = divmod(int(flat), len(detections))
+                if dist[ti, di] > self.max_distance:
+                    break
+                track = self.tracks[ti]
+                if track.missed < 0 or di not in unmatched:
+                    continue
+                unmatched.remove(di)
+                track.centroid = detections[di]
+                track.missed = -1  # Marca a trilha como atualizada neste quadro
+                zone = self._zone(track.centroid)
+                if zone != 1:
+                    if track.anchor is not None and zone != track.anchor:
+                        if track.anchor == 0:
+                            self.in_count += 1
+                        else:
+                            self.out_count += 1
+                    track.anchor = zone
+
+        survivors = []
+        for track in self.tracks:
+            track.missed = 0 if track.missed < 0 else track.missed + 1
+            if track.missed <= self.max_missed:
+                survivors.append(track)
+        for di in unmatched:
+            survivors.append(_Track(self._next_id, detections[di], self._zone(detections[di])))
+            self._next_id += 1
+        self.tracks = survivors
+
+    def count(self, frame: np.ndarray) -> int:
+        """
+        Processa um quadro e atualiza as contagens, sem desenhar anotações.
+
+        Args:
+            frame (np.ndarray): O quadro de vídeo (BGR).
+
+        Returns:
+            int: O número total de passagens.
+        """
+        self._track(self._detect(frame))
+        return self.contador
+
+    def process_frame(self, frame: np.ndarray) -> Tuple[np.ndarray, int]:
+        """
+        Processa um quadro, atualiza as contagens e retorna o quadro com anotações.
+
+        Args:
+            frame (np.ndarray): O quadro de vídeo a ser processado.
+
+        Returns:
+            Tuple[np.ndarray, int]: O quadro com anotações e o número total de passagens.
+        """
+        self.count(frame)
+        x, y, w, h = self.roi_coords
+        frame_processed = frame.copy()
+        cv2.rectangle(frame_processed, (x, y), (x + w, y + h), (255, 0, 255), 2)
+        for pos, color in zip(self.lines, ((0, 255, 0), (0, 0, 255))):
+            p0, p1 = ((x, pos), (x + w, pos)) if self.axis == 1 else ((pos, y), (pos, y + h))
+            cv2.line(frame_processed, p0, p1, color, 2)
+        for track in self.tracks:
+            cv2.circle(frame_processed, (int(track.centroid[0]), int(track.centroid[1])), 4, (0, 255, 255), -1)
+        label = f"In: {self.in_count} Out: {self.out_count} Net: {self.occupancy}"
+        cv2.putText(frame_processed, label, (x, y - 10), self.font, 0.8, (255, 0, 0), 2)
+        return frame_processed, self.contador
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna as contagens de entrada, saída e ocupação líquida."""
+        return {"in": self.in_count, "out": self.out_count, "occupancy": self.occupancy, "tracks": len(self.tracks)}
+
+if __name__ == '__main__':
+    import time
+
+    # Simula objetos entrando (de cima para baixo) e saindo (de baixo para cima) da ROI
+    cfg = config.PEOPLE_COUNTING
+    x, y, w, h = cfg["roi_coords"]
+    counter = BackgroundSubtractionCounter()
+    fundo = np.full((720, 1100, 3), 120, np.uint8)
+    quadros = []
+    for passagem in range(6):
+        descendo = passagem % 2 == 0
+        for passo in range(40):
+            frame = fundo.copy()
+            topo = y - 30 + passo * (h + 60) // 40
+            if not descendo:
+                topo = y + h + 30 - passo * (h + 60) // 40 - 25
+            cv2.rectangle(frame, (x + 5, topo), (x + w - 5, topo + 25), (30, 30, 30), -1)
+            quadros.append(frame)
+        quadros.extend([fundo] * 10)
+
+    for frame in [fundo] * 50:
+        counter.count(frame)
+    inicio = time.perf_counter()
+    for frame in quadros:
+        counter.count(frame)
+    duracao = time.perf_counter() - inicio
+    print(f"{counter.stats()} | {duracao / len(quadros) * 1000:.2f} ms por quadro")
@@ -0,0 +1,173 @@
+
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import cv2
+import numpy as np
+from . import config, utils
+from .people_counting import PeopleCounter
+
+def record_white_pixels(path: str, roi_coords: Optional[Tuple[int, int, int, int]] = None,
+                        frame_size: Optional[Tuple[int, int]] = utils.FROM_CONFIG) -> Optional[np.ndarray]:
+    """
+    Percorre o vídeo uma única vez e grava a série de pixels brancos da ROI, quadro a quadro.
+
+    A série não depende do limiar, então pode ser reaproveitada para avaliar qualquer combinação
+    de limiar e histerese sem decodificar o vídeo novamente.
+
+    Args:
+        path (str): O caminho para o arquivo de vídeo.
+        roi_coords (Optional[Tuple[int, int, int, int]]): A ROI (x, y, w, h). Padrão de `config.PEOPLE_COUNTING`.
+        frame_size (Optional[Tuple[int, int]]): Redimensiona os quadros para (largura, altura) antes da análise
+            (None não redimensiona). Padrão de `config.OFFLINE_COUNTING`.
+
+    Returns:
+        Optional[np.ndarray]: A série de pixels brancos (int64), ou None se o vídeo não puder ser aberto.
+    """
+    frame_size = config.OFFLINE_COUNTING["frame_size"] if frame_size is utils.FROM_CONFIG else frame_size
+    video = utils.load_video(path)
+    if video is None:
+        return None
+    counter = PeopleCounter(roi_coords)
+    series: List[int] = []
+    try:
+        while True:
+            ret, frame = video.read()
+            if not ret:
+                break
+            if frame_size is not None:
+                frame = cv2.resize(frame, frame_size)
+            series.append(counter.white_pixels(frame))
+    finally:
+        video.release()
+    return np.array(series, dtype=np.int64)
+
+def sweep_counts(series: Union[np.ndarray, Sequence[np.ndarray]], thresholds: Sequence[int],
+                 hysteresis: Sequence[int] = (0,), block_size: Optional[int] = None) -> np.ndarray:
+    """
+    Calcula a contagem do `PeopleCounter` para todas as combinações de limiar e histerese de uma vez.
+
+    Para cada combinação, um quadro acima do limiar é um evento "ocupar" e um quadro abaixo de
+    `limiar - histerese` é um evento "liberar". O estado `liberado` em cada quadro é o do último
+    evento anterior (propagado com `np.maximum.accumulate` sobre os eventos codificados), e uma
+    passagem é contada em cada evento "ocupar" precedido por "liberar" (ou pelo início da série).
+
+    Args:
+        series (Union[np.ndarray, Sequence[np.ndarray]]): Uma série de pixels brancos, ou uma lista de séries
+            (por exemplo, vários vídeos), cada uma começando com o contador liberado.
+        thresholds (Sequence[int]): Os limiares a avaliar.
+        hysteresis (Sequence[int]): As margens de histerese a avaliar (>= 0).
+        block_size (Optional[int]): Combinações avaliadas por vez. Padrão de `config.CALIBRATION`.
+
+    Returns:
+        np.ndarray: As contagens, com forma (len(hysteresis), len(thresholds), número de séries).
+    """
+    block_size = block_size or config.CALIBRATION["block_size"]
+    parts = [np.asarray(series)] if isinstance(series, np.ndarray) else [np.asarray(s) for s in series]
+    th = np.asarray(thresholds, dtype=np.int64)
+    hy = np.asarray(hysteresis, dtype=np.int64)
+    if np.any(hy < 0):
+        raise ValueError("As margens de histerese devem ser >= 0.")
+
+    # Um quadro sentinela antes de cada série (e no final) libera o contador, como um `PeopleCounter` novo
+    values = np.concatenate([np.r_[-1, p] for p in parts] + [[-1]]).astype(np.int64)
+    starts = np.cumsum([0] + [p.size + 1 for p in parts])
+    frames = 2 * np.arange(values.size, dtype=np.int32)
+
+    hi = np.repeat(th[None, :], hy.size, axis=0).ravel()
+    lo = (th[None, :] - hy[:, None]).ravel()
+    counts = np.empty((hi.size, len(parts)), dtype=np.int64)
+    for b in range(0, hi.size, block_size):
+        occupy = values[None, :] > hi[b:b + block_size, None]
+        release = values[None, :] < lo[b:b + block_size, None]
+        occupy[:, starts] = False
+        release[:, starts] = True
+        # Cada evento é codificado como 2 * quadro + (1 se "ocupar"): o acumulado máximo propaga o
+        # último evento e o bit menos significativo indica o seu tipo, sem indexação adicional
+        last = np.where(occupy | release, frames + occupy, 0)
+        np.maximum.accumulate(last, axis=1, out=last)
+        rising = occupy[:, 1:] & ((last[:, :-1] & 1) == 0)
+        counts[b:b + block_size] = np.add.reduceat(rising, starts[:-1], axis=1)
+    return counts.reshape(hy.size, th.size, len(parts))
+
+def _most_stable(optimal: np.ndarray) -> Tuple[int, int]:
+    """Escolhe o centro da maior faixa contínua de limiares ótimos (empate: a menor histerese)."""
+    best = (-1, 0, 0)
+    for h, row in enumerate(optimal):
+        edges = np.flatnonzero(np.diff(np.r_[0, row.astype(np.int8), 0]))
+        for first, end in zip(edges[::2], edges[1::2]):
+            if end - first > best[0]:
+                best = (end - first, h, (first + end - 1) // 2)
+    return best[1], best[2]
+
+def calibrate(series: Union[np.ndarray, Sequence[np.ndarray]], ground_truth: Union[int, Sequence[int]],
+              thresholds: Optional[Sequence[int]] = None,
+              hysteresis: Optional[Sequence[int]] = None) -> Dict[str, Any]:
+    """
+    Varre as combinações de limiar e histerese e escolhe a que mais se aproxima das contagens reais.
+
+    Args:
+        series (Union[np.ndarray, Sequence[np.ndarray]]): A série (ou as séries) de `record_white_pixels`.
+        ground_truth (Union[int, Sequence[int]]): A contagem real de cada série.
+        thresholds (Optional[Sequence[int]]): Os limiares a avaliar. Padrão: `range(*config.CALIBRATION["thresholds"])`.
+        hysteresis (Optional[Sequence[int]]): As margens de histerese a avaliar. Padrão de `config.CALIBRATION`.
+
+    Returns:
+        Dict[str, Any]: Um dicionário contendo "thresholds", "hysteresis", "counts" (as curvas de contagem,
+            com forma (histerese, limiar, série)), "error" (soma dos erros absolutos, com forma
+            (histerese, limiar)), "best" ({"threshold", "hysteresis", "counts", "error"}) e "elapsed".
+            Entre os ajustes de menor erro, "best" é o centro da maior faixa contínua de limiares, o
+            mais distante de uma mudança na contagem.
+    """
+    cfg = config.CALIBRATION
+    thresholds = np.asarray(range(*cfg["thresholds"]) if thresholds is None else thresholds)
+    hysteresis = np.asarray(cfg["hysteresis"] if hysteresis is None else hysteresis)
+    truth = np.atleast_1d(np.asarray(ground_truth, dtype=np.int64))
+
+    start_time = time.perf_counter()
+    counts = sweep_counts(series, thresholds, hysteresis)
+    if counts.shape[2] != truth.size:
+        raise ValueError("Informe uma contagem real por série.")
+    error = np.abs(counts - truth).sum(axis=2)
+    h, t = _most_stable(error == error.min())
+    elapsed = time.perf_counter() - start_time
+
+    return {
+        "thresholds": thresholds,
+        "hysteresis": hysteresis,
+        "counts": counts,
+        "error": error,
+        "best": {
+            "threshold": int(thresholds[t]),
+            "hysteresis": int(hysteresis[h]),
+            "counts": counts[h, t].tolist(),
+            "error": int(error[h, t]),
+        },
+        "elapsed": elapsed,
+    }
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) > 2:
+        # Uso: python -m vision_library.calibration <video> <contagem real>
+        serie = record_white_pixels(sys.argv[1])
+        if serie is not None:
+            resultado = calibrate(serie, int(sys.argv[2]))
+            print(f"{serie.size} quadros | melhor: {resultado['best']} | varredura em {resultado['elapsed'] * 1000:.1f} ms")
+        sys.exit()
+
+    # Série sintética: 40 passagens com ruído e oscilações perto do pico de cada passagem
+    rng = np.random.default_rng(0)
+    serie = rng.normal(1500, 400, 54000).clip(0).astype(np.int64)
+    for inicio in rng.choice(np.arange(0, 54000 - 60, 1300), 40, replace=False):
+        pico = rng.integers(5000, 7000)
+        serie[inicio:inicio + 40] = pico + rng.normal(0, 900, 40).astype(np.int64)
+
+    resultado = calibrate(serie, 40)
+    melhor = resultado["best"]
+    contador = PeopleCounter(threshold=melhor["threshold"], hysteresis=melhor["hysteresis"])
+    for brancos in serie.tolist():
+        contador.update(brancos)
+    combinacoes = resultado["error"].size
+    print(f"{combinacoes} combinações sobre {serie.size} quadros em {resultado['elapsed'] * 1000:.1f} ms")
+    print(f"melhor: {melhor} | PeopleCounter com o mesmo ajuste: {contador.contador}")
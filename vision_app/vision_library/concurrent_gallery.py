@@ -0,0 +1,346 @@
+
+import threading
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from . import config
+
+class Segment:
+    """Bloco imutável de templates: encodings, identidades (como inteiros) e números de sequência."""
+
+    def __init__(self, vectors: np.ndarray, labels: np.ndarray, seqs: np.ndarray,
+                 norms: Optional[np.ndarray] = None) -> None:
+        """
+        Cria um segmento somente leitura.
+
+        Args:
+            vectors (np.ndarray): Matriz (n, 128) de encodings.
+            labels (np.ndarray): O índice da identidade de cada linha.
+            seqs (np.ndarray): O número de sequência (ordem de cadastro) de cada linha.
+            norms (Optional[np.ndarray]): As normas ao quadrado de cada linha, se já calculadas.
+        """
+        if norms is None:
+            norms = np.einsum("ij,ij->i", vectors, vectors)
+        for arr in (vectors, labels, seqs, norms):
+            arr.setflags(write=False)
+        self.vectors = vectors
+        self.labels = labels
+        self.seqs = seqs
+        self.norms = norms
+
+    def __len__(self) -> int:
+        """Retorna o número de linhas do segmento."""
+        return self.vectors.shape[0]
+
+class GallerySnapshot:
+    """
+    Estado imutável da galeria em um instante.
+
+    Leitores obtêm o snapshot atual com uma única leitura de atributo e trabalham sobre ele sem locks:
+    nenhum dos arrays referenciados é alterado depois de publicado.
+    """
+
+    def __init__(self, segments: Tuple[Segment, ...], names: List[str], deleted_upto: np.ndarray,
+                 version: int) -> None:
+        """
+        Cria um snapshot.
+
+        Args:
+            segments (Tuple[Segment, ...]): Os segmentos visíveis (base, segmentos congelados e delta).
+            names (List[str]): Tabela de nomes de identidades (somente acrescentada).
+            deleted_upto (np.ndarray): Para cada identidade, o número de sequência até o qual suas
+                linhas foram removidas (-1 se nunca foi removida).
+            version (int): Contador de publicações, útil para diagnóstico.
+        """
+        self.segments = segments
+        self.names = names
+        self.deleted_upto = deleted_upto
+        self.version = version
+
+    def __len__(self) -> int:
+        """Retorna o número de linhas visíveis (incluindo linhas removidas ainda não compactadas)."""
+        return sum(len(s) for s in self.segments)
+
+    def search(self, encoding: np.ndarray, tolerance: float) -> Dict[str, Any]:
+        """
+        Busca exaustiva do rosto mais próximo dentro deste snapshot.
+
+        Args:
+            encoding (np.ndarray): O encoding de 128 dimensões do rosto a identificar.
+            tolerance (float): Distância máxima para considerar que houve correspondência.
+
+        Returns:
+            Dict[str, Any]: Um dicionário contendo "identity", "is_match" e "distance".
+        """
+        x = np.asarray(encoding, dtype=np.float32)
+        xx = float(x @ x)
+        best_label, best_d2 = -1, np.inf
+        for seg in self.segments:
+            if len(seg) == 0:
+                continue
+            d2 = seg.norms - 2.0 * (seg.vectors @ x) + xx
+            d2[seg.seqs <= self.deleted_upto[seg.labels]] = np.inf
+            i = int(np.argmin(d2))
+            if d2[i] < best_d2:
+                best_label, best_d2 = int(seg.labels[i]), float(d2[i])
+        if best_label < 0:
+            return {"identity": None, "is_match": False, "distance": float("inf")}
+        distance = float(np.sqrt(max(best_d2, 0.0)))
+        return {"identity": self.names[best_label], "is_match": distance <= tolerance, "distance": distance}
+
+class ConcurrentGallery:
+    """
+    Galeria com cadastro e busca simultâneos sobre snapshots copy-on-write.
+
+    Cadastros são escritos em um segmento delta pré-alocado; como as linhas já publicadas nunca são
+    reescritas, cada cadastro publica apenas uma nova visão do delta. Quando o delta enche, ele é
+    congelado e uma thread em segundo plano funde os segmentos congelados na base, descartando
+    linhas removidas. As buscas nunca aguardam locks.
+    """
+
+    def __init__(self, tolerance: Optional[float] = None, delta_capacity: Optional[int] = None,
+                 merge_segments: Optional[int] = None, background_merge: bool = True) -> None:
+        """
+        Inicializa uma galeria vazia com as configurações do projeto.
+
+        Args:
+            tolerance (Optional[float]): Distância máxima para considerar que houve correspondência.
+            delta_capacity (Optional[int]): Linhas pré-alocadas em cada segmento delta.
+            merge_segments (Optional[int]): Número de segmentos congelados que dispara a fusão.
+            background_merge (bool): Se True, a fusão roda em uma thread própria; caso contrário,
+                só acontece ao chamar `merge()`.
+        """
+        cfg = config.CONCURRENT_GALLERY
+        self.tolerance: float = cfg["tolerance"] if tolerance is None else tolerance
+        self.delta_capacity: int = delta_capacity or cfg["delta_capacity"]
+        self.merge_segments: int = merge_segments or cfg["merge_segments"]
+
+        self._write_lock = threading.Lock()
+        self._merge_lock = threading.Lock()
+        self._names: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+        self._seq: int = 0
+        self._base = Segment(np.empty((0, 128), np.float32), np.empty(0, np.int64), np.empty(0, np.int64))
+        self._frozen: Tuple[Segment, ...] = ()
+        self._new_delta()
+        # Marcas de remoção por identidade; o array só é alterado por cópia (em `remove`) ou
+        # realocado com -1 nas posições novas, então snapshots publicados nunca o veem mudar
+        self._deleted = np.full(256, -1, dtype=np.int64)
+        self._deleted.setflags(write=False)
+        self._snapshot = GallerySnapshot((self._base,), self._names, self._deleted, 0)
+
+        self._merge_wanted = threading.Event()
+        self._closed = False
+        self._merger: Optional[threading.Thread] = None
+        if background_merge:
+            self._merger = threading.Thread(target=self._merge_loop, name="gallery-merge", daemon=True)
+            self._merger.start()
+
+    def _new_delta(self) -> None:
+        """Aloca um novo segmento delta vazio (uso exclusivo do escritor)."""
+        self._delta_vectors = np.empty((self.delta_capacity, 128), dtype=np.float32)
+        self._delta_labels = np.empty(self.delta_capacity, dtype=np.int64)
+        self._delta_seqs = np.empty(self.delta_capacity, dtype=np.int64)
+        self._delta_norms = np.empty(self.delta_capacity, dtype=np.float32)
+        self._delta_size = 0
+
+    def _delta_segment(self) -> Segment:
+        """Cria uma visão imutável das linhas já escritas no delta."""
+        n = self._delta_size
+        return Segment(self._delta_vectors[:n], self._delta_labels[:n], self._delta_seqs[:n],
+                       self._delta_norms[:n])
+
+    def _publish(self) -> None:
+        """Publica um novo snapshot (deve ser chamado com o lock de escrita adquirido)."""
+        segments = (self._base,) + self._frozen + (self._delta_segment(),)
+        self._snapshot = GallerySnapshot(segments, self._names, self._deleted, self._snapshot.version + 1)
+
+    def snapshot(self) -> GallerySnapshot:
+        """Retorna o snapshot atual (leitura sem locks)."""
+        return self._snapshot
+
+    @property
+    def last_seq(self) -> int:
+        """O número de sequência da última operação aplicada."""
+        return self._seq
+
+    def _append(self, identity: str, encoding: np.ndarray) -> None:
+        """Escreve uma linha no delta sem publicar (deve ser chamado com o lock de escrita adquirido)."""
+        label = self._name_ids.get(identity)
+        if label is None:
+            label = self._name_ids[identity] = len(self._names)
+            self._names.append(identity)
+            if label == self._deleted.size:
+                self._deleted = np.concatenate([self._deleted, np.full(label, -1, np.int64)])
+                self._deleted.setflags(write=False)
+        if self._delta_size == self.delta_capacity:
+            self._frozen = self._frozen + (self._delta_segment(),)
+            self._new_delta()
+            if len(self._frozen) >= self.merge_segments:
+                self._merge_wanted.set()
+        self._seq += 1
+        i = self._delta_size
+        self._delta_vectors[i] = encoding
+        self._delta_labels[i] = label
+        self._delta_seqs[i] = self._seq
+        self._delta_norms[i] = self._delta_vectors[i] @ self._delta_vectors[i]
+        self._delta_size = i + 1
+
+    def enroll(self, identity: str, encoding: np.ndarray) -> int:
+        """
+        Cadastra um novo template para uma identidade.
+
+        Args:
+            identity (str): O nome da identidade.
+            encoding (np.ndarray): O encoding de 128 dimensões do rosto.
+
+        Returns:
+            int: O número de sequência atribuído ao cadastro.
+        """
+        with self._write_lock:
+            self._append(identity, encoding)
+            self._publish()
+            return self._seq
+
+    def enroll_many(self, identities: Sequence[str], encodings: Sequence[np.ndarray]) -> int:
+        """
+        Cadastra vários templates de uma vez, publicando um único snapshot ao final.
+
+        Args:
+            identities (Sequence[str]): O nome da identidade de cada template.
+            encodings (Sequence[np.ndarray]): Os encodings de 128 dimensões, na mesma ordem.
+
+        Returns:
+            int: O número de sequência atribuído ao último cadastro.
+        """
+        with self._write_lock:
+            for identity, encoding in zip(identities, encodings):
+                self._append(identity, encoding)
+            self._publish()
+            return self._seq
+
+    def remove(self, identity: str) -> bool:
+        """
+        Remove todos os templates cadastrados até agora para uma identidade.
+
+        Args:
+            identity (str): O nome da identidade.
+
+        Returns:
+            bool: True se a identidade era conhecida.
+        """
+        with self._write_lock:
+            label = self._name_ids.get(identity)
+            if label is None:
+                return False
+            self._seq += 1
+            deleted = self._deleted.copy()
+            deleted[label] = self._seq
+            deleted.setflags(write=False)
+            self._deleted = deleted
+            self._publish()
+            return True
+
+    def search(self, encoding: np.ndarray) -> Dict[str, Any]:
+        """
+        Identifica um rosto no snapshot atual, sem bloquear cadastros em andamento.
+
+        Args:
+            encoding (np.ndarray): O encoding de 128 dimensões do rosto a identificar.
+
+        Returns:
+            Dict[str, Any]: Um dicionário contendo "identity", "is_match" e "distance".
+        """
+        return self._snapshot.search(encoding, self.tolerance)
+
+    def merge(self) -> bool:
+        """
+        Funde a base e os segmentos congelados em uma nova base, descartando linhas removidas.
+
+        O trabalho pesado é feito fora do lock de escrita; o lock só é usado para trocar os segmentos.
+
+        Returns:
+            bool: True se houve fusão.
+        """
+        with self._merge_lock:
+            with self._write_lock:
+                base, frozen = self._base, self._frozen
+                deleted = self._deleted
+            if not frozen:
+                return False
+
+            parts = (base,) + frozen
+            vectors = np.concatenate([s.vectors for s in parts])
+            labels = np.concatenate([s.labels for s in parts])
+            seqs = np.concatenate([s.seqs for s in parts])
+            alive = seqs > deleted[labels]
+            norms = np.concatenate([s.norms for s in parts])
+            merged = Segment(vectors[alive], labels[alive], seqs[alive], norms[alive])
+
+            with self._write_lock:
+                self._base = merged
+                self._frozen = self._frozen[len(frozen):]
+                self._publish()
+            return True
+
+    def _merge_loop(self) -> None:
+        """Laço da thread de fusão em segundo plano."""
+        while True:
+            self._merge_wanted.wait()
+            self._merge_wanted.clear()
+            if self._closed:
+                return
+            self.merge()
+
+    def close(self) -> None:
+        """Encerra a thread de fusão em segundo plano."""
+        self._closed = True
+        self._merge_wanted.set()
+        if self._merger is not None:
+            self._merger.join()
+
+if __name__ == '__main__':
+    import time
+
+    # Teste de estresse: várias threads de busca, com e sem cadastro contínuo em paralelo
+    rng = np.random.default_rng(0)
+    gallery = ConcurrentGallery(delta_capacity=2048)
+    for i in range(20000):
+        gallery.enroll(f"pessoa_{i}", rng.normal(0, 0.15, 128))
+    gallery.merge()
+
+    def rodada(com_cadastro: bool, segundos: float = 3.0) -> np.ndarray:
+        parar = threading.Event()
+        latencias: List[List[float]] = []
+
+        def buscar(seed: int) -> None:
+            local = np.random.default_rng(seed)
+            tempos: List[float] = []
+            while not parar.is_set():
+                consulta = local.normal(0, 0.15, 128)
+                inicio = time.perf_counter()
+                gallery.search(consulta)
+                tempos.append(time.perf_counter() - inicio)
+            latencias.append(tempos)
+
+        def cadastrar() -> None:
+            while not parar.is_set():
+                gallery.enroll(f"pessoa_{len(gallery.snapshot())}", rng.normal(0, 0.15, 128))
+                time.sleep(0.001)  # ~1000 cadastros por segundo
+
+        threads = [threading.Thread(target=buscar, args=(s,)) for s in range(8)]
+        if com_cadastro:
+            threads.append(threading.Thread(target=cadastrar))
+        for t in threads:
+            t.start()
+        time.sleep(segundos)
+        parar.set()
+        for t in threads:
+            t.join()
+        return np.concatenate([np.array(t) for t in latencias]) * 1000
+
+    for com_cadastro in (False, True):
+        ms = rodada(com_cadastro)
+        print(f"cadastro={'sim' if com_cadastro else 'não'}: {ms.size} buscas, "
+              f"p50={np.percentile(ms, 50):.2f}ms p99={np.percentile(ms, 99):.2f}ms")
+    print(f"{len(gallery.snapshot())} linhas no final")
+    gallery.close()
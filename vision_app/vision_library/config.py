@@ -5,10 +5,191 @@ FACE_COMPARISON = {
     "test_image": "data/raw/images/elon_test.jpg",
 }
 
+# Configurações de Carregamento de Imagens
+IMAGE_LOADING = {
+    "workers": 4,                     # Threads do pool de decodificação usado por utils.aload_image
+    "cache_max_bytes": 512 * 2 ** 20,  # Orçamento do cache de imagens (utils.enable_image_cache)
+}
+
+# Configurações do Aquecimento dos Modelos (models.warmup)
+WARMUP = {
+    "image_size": (480, 640),  # (altura, largura) da imagem sintética usada para exercitar os modelos
+    "freeze_gc": True,         # gc.freeze() ao final, para compartilhar páginas com workers após o fork
+}
+
 # Configurações de Contagem de Pessoas
 PEOPLE_COUNTING = {
     "video_path": "data/raw/videos/escalator.mp4",
     "roi_coords": (490, 230, 30, 150),  # (x, y, w, h)
     "threshold": 4000,
+    "hysteresis": 0,  # Margem abaixo do limiar para liberar uma nova contagem
+    "pad": 13,        # Margem pré-processada em volta da ROI: 5 (bloco 11) + 2 x 4 (dilatação 8x8, 2 iterações)
     "font": "cv2.FONT_HERSHEY_SIMPLEX",
+    "engine": "threshold",  # "threshold" (PeopleCounter), "timed", "background" ou "line_profile"
+}
+
+# Configurações de Agrupamento (Clustering) Offline de Rostos
+FACE_CLUSTERING = {
+    "tolerance": 0.5,     # Distância máxima entre rostos da mesma pessoa
+    "k_neighbors": 20,    # Vizinhos considerados por rosto
+    "block_size": 4096,   # Linhas por bloco na busca de vizinhos (limita a memória)
+    "n_lists": None,      # Células do índice IVF (0 = busca exata em blocos; None = automático)
+    "exact_max": 50000,   # Com n_lists=None, rostos até os quais a busca exata (N^2) é usada
+    "n_probe": 8,         # Células visitadas por célula no modo IVF
+    "iterations": 20,     # Iterações do Chinese Whispers
+    "seed": 0,
+}
+
+# Configurações de Agrupamento Online de Rostos Desconhecidos
+ONLINE_CLUSTERING = {
+    "tolerance": 0.5,          # Distância máxima ao centróide de uma identidade transitória
+    "ttl_seconds": 3600.0,     # Identidades sem aparições por esse tempo são descartadas
+    "initial_capacity": 256,   # Identidades pré-alocadas (a capacidade dobra quando necessário)
+    "max_count": 50,           # Peso máximo do centróide (média exponencial a partir daí)
+}
+
+# Configurações da Galeria de Identidades
+FACE_GALLERY = {
+    "max_exemplars": 5,     # Exemplares diversos mantidos por identidade (além do centróide)
+    "top_candidates": 10,   # Identidades conferidas no segundo estágio da busca
+    "tolerance": 0.6,       # Mesma tolerância padrão de fr.compare_faces
+}
+
+# Configurações da Galeria Concorrente (snapshots copy-on-write)
+CONCURRENT_GALLERY = {
+    "tolerance": 0.6,         # Mesma tolerância padrão de fr.compare_faces
+    "delta_capacity": 4096,   # Linhas pré-alocadas em cada segmento delta
+    "merge_segments": 4,      # Segmentos congelados que disparam a fusão em segundo plano
+}
+
+# Configurações do Armazenamento Persistente da Galeria (WAL + checkpoints)
+GALLERY_STORE = {
+    "directory": "data/gallery",            # Diretório do log e dos checkpoints
+    "checkpoint_bytes": 64 * 1024 * 1024,   # Tamanho do log que dispara um checkpoint
+    "max_checkpoints": 16,                  # Checkpoints incrementais antes da compactação
+}
+
+# Configurações do Pipeline de Streaming
+PIPELINE = {
+    "queue_size": 4,          # Capacidade da fila de entrada de cada estágio
+    "drop_policy": "block",   # "block" (contrapressão), "drop_newest" ou "drop_oldest"
+    "executor": "thread",     # "thread" ou "process" para os estágios de detecção e encoding
+    "detect_workers": 2,
+    "encode_workers": 2,
+    "frame_width": 640,       # Largura de análise dos quadros
+}
+
+# Configurações do Modo Tempo Real (quadro mais recente)
+REALTIME = {
+    "slo_ms": 150,          # Latência alvo entre captura e resultado
+    "min_scale": 0.25,      # Menor escala de detecção antes de espaçar as detecções
+    "max_interval": 5,      # Detecta no máximo a cada N quadros quando sob pressão
+    "window": 30,           # Quadros usados para avaliar a latência recente
+    "recover_ratio": 0.6,   # Restaura a qualidade quando o p95 fica abaixo desta fração do SLO
+}
+
+# Configurações de Micro-Lotes entre Fluxos
+MICRO_BATCHING = {
+    "max_batch_size": 32,   # Recortes de rosto por chamada ao modelo
+    "max_wait_ms": 5.0,     # Espera máxima do item mais antigo antes de fechar o lote
+}
+
+# Configurações do Executor Multi-Câmera de Contagem
+MULTI_STREAM = {
+    "workers": 8,          # Tamanho do pool compartilhado (ex.: número de núcleos)
+    "frame_size": None,    # (largura, altura) para redimensionar os quadros, ou None
+}
+
+# Configurações da Contagem Offline Paralela (vídeos longos)
+OFFLINE_COUNTING = {
+    "workers": None,            # Processos em paralelo; None = número de CPUs
+    "chunks_per_worker": 2,     # Trechos por processo (equilibra trechos mais lentos)
+    "frame_size": (1100, 720),  # Mesmo redimensionamento do teste de people_counting
+}
+
+# Configurações da Histerese Temporal (engine "timed"), em segundos
+TIMED_COUNTING = {
+    "min_dwell": 0.3,   # Duração mínima de uma ocupação para ser contada
+    "min_gap": 0.5,     # Intervalo livre mínimo entre duas passagens distintas
+    "debounce": 0.1,    # Mudanças de nível mais curtas que isso são ignoradas
+}
+
+# Configurações da Calibração do Limiar de Contagem (varredura vetorizada)
+CALIBRATION = {
+    "thresholds": (500, 10000, 100),      # (início, fim, passo) dos limiares testados
+    "hysteresis": (0, 250, 500, 1000),    # Margens de histerese testadas
+    "block_size": 64,                     # Combinações avaliadas por vez (limita a memória)
+}
+
+# Configurações do Mapa de Calor de Ocupação
+HEATMAP = {
+    "scale": 0.125,              # Redução da máscara antes de acumular (1100x720 -> 137x90)
+    "decay": 1.0,                # Fator por quadro aplicado ao acumulado (1.0 = sem esquecimento)
+    "snapshot_dir": None,        # Diretório dos snapshots periódicos (None desativa)
+    "snapshot_interval": 300.0,  # Intervalo entre snapshots, em segundos
+    "save_png": True,            # Grava também uma imagem colorida em cada snapshot
+}
+
+# Configurações da Estimativa de Densidade por Grade
+CROWD_DENSITY = {
+    "grid": (6, 8),       # (linhas, colunas) da grade sobre o quadro
+    "window": 30,         # Quadros da média móvel de cada célula
+    "alert_ratio": 0.6,   # Fração média de primeiro plano que dispara o alerta de aglomeração
+    "clear_ratio": 0.45,  # Fração média abaixo da qual o alerta é encerrado
+}
+
+# Configurações da Gravação de Recortes da ROI (reanálise offline)
+ROI_RECORDING = {
+    "pad": 32,            # Margem gravada em volta da ROI (>= PEOPLE_COUNTING["pad"]; folga para outros parâmetros)
+    "chunk_frames": 256,  # Quadros por bloco do arquivo
+    "compress": True,     # Compacta cada bloco com zlib
+    "level": 1,           # Nível de compressão do zlib (1 = mais rápido)
+}
+
+# Configurações do Pool de Quadros em Memória Compartilhada (pipelines multiprocesso)
+FRAME_POOL = {
+    "slots": 16,        # Quadros simultâneos em trânsito entre processos
+    "leak_age": 30.0,   # Segundos em uso a partir dos quais um slot é considerado vazado
+}
+
+# Configurações do Servidor Local de Inferência (inference_server / inference_client)
+INFERENCE_SERVER = {
+    "host": "127.0.0.1",              # Endereço HTTP (apenas local)
+    "port": 8765,
+    "unix_socket": None,              # Caminho de um socket Unix; se definido, substitui host/porta
+    "detect_workers": None,           # Detecções simultâneas; None = número de CPUs
+    "max_batch_size": 32,             # Recortes de rosto por chamada ao modelo de encoding
+    "max_wait_ms": 5.0,               # Espera máxima para juntar requisições concorrentes em um lote
+    "max_body_bytes": 64 * 2 ** 20,   # Tamanho máximo de uma requisição
+    "timeout": 30.0,                  # Tempo limite do cliente, em segundos
+}
+
+# Configurações do Agendador de Tarefas com Prioridades e Prazos (scheduling)
+SCHEDULING = {
+    "workers": None,                    # Threads de execução; None = número de CPUs
+    "classes": ("interactive", "bulk"), # Classes de prioridade, da mais para a menos prioritária
+    "deadlines": {"interactive": 1.0, "bulk": None},  # Prazo padrão por classe, em segundos (None = sem prazo)
+    "reserved_workers": 1,              # Workers que só a classe mais prioritária ocupa (se houver mais de um)
+    "tenant_weights": {},               # Peso de cada tenant no compartilhamento justo (padrão 1.0)
+}
+
+# Configurações da Contagem por Subtração de Fundo (engine "background")
+BACKGROUND_COUNTING = {
+    "method": "MOG2",       # "MOG2" ou "KNN"
+    "history": 300,         # Quadros usados pelo modelo de fundo
+    "pad": 16,              # Margem, em pixels, ao redor da ROI
+    "axis": "y",            # Eixo do movimento: "y" (vertical) ou "x" (horizontal)
+    "lines": None,          # (entrada, saída) no eixo acima; None usa 1/3 e 2/3 da ROI
+    "min_area": 60,         # Área mínima, em pixels, de um objeto em primeiro plano
+    "max_distance": 40.0,   # Deslocamento máximo do centróide entre quadros
+    "max_missed": 5,        # Quadros sem detecção antes de descartar uma trilha
+}
+
+# Configurações da Contagem por Perfil de Linha (engine "line_profile")
+LINE_COUNTING = {
+    "lines": [],              # Segmentos ((x0, y0), (x1, y1)); vazio = linha no meio da ROI
+    "pixel_delta": 30.0,      # Diferença de cinza para um pixel ser considerado ocupado
+    "on_ratio": 0.3,          # Fração de pixels ocupados que marca a linha como ocupada
+    "off_ratio": 0.1,         # Fração abaixo da qual a linha volta a ficar livre
+    "baseline_alpha": 0.02,   # Velocidade de adaptação da linha de base
 }
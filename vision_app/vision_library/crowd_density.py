@@ -0,0 +1,158 @@
+
+from typing import Any, Dict, List, Optional, Tuple
+import cv2
+import numpy as np
+from . import config
+from .people_counting import PeopleCounter
+
+class CrowdDensityEstimator:
+    """
+    Estima a densidade de pessoas por célula de uma grade sobre o quadro, sem detecção de rostos.
+
+    A fração de primeiro plano (máscara de `PeopleCounter._preprocess`) de todas as células é obtida
+    de uma única imagem integral, com quatro leituras por célula; o custo por quadro é dominado pela
+    integral e não cresce com o número de células. Cada célula mantém uma média móvel dos últimos
+    `window` quadros e entra em alerta quando essa média atinge `alert_ratio`, saindo abaixo de `clear_ratio`.
+    """
+
+    def __init__(self, grid: Optional[Tuple[int, int]] = None, window: Optional[int] = None,
+                 alert_ratio: Optional[float] = None, clear_ratio: Optional[float] = None,
+                 counter: Optional[PeopleCounter] = None) -> None:
+        """
+        Inicializa o estimador com as configurações do projeto.
+
+        Args:
+            grid (Optional[Tuple[int, int]]): O número de (linhas, colunas) da grade. Padrão de `config.CROWD_DENSITY`.
+            window (Optional[int]): O número de quadros da média móvel.
+            alert_ratio (Optional[float]): A fração média de primeiro plano que dispara um alerta na célula.
+            clear_ratio (Optional[float]): A fração média abaixo da qual o alerta é encerrado.
+            counter (Optional[PeopleCounter]): O contador cujo pré-processamento é usado. Padrão: um `PeopleCounter` novo.
+        """
+        cfg = config.CROWD_DENSITY
+        self.grid: Tuple[int, int] = grid or cfg["grid"]
+        self.window: int = window or cfg["window"]
+        self.alert_ratio: float = alert_ratio or cfg["alert_ratio"]
+        self.clear_ratio: float = cfg["clear_ratio"] if clear_ratio is None else clear_ratio
+        self.counter = counter or PeopleCounter()
+
+        rows, cols = self.grid
+        self.frames: int = 0
+        self.alerting = np.zeros((rows, cols), dtype=bool)
+        self._history = np.zeros((self.window, rows, cols), dtype=np.float32)
+        self._sum = np.zeros((rows, cols), dtype=np.float64)
+        self._integral: Optional[np.ndarray] = None
+        self._shape: Optional[Tuple[int, int]] = None
+        self._edges: Tuple[np.ndarray, np.ndarray] = (np.zeros(0, np.intp), np.zeros(0, np.intp))
+        self._area = np.ones((rows, cols), dtype=np.float64)
+
+    def _layout(self, shape: Tuple[int, int]) -> None:
+        """Calcula os limites das células e pré-aloca a integral para uma resolução."""
+        rows, cols = self.grid
+        self._shape = shape
+        ys = np.linspace(0, shape[0], rows + 1).astype(np.intp)
+        xs = np.linspace(0, shape[1], cols + 1).astype(np.intp)
+        self._edges = (ys, xs)
+        self._area = np.diff(ys)[:, None] * np.diff(xs)[None, :] * 255.0
+        self._integral = np.empty((shape[0] + 1, shape[1] + 1), dtype=np.int32)
+
+    def measure(self, mask: np.ndarray) -> np.ndarray:
+        """
+        Calcula a fração de primeiro plano de cada célula de uma máscara.
+
+        Args:
+            mask (np.ndarray): A máscara binária (0/255) do quadro.
+
+        Returns:
+            np.ndarray: Uma matriz (linhas, colunas) com a fração de pixels em primeiro plano de cada célula.
+        """
+        if mask.shape[:2] != self._shape:
+            self._layout(mask.shape[:2])
+        ii = cv2.integral(mask, sum=self._integral, sdepth=cv2.CV_32S)
+        ys, xs = self._edges
+        # Soma de cada célula com quatro leituras da integral: D - B - C + A
+        corners = ii[ys[:, None], xs[None, :]].astype(np.int64)
+        sums = corners[1:, 1:] - corners[:-1, 1:] - corners[1:, :-1] + corners[:-1, :-1]
+        return sums / self._area
+
+    def add_mask(self, mask: np.ndarray) -> Dict[str, Any]:
+        """
+        Mede uma máscara e atualiza as médias móveis e os alertas.
+
+        Args:
+            mask (np.ndarray): A máscara binária (0/255) do quadro.
+
+        Returns:
+            Dict[str, Any]: Um dicionário contendo "density" (fração por célula neste quadro), "average"
+                (média móvel por célula), "alerts" (lista de (linha, coluna, média) das células que entraram
+                em alerta neste quadro) e "alerting" (número de células em alerta).
+        """
+        density = self.measure(mask)
+        slot = self.frames % self.window
+        self._sum += density - self._history[slot]
+        self._history[slot] = density
+        self.frames += 1
+        average = self._sum / min(self.frames, self.window)
+
+        raised = ~self.alerting & (average >= self.alert_ratio)
+        self.alerting |= raised
+        self.alerting &= ~(average < self.clear_ratio)
+        alerts: List[Tuple[int, int, float]] = [(int(r), int(c), float(average[r, c])) for r, c in zip(*np.nonzero(raised))]
+        return {"density": density, "average": average, "alerts": alerts, "alerting": int(self.alerting.sum())}
+
+    def update(self, frame: np.ndarray) -> Dict[str, Any]:
+        """
+        Pré-processa um quadro e atualiza as densidades (veja `add_mask`).
+
+        Args:
+            frame (np.ndarray): O quadro de vídeo (BGR).
+
+        Returns:
+            Dict[str, Any]: O mesmo resultado de `add_mask`.
+        """
+        return self.add_mask(self.counter._preprocess(frame))
+
+    def draw(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Desenha a grade sobre uma cópia do quadro, destacando as células em alerta.
+
+        Args:
+            frame (np.ndarray): O quadro de vídeo.
+
+        Returns:
+            np.ndarray: O quadro com anotações.
+        """
+        frame_processed = frame.copy()
+        if self._shape is None:
+            return frame_processed
+        ys, xs = self._edges
+        average = self._sum / max(min(self.frames, self.window), 1)
+        for r in range(self.grid[0]):
+            for c in range(self.grid[1]):
+                color = (0, 0, 255) if self.alerting[r, c] else (255, 0, 255)
+                cv2.rectangle(frame_processed, (int(xs[c]), int(ys[r])), (int(xs[c + 1]) - 1, int(ys[r + 1]) - 1), color, 1)
+                cv2.putText(frame_processed, f"{average[r, c]:.2f}", (int(xs[c]) + 4, int(ys[r]) + 16),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.45, color, 1)
+        return frame_processed
+
+if __name__ == '__main__':
+    import time
+
+    # Uma aglomeração cresce no canto inferior direito enquanto o resto do quadro tem movimento esparso
+    rng = np.random.default_rng(0)
+    mascaras = []
+    for i in range(300):
+        mascara = ((rng.random((720, 1100)) > 0.995) * 255).astype(np.uint8)
+        raio = 20 + i // 2
+        cv2.circle(mascara, (900, 600), raio, 255, -1)
+        mascaras.append(mascara)
+
+    for grade in ((4, 6), (16, 24), (64, 96)):
+        estimador = CrowdDensityEstimator(grid=grade, window=30, alert_ratio=0.5)
+        primeiros_alertas: List[Tuple[int, int, int]] = []
+        inicio = time.perf_counter()
+        for i, mascara in enumerate(mascaras):
+            resultado = estimador.add_mask(mascara)
+            primeiros_alertas.extend((i, r, c) for r, c, _ in resultado["alerts"])
+        duracao = time.perf_counter() - inicio
+        print(f"grade {grade}: {duracao / len(mascaras) * 1e6:.0f} us por quadro | {resultado['alerting']} células em alerta"
+              f" | primeiro alerta: {primeiros_alertas[:1]}")
@@ -0,0 +1,330 @@
+
+import csv
+import numpy as np
+from typing import Iterator, List, Optional, Sequence, Tuple
+from . import config
+
+def _iter_blocks(n: int, block_size: int) -> Iterator[Tuple[int, int]]:
+    """Gera os intervalos (início, fim) de blocos consecutivos de tamanho fixo."""
+    for start in range(0, n, block_size):
+        yield start, min(start + block_size, n)
+
+def _squared_distances(queries: np.ndarray, query_norms: np.ndarray,
+                       candidates: np.ndarray, candidate_norms: np.ndarray) -> np.ndarray:
+    """Calcula as distâncias euclidianas ao quadrado entre dois blocos usando um único produto matricial."""
+    d2 = query_norms[:, None] + candidate_norms[None, :] - 2.0 * (queries @ candidates.T)
+    np.maximum(d2, 0.0, out=d2)
+    return d2
+
+def _merge_top_k(best_d: np.ndarray, best_i: np.ndarray, d2: np.ndarray, cand_ids: np.ndarray,
+                 k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Funde os k melhores vizinhos atuais de cada linha com os candidatos de um novo bloco."""
+    all_d = np.concatenate([best_d, d2], axis=1)
+    all_i = np.concatenate([best_i, np.broadcast_to(cand_ids, d2.shape)], axis=1)
+    if all_d.shape[1] > k:
+        part = np.argpartition(all_d, k - 1, axis=1)[:, :k]
+        all_d = np.take_along_axis(all_d, part, axis=1)
+        all_i = np.take_along_axis(all_i, part, axis=1)
+    return all_d, all_i
+
+def _coarse_centroids(encodings: np.ndarray, n_lists: int, block_size: int,
+                      rng: np.random.Generator, iterations: int = 10) -> np.ndarray:
+    """Treina os centróides do quantizador grosso (k-means) sobre uma amostra dos encodings."""
+    n = encodings.shape[0]
+    sample_size = min(n, max(n_lists * 40, 10000))
+    sample = np.asarray(encodings[np.sort(rng.choice(n, sample_size, replace=False))], dtype=np.float32)
+    centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _assign_lists(sample, centroids, block_size)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        sizes = np.bincount(assign, minlength=n_lists)
+        filled = sizes > 0
+        centroids[filled] = sums[filled] / sizes[filled, None]
+    return centroids
+
+def _assign_lists(encodings: np.ndarray, centroids: np.ndarray, block_size: int) -> np.ndarray:
+    """Atribui cada encoding ao centróide grosso mais próximo, processando em blocos."""
+    centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+    assign = np.empty(encodings.shape[0], dtype=np.int32)
+    for start, end in _iter_blocks(encodings.shape[0], block_size):
+        block = np.asarray(encodings[start:end], dtype=np.float32)
+        norms = np.einsum("ij,ij->i", block, block)
+        assign[start:end] = _squared_distances(block, norms, centroids, centroid_norms).argmin(axis=1)
+    return assign
+
+def _search_pairs(encodings: np.ndarray, norms: np.ndarray, k: int, block_size: int,
+                  n_lists: Optional[int], n_probe: int,
+                  rng: np.random.Generator) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Gera, bloco a bloco, os k vizinhos mais próximos de cada encoding.
+
+    Sem `n_lists` a busca é exata: cada bloco de consultas é comparado com todos os blocos da base,
+    mantendo apenas os k melhores por linha. Com `n_lists`, um quantizador grosso (IVF) particiona a
+    base e cada célula só é comparada com as `n_probe` células mais próximas (busca aproximada).
+    Em ambos os casos a memória de trabalho é O(block_size²), nunca O(N²).
+    """
+    n = encodings.shape[0]
+    k = min(k + 1, n)  # +1 porque o próprio ponto aparece como vizinho
+
+    if not n_lists or n_lists >= n:
+        for q0, q1 in _iter_blocks(n, block_size):
+            queries = np.asarray(encodings[q0:q1], dtype=np.float32)
+            best_d = np.empty((q1 - q0, 0), dtype=np.float32)
+            best_i = np.empty((q1 - q0, 0), dtype=np.int64)
+            for c0, c1 in _iter_blocks(n, block_size):
+                cands = np.asarray(encodings[c0:c1], dtype=np.float32)
+                d2 = _squared_distances(queries, norms[q0:q1], cands, norms[c0:c1])
+                best_d, best_i = _merge_top_k(best_d, best_i, d2, np.arange(c0, c1), k)
+            yield np.arange(q0, q1), best_d, best_i
+        return
+
+    centroids = _coarse_centroids(encodings, n_lists, block_size, rng)
+    assign = _assign_lists(encodings, centroids, block_size)
+    order = np.argsort(assign, kind="stable")
+    bounds = np.searchsorted(assign[order], np.arange(n_lists + 1))
+    centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+    probes = np.argsort(_squared_distances(centroids, centroid_norms, centroids, centroid_norms),
+                        axis=1)[:, :n_probe]
+
+    for cell in range(n_lists):
+        members = order[bounds[cell]:bounds[cell + 1]]
+        if members.size == 0:
+            continue
+        cand_ids = np.concatenate([order[bounds[p]:bounds[p + 1]] for p in probes[cell]])
+        cand_ids.sort()
+        for q0, q1 in _iter_blocks(members.size, block_size):
+            query_ids = members[q0:q1]
+            queries = np.asarray(encodings[query_ids], dtype=np.float32)
+            best_d = np.empty((query_ids.size, 0), dtype=np.float32)
+            best_i = np.empty((query_ids.size, 0), dtype=np.int64)
+            for c0, c1 in _iter_blocks(cand_ids.size, block_size):
+                ids = cand_ids[c0:c1]
+                cands = np.asarray(encodings[ids], dtype=np.float32)
+                d2 = _squared_distances(queries, norms[query_ids], cands, norms[ids])
+                best_d, best_i = _merge_top_k(best_d, best_i, d2, ids, min(k, cand_ids.size))
+            yield query_ids, best_d, best_i
+
+def build_neighbor_graph(encodings: np.ndarray, tolerance: float, k: int, block_size: int,
+                         n_lists: Optional[int] = None, n_probe: int = 8,
+                         seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Constrói o grafo não direcionado de vizinhos (kNN limitado por `tolerance`) no formato CSR.
+
+    Args:
+        encodings (np.ndarray): Matriz (N, 128) de encodings; pode ser um `np.memmap`.
+        tolerance (float): Distância máxima para que dois rostos sejam ligados por uma aresta.
+        k (int): Número máximo de vizinhos considerados por rosto.
+        block_size (int): Tamanho dos blocos da busca; limita a memória de trabalho.
+        n_lists (Optional[int]): Número de células do índice IVF, ou None para busca exata.
+        n_probe (int): Número de células vizinhas visitadas por célula no modo IVF.
+        seed (int): Semente usada no treino do quantizador grosso.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Os arrays `indptr` (N + 1,) e `indices` do grafo CSR.
+    """
+    n = encodings.shape[0]
+    rng = np.random.default_rng(seed)
+    norms = np.empty(n, dtype=np.float32)
+    for start, end in _iter_blocks(n, block_size):
+        block = np.asarray(encodings[start:end], dtype=np.float32)
+        norms[start:end] = np.einsum("ij,ij->i", block, block)
+
+    tol2 = np.float32(tolerance) ** 2
+    src_parts: List[np.ndarray] = []
+    dst_parts: List[np.ndarray] = []
+    for query_ids, best_d, best_i in _search_pairs(encodings, norms, k, block_size, n_lists, n_probe, rng):
+        keep = (best_d <= tol2) & (best_i != query_ids[:, None])
+        rows, cols = np.nonzero(keep)
+        src_parts.append(query_ids[rows].astype(np.int64))
+        dst_parts.append(best_i[rows, cols].astype(np.int64))
+
+    src = np.concatenate(src_parts) if src_parts else np.empty(0, dtype=np.int64)
+    dst = np.concatenate(dst_parts) if dst_parts else np.empty(0, dtype=np.int64)
+    # Simetriza e remove arestas duplicadas usando uma chave linear (i * N + j)
+    keys = np.unique(np.concatenate([src * n + dst, dst * n + src]))
+    indices = (keys % n).astype(np.int32)
+    indptr = np.searchsorted(keys // n, np.arange(n + 1)).astype(np.int64)
+    return indptr, indices
+
+def chinese_whispers(indptr: np.ndarray, indices: np.ndarray, iterations: int = 20,
+                     chunk_size: int = 65536, seed: int = 0) -> np.ndarray:
+    """
+    Agrupa os nós de um grafo CSR pelo algoritmo Chinese Whispers.
+
+    Os nós são visitados em ordem aleatória, em lotes de `chunk_size`; dentro de um lote cada nó adota,
+    de forma vetorizada, o rótulo mais frequente entre seus vizinhos (empates ficam com o menor rótulo).
+
+    Args:
+        indptr (np.ndarray): Ponteiros de linha do grafo CSR.
+        indices (np.ndarray): Vizinhos de cada nó do grafo CSR.
+        iterations (int): Número de passagens completas sobre os nós.
+        chunk_size (int): Número de nós atualizados por lote.
+        seed (int): Semente da ordem de visita.
+
+    Returns:
+        np.ndarray: Um array (N,) com o rótulo de cluster de cada nó, numerado de 0 a C - 1.
+    """
+    n = indptr.size - 1
+    labels = np.arange(n, dtype=np.int64)
+    degrees = np.diff(indptr)
+    rng = np.random.default_rng(seed)
+
+    for _ in range(iterations):
+        changed = 0
+        perm = rng.permutation(n)
+        for start, end in _iter_blocks(n, chunk_size):
+            nodes = perm[start:end]
+            nodes = nodes[degrees[nodes] > 0]
+            if nodes.size == 0:
+                continue
+            lengths = degrees[nodes]
+            src = np.repeat(nodes, lengths)
+            offsets = np.repeat(indptr[nodes] - np.cumsum(lengths) + lengths, lengths)
+            dst = indices[offsets + np.arange(lengths.sum())]
+            lab = labels[dst]
+
+            order = np.lexsort((lab, src))
+            s, l = src[order], lab[order]
+            starts = np.flatnonzero(np.r_[True, (s[1:] != s[:-1]) | (l[1:] != l[:-1])])
+            counts = np.diff(np.r_[starts, s.size])
+            run_src, run_lab = s[starts], l[starts]
+            best = np.lexsort((-counts, run_src))
+            first = np.r_[True, run_src[best][1:] != run_src[best][:-1]]
+            winners, new_labels = run_src[best][first], run_lab[best][first]
+            changed += int(np.count_nonzero(labels[winners] != new_labels))
+            labels[winners] = new_labels
+        if changed == 0:
+            break
+
+    _, compact = np.unique(labels, return_inverse=True)
+    return compact.reshape(-1)
+
+def cluster_representatives(encodings: np.ndarray, labels: np.ndarray, block_size: int) -> np.ndarray:
+    """
+    Escolhe, para cada cluster, o rosto mais próximo do centróide do cluster.
+
+    Args:
+        encodings (np.ndarray): Matriz (N, 128) de encodings.
+        labels (np.ndarray): Rótulos compactos (0 a C - 1) de cada encoding.
+        block_size (int): Tamanho dos blocos usados para percorrer os encodings.
+
+    Returns:
+        np.ndarray: Um array (C,) com o índice do rosto representativo de cada cluster.
+    """
+    n_clusters = int(labels.max()) + 1 if labels.size else 0
+    sums = np.zeros((n_clusters, encodings.shape[1]), dtype=np.float64)
+    for start, end in _iter_blocks(encodings.shape[0], block_size):
+        np.add.at(sums, labels[start:end], np.asarray(encodings[start:end], dtype=np.float64))
+    centroids = (sums / np.bincount(labels, minlength=n_clusters)[:, None]).astype(np.float32)
+
+    dist = np.empty(encodings.shape[0], dtype=np.float32)
+    for start, end in _iter_blocks(encodings.shape[0], block_size):
+        diff = np.asarray(encodings[start:end], dtype=np.float32) - centroids[labels[start:end]]
+        dist[start:end] = np.einsum("ij,ij->i", diff, diff)
+    order = np.lexsort((dist, labels))
+    first = np.r_[True, labels[order][1:] != labels[order][:-1]]
+    return order[first]
+
+def auto_n_lists(n: int, exact_max: Optional[int] = None) -> int:
+    """
+    Escolhe o número de células do índice IVF para uma coleção de `n` rostos.
+
+    Até `exact_max` rostos a busca exata é usada (0); acima disso, cerca de 4 * sqrt(N) células,
+    o que mantém o custo da busca aproximadamente linear em N.
+
+    Args:
+        n (int): O número de rostos.
+        exact_max (Optional[int]): O maior N com busca exata. Padrão de `config.FACE_CLUSTERING`.
+
+    Returns:
+        int: O número de células (0 = busca exata).
+    """
+    exact_max = config.FACE_CLUSTERING["exact_max"] if exact_max is None else exact_max
+    return 0 if n <= exact_max else int(4 * np.sqrt(n))
+
+def cluster_faces(encodings: np.ndarray, tolerance: Optional[float] = None, k: Optional[int] = None,
+                  block_size: Optional[int] = None, n_lists: Optional[int] = None,
+                  iterations: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Agrupa por pessoa os encodings de uma coleção de fotos sem rótulos.
+
+    A busca de vizinhos é feita em blocos (exata ou via índice IVF) e nunca materializa a matriz
+    de distâncias N x N; a memória cresce apenas com N * k. O tempo da busca exata cresce com N^2,
+    então, por padrão, coleções acima de `exact_max` rostos usam o índice IVF (`auto_n_lists`). A
+    busca aproximada perde alguns vizinhos: no exemplo deste módulo (20 mil rostos de 2000 pessoas),
+    128 células produzem 2031 clusters em vez de 2000, com pessoas divididas em mais de um cluster.
+
+    Args:
+        encodings (np.ndarray): Matriz (N, 128) com a saída de `get_face_encodings`; pode ser um `np.memmap`.
+        tolerance (Optional[float]): Distância máxima entre rostos da mesma pessoa. Padrão de `config.FACE_CLUSTERING`.
+        k (Optional[int]): Número máximo de vizinhos por rosto. Padrão de `config.FACE_CLUSTERING`.
+        block_size (Optional[int]): Tamanho dos blocos de busca. Padrão de `config.FACE_CLUSTERING`.
+        n_lists (Optional[int]): Número de células do índice IVF (None usa a configuração, que por padrão
+            escolhe com `auto_n_lists`; 0 força a busca exata).
+        iterations (Optional[int]): Número de iterações do Chinese Whispers. Padrão de `config.FACE_CLUSTERING`.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Uma tupla contendo:
+            - Um array (N,) com o cluster de cada rosto.
+            - Um array (C,) com o índice do rosto representativo de cada cluster.
+    """
+    cfg = config.FACE_CLUSTERING
+    encodings = encodings if isinstance(encodings, np.ndarray) else np.asarray(encodings, dtype=np.float32)
+    if encodings.shape[0] == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    block_size = block_size or cfg["block_size"]
+    n_lists = cfg["n_lists"] if n_lists is None else n_lists
+    if n_lists is None:
+        n_lists = auto_n_lists(encodings.shape[0])
+
+    indptr, indices = build_neighbor_graph(
+        encodings,
+        tolerance=cfg["tolerance"] if tolerance is None else tolerance,
+        k=k or cfg["k_neighbors"],
+        block_size=block_size,
+        n_lists=n_lists or None,
+        n_probe=cfg["n_probe"],
+        seed=cfg["seed"],
+    )
+    labels = chinese_whispers(indptr, indices, iterations=iterations or cfg["iterations"], seed=cfg["seed"])
+    return labels, cluster_representatives(encodings, labels, block_size)
+
+def save_clusters(path: str, labels: np.ndarray, representatives: np.ndarray,
+                  names: Optional[Sequence[str]] = None) -> None:
+    """
+    Grava as atribuições de cluster em um arquivo CSV.
+
+    Cada linha contém o índice do rosto, o nome de origem (se fornecido), o cluster e se o rosto é o
+    representativo do cluster.
+
+    Args:
+        path (str): O caminho do arquivo CSV de saída.
+        labels (np.ndarray): O cluster de cada rosto, como retornado por `cluster_faces`.
+        representatives (np.ndarray): O índice do representativo de cada cluster.
+        names (Optional[Sequence[str]]): Nomes (ex.: caminhos das imagens) de cada rosto.
+    """
+    is_rep = np.zeros(labels.size, dtype=bool)
+    is_rep[representatives] = True
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["face_index", "name", "cluster", "is_representative"])
+        for i in range(labels.size):
+            writer.writerow([i, names[i] if names is not None else "", int(labels[i]), int(is_rep[i])])
+
+if __name__ == '__main__':
+    import time
+
+    # Gera pessoas sintéticas: cada uma é um centro com várias fotos ruidosas ao redor
+    rng = np.random.default_rng(0)
+    n_people, photos = 2000, 10
+    centers = rng.normal(0, 0.15, (n_people, 128)).astype(np.float32)
+    data = np.repeat(centers, photos, axis=0) + rng.normal(0, 0.02, (n_people * photos, 128)).astype(np.float32)
+    truth = np.repeat(np.arange(n_people), photos)
+
+    for lists in (0, 128):
+        inicio = time.perf_counter()
+        labels, reps = cluster_faces(data, n_lists=lists)
+        duracao = time.perf_counter() - inicio
+        puros = sum(len(np.unique(truth[labels == c])) == 1 for c in range(reps.size))
+        print(f"n_lists={lists}: {reps.size} clusters ({puros} puros) em {duracao:.2f}s")
@@ -20,10 +20,21 @@ def find_faces(image_path: str) -> Tuple[Optional[np.ndarray], List[tuple]]:
     img = utils.load_image(image_path)
     if img is None:
         return None, []
-    
+    return img, locate_faces(img)
+
+def locate_faces(image: np.ndarray) -> List[tuple]:
+    """
+    Encontra todos os rostos em uma imagem já carregada.
+
+    Args:
+        image (np.ndarray): A imagem em RGB (array NumPy).
+
+    Returns:
+        List[tuple]: Uma lista de tuplas com as coordenadas (top, right, bottom, left) dos rostos.
+    """
     # A biblioteca face_recognition retorna uma lista de tuplas (top, right, bottom, left)
-    face_locations: List[tuple] = fr.face_locations(img)
-    return img, face_locations
+    face_locations: List[tuple] = fr.face_locations(image)
+    return face_locations
 
 def draw_face_locations(image: np.ndarray, locations: List[tuple]) -> np.ndarray:
     """
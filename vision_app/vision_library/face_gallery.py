@@ -0,0 +1,219 @@
+
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence, Set
+from . import config
+
+def select_exemplars(templates: np.ndarray, max_exemplars: int) -> np.ndarray:
+    """
+    Escolhe até `max_exemplars` templates diversos por seleção do ponto mais distante.
+
+    O primeiro exemplar é o template mais próximo do centróide; cada exemplar seguinte é o template
+    mais distante de todos os já escolhidos.
+
+    Args:
+        templates (np.ndarray): Matriz (T, 128) com os templates de uma identidade.
+        max_exemplars (int): Número máximo de exemplares.
+
+    Returns:
+        np.ndarray: Os índices (em `templates`) dos exemplares escolhidos.
+    """
+    if templates.shape[0] <= max_exemplars:
+        return np.arange(templates.shape[0])
+    centroid = templates.mean(axis=0)
+    chosen = [int(np.argmin(np.linalg.norm(templates - centroid, axis=1)))]
+    nearest = np.linalg.norm(templates - templates[chosen[0]], axis=1)
+    while len(chosen) < max_exemplars:
+        nxt = int(np.argmax(nearest))
+        chosen.append(nxt)
+        np.minimum(nearest, np.linalg.norm(templates - templates[nxt], axis=1), out=nearest)
+    return np.array(chosen)
+
+class FaceGallery:
+    """
+    Galeria de identidades cadastradas com representação compacta por identidade.
+
+    Cada identidade é resumida por um centróide e por até `max_exemplars` exemplares diversos.
+    A busca é feita em dois estágios: primeiro contra todos os centróides, depois apenas contra os
+    exemplares das `top_candidates` identidades mais próximas.
+    """
+
+    def __init__(self, max_exemplars: Optional[int] = None, top_candidates: Optional[int] = None,
+                 tolerance: Optional[float] = None) -> None:
+        """
+        Inicializa uma galeria vazia com as configurações do projeto.
+
+        Args:
+            max_exemplars (Optional[int]): Número máximo de exemplares mantidos por identidade.
+            top_candidates (Optional[int]): Número de identidades conferidas no segundo estágio da busca.
+            tolerance (Optional[float]): Distância máxima para considerar que houve correspondência.
+        """
+        cfg = config.FACE_GALLERY
+        self.max_exemplars: int = max_exemplars or cfg["max_exemplars"]
+        self.top_candidates: int = top_candidates or cfg["top_candidates"]
+        self.tolerance: float = cfg["tolerance"] if tolerance is None else tolerance
+        self.comparisons: int = 0
+
+        self._templates: Dict[str, List[np.ndarray]] = {}
+        self._compact: Dict[str, Any] = {}
+        self._dirty: Set[str] = set()
+        self._stale: bool = True
+        self._names: List[str] = []
+        self._centroids = np.empty((0, 128), dtype=np.float32)
+        self._exemplars = np.empty((0, 128), dtype=np.float32)
+        self._offsets = np.zeros(1, dtype=np.int64)
+
+    def __len__(self) -> int:
+        """Retorna o número de identidades cadastradas."""
+        return len(self._templates)
+
+    def __contains__(self, identity: str) -> bool:
+        """Indica se a identidade está cadastrada."""
+        return identity in self._templates
+
+    def enroll(self, identity: str, encoding: np.ndarray) -> None:
+        """
+        Cadastra um novo template (encoding) para uma identidade.
+
+        Args:
+            identity (str): O nome da identidade.
+            encoding (np.ndarray): O encoding de 128 dimensões do rosto.
+        """
+        self._templates.setdefault(identity, []).append(np.asarray(encoding, dtype=np.float32))
+        self._dirty.add(identity)
+        self._stale = True
+
+    def remove(self, identity: str) -> bool:
+        """
+        Remove uma identidade e todos os seus templates.
+
+        Args:
+            identity (str): O nome da identidade.
+
+        Returns:
+            bool: True se a identidade existia.
+        """
+        if self._templates.pop(identity, None) is None:
+            return False
+        self._compact.pop(identity, None)
+        self._dirty.discard(identity)
+        self._stale = True
+        return True
+
+    def templates(self, identity: str) -> np.ndarray:
+        """Retorna a matriz (T, 128) com todos os templates cadastrados de uma identidade."""
+        return np.stack(self._templates[identity])
+
+    def _refresh(self) -> None:
+        """Recalcula a representação compacta das identidades alteradas e reconstrói as matrizes de busca."""
+        for identity in self._dirty:
+            templates = self.templates(identity)
+            self._compact[identity] = (
+                templates.mean(axis=0),
+                templates[select_exemplars(templates, self.max_exemplars)],
+            )
+        self._dirty.clear()
+
+        self._names = list(self._compact)
+        if self._names:
+            self._centroids = np.stack([self._compact[name][0] for name in self._names])
+            exemplars = [self._compact[name][1] for name in self._names]
+            self._exemplars = np.concatenate(exemplars)
+            self._offsets = np.r_[0, np.cumsum([e.shape[0] for e in exemplars])]
+        else:
+            self._centroids = np.empty((0, 128), dtype=np.float32)
+            self._exemplars = np.empty((0, 128), dtype=np.float32)
+            self._offsets = np.zeros(1, dtype=np.int64)
+        self._stale = False
+
+    def search(self, encoding: np.ndarray, top_candidates: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Identifica um rosto pela busca em dois estágios (centróides e, depois, exemplares).
+
+        Args:
+            encoding (np.ndarray): O encoding de 128 dimensões do rosto a identificar.
+            top_candidates (Optional[int]): Sobrescreve o número de identidades do segundo estágio.
+
+        Returns:
+            Dict[str, Any]: Um dicionário contendo:
+                - "identity": A identidade mais próxima (ou None se a galeria estiver vazia).
+                - "is_match": Um booleano indicando se a distância está dentro da tolerância.
+                - "distance": A menor distância entre o rosto e os exemplares da identidade.
+        """
+        if self._stale:
+            self._refresh()
+        if not self._names:
+            return {"identity": None, "is_match": False, "distance": float("inf")}
+
+        x = np.asarray(encoding, dtype=np.float32)
+        centroid_dist = np.linalg.norm(self._centroids - x, axis=1)
+        top = min(top_candidates or self.top_candidates, len(self._names))
+        candidates = np.argpartition(centroid_dist, top - 1)[:top] if top < len(self._names) \
+            else np.arange(len(self._names))
+
+        rows = np.concatenate([np.arange(self._offsets[c], self._offsets[c + 1]) for c in candidates])
+        owners = np.repeat(candidates, self._offsets[candidates + 1] - self._offsets[candidates])
+        exemplar_dist = np.linalg.norm(self._exemplars[rows] - x, axis=1)
+        self.comparisons += len(self._names) + rows.size
+
+        best = int(np.argmin(exemplar_dist))
+        distance = float(exemplar_dist[best])
+        return {
+            "identity": self._names[owners[best]],
+            "is_match": distance <= self.tolerance,
+            "distance": distance,
+        }
+
+    def search_exhaustive(self, encoding: np.ndarray) -> Dict[str, Any]:
+        """
+        Identifica um rosto comparando-o com todos os templates cadastrados (referência para a busca compacta).
+
+        Args:
+            encoding (np.ndarray): O encoding de 128 dimensões do rosto a identificar.
+
+        Returns:
+            Dict[str, Any]: Um dicionário no mesmo formato de `search`.
+        """
+        best_name: Optional[str] = None
+        best_distance = float("inf")
+        x = np.asarray(encoding, dtype=np.float32)
+        for name, templates in self._templates.items():
+            distance = float(np.linalg.norm(np.stack(templates) - x, axis=1).min())
+            self.comparisons += len(templates)
+            if distance < best_distance:
+                best_name, best_distance = name, distance
+        return {"identity": best_name, "is_match": best_distance <= self.tolerance, "distance": best_distance}
+
+def evaluate_search(gallery: FaceGallery, queries: Sequence[np.ndarray],
+                    truth: Sequence[str]) -> Dict[str, float]:
+    """
+    Mede o recall e o número médio de comparações da busca compacta contra a busca exaustiva.
+
+    Args:
+        gallery (FaceGallery): A galeria a avaliar.
+        queries (Sequence[np.ndarray]): Encodings de consulta.
+        truth (Sequence[str]): A identidade correta de cada consulta.
+
+    Returns:
+        Dict[str, float]: Recall e comparações por consulta de cada modo de busca.
+    """
+    report: Dict[str, float] = {}
+    for mode, search in (("exhaustive", gallery.search_exhaustive), ("compact", gallery.search)):
+        gallery.comparisons = 0
+        hits = sum(search(q)["identity"] == t for q, t in zip(queries, truth))
+        report[f"{mode}_recall"] = hits / max(len(truth), 1)
+        report[f"{mode}_comparisons"] = gallery.comparisons / max(len(truth), 1)
+    return report
+
+if __name__ == '__main__':
+    # Galeria sintética: 2000 identidades com 20 fotos cada
+    rng = np.random.default_rng(0)
+    gallery = FaceGallery()
+    centros = rng.normal(0, 0.15, (2000, 128)).astype(np.float32)
+    for i, centro in enumerate(centros):
+        for _ in range(20):
+            gallery.enroll(f"pessoa_{i}", centro + rng.normal(0, 0.03, 128))
+
+    alvos = rng.integers(0, 2000, 500)
+    consultas = [centros[i] + rng.normal(0, 0.03, 128) for i in alvos]
+    for chave, valor in evaluate_search(gallery, consultas, [f"pessoa_{i}" for i in alvos]).items():
+        print(f"{chave}: {valor:.3f}")
@@ -1,5 +1,6 @@
 
 import cv2
+import dlib
 import numpy as np
 import face_recognition as fr
 from typing import List, Dict, Any
@@ -16,6 +17,41 @@ def get_face_encodings(image: np.ndarray, locations: List[tuple]) -> List[np.nda
     """
     return fr.face_encodings(image, locations)
 
+def extract_face_chips(image: np.ndarray, locations: List[tuple]) -> List[np.ndarray]:
+    """
+    Recorta e alinha (150x150) os rostos de uma imagem, na forma esperada pelo modelo de encoding.
+
+    Separar o recorte do cálculo do descritor permite juntar rostos de várias imagens em uma única
+    chamada de `encode_face_chips`.
+
+    Args:
+        image (np.ndarray): A imagem (como array NumPy) contendo os rostos.
+        locations (List[tuple]): Uma lista de coordenadas (top, right, bottom, left) para cada rosto.
+
+    Returns:
+        List[np.ndarray]: Um recorte alinhado por rosto, na mesma ordem de `locations`.
+    """
+    # Mesmo modelo de 5 pontos usado por fr.face_encodings
+    predictor = fr.api.pose_predictor_5_point
+    return [
+        dlib.get_face_chip(image, predictor(image, fr.api._css_to_rect(location)), size=150, padding=0.25)
+        for location in locations
+    ]
+
+def encode_face_chips(chips: List[np.ndarray]) -> List[np.ndarray]:
+    """
+    Calcula os encodings de vários recortes alinhados em uma única chamada ao modelo.
+
+    Args:
+        chips (List[np.ndarray]): Recortes produzidos por `extract_face_chips` (de uma ou várias imagens).
+
+    Returns:
+        List[np.ndarray]: Os encodings de 128 dimensões, na mesma ordem dos recortes.
+    """
+    if not chips:
+        return []
+    return [np.array(d) for d in fr.api.face_encoder.compute_face_descriptor(chips)]
+
 def compare_faces(reference_encoding: np.ndarray, test_image: np.ndarray, test_locations: List[tuple]) -> List[Dict[str, Any]]:
     """
     Compara um encoding de referência com todos os rostos em uma imagem de teste.
@@ -32,7 +68,20 @@ def compare_faces(reference_encoding: np.ndarray, test_image: np.ndarray, test_l
             - "distance": A distância facial (quanto menor, mais similar).
     """
     test_encodings = get_face_encodings(test_image, test_locations)
-    
+    return match_encodings(reference_encoding, test_encodings, test_locations)
+
+def match_encodings(reference_encoding: np.ndarray, test_encodings: List[np.ndarray], test_locations: List[tuple]) -> List[Dict[str, Any]]:
+    """
+    Compara um encoding de referência com encodings já calculados.
+
+    Args:
+        reference_encoding (np.ndarray): O encoding do rosto de referência.
+        test_encodings (List[np.ndarray]): Os encodings dos rostos de teste.
+        test_locations (List[tuple]): As localizações dos rostos de teste, na mesma ordem dos encodings.
+
+    Returns:
+        List[Dict[str, Any]]: Uma lista de dicionários no mesmo formato de `compare_faces`.
+    """
     results = []
     for i, test_encoding in enumerate(test_encodings):
         # compare_faces retorna uma lista de booleanos
@@ -0,0 +1,287 @@
+
+import multiprocessing as mp
+import os
+import time
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from . import config
+
+_ALIGN = 64  # Alinhamento do início dos quadros (linha de cache)
+
+class SharedFramePool:
+    """
+    Pool de buffers de quadros em memória compartilhada, com slots de contagem de referências.
+
+    O produtor reserva um slot, escreve o quadro diretamente nele e envia apenas o índice do slot
+    para os consumidores, que obtêm uma view NumPy sem cópia. Cada consumidor libera o slot quando
+    termina; quando a contagem chega a zero o slot volta ao pool. A contagem, o PID de quem reservou
+    e o instante da reserva ficam no próprio segmento compartilhado, o que permite detectar slots
+    esquecidos (vazamentos) ou presos por processos que morreram.
+
+    O pool deve ser entregue aos processos filhos por herança (argumentos de `Process` ou
+    `initializer`/`initargs` de um pool de processos), pois o lock e o semáforo entre processos só
+    podem ser compartilhados assim. Os índices de slot podem trafegar por qualquer fila.
+    """
+
+    def __init__(self, shape: Tuple[int, ...], slots: Optional[int] = None, dtype: Any = np.uint8) -> None:
+        """
+        Cria o segmento de memória compartilhada.
+
+        Args:
+            shape (Tuple[int, ...]): A forma de cada quadro (ex.: (1080, 1920, 3)).
+            slots (Optional[int]): O número de quadros no pool. Padrão de `config.FRAME_POOL`.
+            dtype (Any): O tipo dos pixels.
+        """
+        self.shape: Tuple[int, ...] = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.slots: int = slots or config.FRAME_POOL["slots"]
+        self.frame_bytes: int = int(np.prod(self.shape)) * self.dtype.itemsize
+        self._stride = -(-self.frame_bytes // _ALIGN) * _ALIGN
+        self._header = -(-self.slots * 16 // _ALIGN) * _ALIGN  # refcount e PID (int32) + instante (float64)
+        self._shm = shared_memory.SharedMemory(create=True, size=self._header + self._stride * self.slots)
+        self._owner = True
+        self._lock = mp.Lock()
+        self._free = mp.Semaphore(self.slots)
+        self._map()
+        self._refs.fill(0)
+        self._pids.fill(0)
+        self._times.fill(0.0)
+
+    def _map(self) -> None:
+        """Cria as views do cabeçalho sobre o segmento."""
+        buf = self._shm.buf
+        self._refs = np.ndarray((self.slots,), dtype=np.int32, buffer=buf, offset=0)
+        self._pids = np.ndarray((self.slots,), dtype=np.int32, buffer=buf, offset=4 * self.slots)
+        self._times = np.ndarray((self.slots,), dtype=np.float64, buffer=buf, offset=8 * self.slots)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = {k: v for k, v in self.__dict__.items() if k not in ("_shm", "_refs", "_pids", "_times")}
+        state["_name"] = self._shm.name
+        state["_owner"] = False
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        name = state.pop("_name")
+        self.__dict__.update(state)
+        self._shm = shared_memory.SharedMemory(name=name)
+        self._map()
+
+    @property
+    def name(self) -> str:
+        """O nome do segmento de memória compartilhada."""
+        return self._shm.name
+
+    def acquire(self, timeout: Optional[float] = None) -> Optional[int]:
+        """
+        Reserva um slot livre, com uma referência, para o processo atual.
+
+        Args:
+            timeout (Optional[float]): Espera máxima por um slot livre, em segundos (None = sem limite).
+
+        Returns:
+            Optional[int]: O índice do slot, ou None se nenhum slot ficou livre a tempo.
+        """
+        if not self._free.acquire(timeout=timeout):
+            return None
+        with self._lock:
+            slot = int(np.flatnonzero(self._refs == 0)[0])
+            self._refs[slot] = 1
+            self._pids[slot] = os.getpid()
+            self._times[slot] = time.time()
+        return slot
+
+    def view(self, slot: int, writable: bool = False) -> np.ndarray:
+        """
+        Retorna o quadro de um slot como um array NumPy sem cópia.
+
+        A view só é válida enquanto o chamador mantiver uma referência ao slot.
+
+        Args:
+            slot (int): O índice do slot.
+            writable (bool): Se False (padrão), a view é somente leitura.
+
+        Returns:
+            np.ndarray: O quadro, apoiado diretamente na memória compartilhada.
+        """
+        frame = np.ndarray(self.shape, dtype=self.dtype, buffer=self._shm.buf, offset=self._header + slot * self._stride)
+        if not writable:
+            frame.setflags(write=False)
+        return frame
+
+    def put(self, frame: np.ndarray, timeout: Optional[float] = None) -> Optional[int]:
+        """
+        Reserva um slot e copia um quadro para ele (a única cópia do quadro no caminho entre processos).
+
+        Args:
+            frame (np.ndarray): O quadro, com a forma e o tipo do pool.
+            timeout (Optional[float]): Espera máxima por um slot livre, em segundos.
+
+        Returns:
+            Optional[int]: O índice do slot, ou None se nenhum slot ficou livre a tempo.
+        """
+        if frame.shape != self.shape:
+            raise ValueError(f"Forma do quadro diferente da do pool: {frame.shape} != {self.shape}")
+        if frame.dtype != self.dtype:
+            raise ValueError(f"Tipo do quadro diferente do do pool: {frame.dtype} != {self.dtype}")
+        slot = self.acquire(timeout)
+        if slot is not None:
+            try:
+                np.copyto(self.view(slot, writable=True), frame)
+            except BaseException:
+                # Nenhum slot fica reservado depois de uma escrita que falhou
+                self.release(slot)
+                raise
+        return slot
+
+    def retain(self, slot: int, count: int = 1) -> None:
+        """
+        Adiciona referências a um slot em uso (ex.: antes de entregá-lo a mais de um consumidor).
+
+        Args:
+            slot (int): O índice do slot.
+            count (int): O número de referências a adicionar.
+        """
+        with self._lock:
+            if self._refs[slot] <= 0:
+                raise RuntimeError(f"O slot {slot} não está em uso.")
+            self._refs[slot] += count
+
+    def release(self, slot: int) -> None:
+        """
+        Remove uma referência de um slot; com zero referências o slot volta ao pool.
+
+        Args:
+            slot (int): O índice do slot.
+        """
+        with self._lock:
+            if self._refs[slot] <= 0:
+                raise RuntimeError(f"O slot {slot} foi liberado mais vezes do que foi reservado.")
+            self._refs[slot] -= 1
+            freed = self._refs[slot] == 0
+            if freed:
+                self._pids[slot] = 0
+        if freed:
+            self._free.release()
+
+    def leaks(self, max_age: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Lista os slots suspeitos de vazamento.
+
+        Args:
+            max_age (Optional[float]): Idade, em segundos, a partir da qual um slot em uso é suspeito.
+                Padrão de `config.FRAME_POOL`.
+
+        Returns:
+            List[Dict[str, Any]]: Para cada slot suspeito, um dicionário contendo "slot", "refs", "pid", "age"
+                e "dead" (True se o processo que o reservou não existe mais).
+        """
+        max_age = config.FRAME_POOL["leak_age"] if max_age is None else max_age
+        now = time.time()
+        with self._lock:
+            in_use = [(int(s), int(self._refs[s]), int(self._pids[s]), now - float(self._times[s]))
+                      for s in np.flatnonzero(self._refs > 0)]
+        result = []
+        for slot, refs, pid, age in in_use:
+            dead = not _process_alive(pid)
+            if dead or age >= max_age:
+                result.append({"slot": slot, "refs": refs, "pid": pid, "age": age, "dead": dead})
+        return result
+
+    def reclaim(self, slot: int) -> None:
+        """
+        Devolve à força um slot vazado ao pool, descartando todas as suas referências.
+
+        Args:
+            slot (int): O índice do slot.
+        """
+        with self._lock:
+            if self._refs[slot] <= 0:
+                return
+            self._refs[slot] = 0
+            self._pids[slot] = 0
+        self._free.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna o número de slots, os slots em uso, o total de referências e o tamanho de cada quadro."""
+        with self._lock:
+            in_use = int((self._refs > 0).sum())
+            refs = int(self._refs.sum())
+        return {"slots": self.slots, "in_use": in_use, "refs": refs, "frame_bytes": self.frame_bytes}
+
+    def close(self) -> None:
+        """Desfaz o mapeamento neste processo; no processo criador, também remove o segmento e avisa sobre vazamentos."""
+        if self._owner:
+            leaked = self.leaks(max_age=0.0)
+            if leaked:
+                print(f"Aviso: {len(leaked)} slot(s) do pool de quadros ainda em uso ao fechar: {leaked}")
+        del self._refs, self._pids, self._times
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+            self._owner = False
+
+    def __enter__(self) -> "SharedFramePool":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+def _process_alive(pid: int) -> bool:
+    """Indica se um processo existe."""
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+# Pool herdado pelos workers do exemplo abaixo (definido pelo `initializer`)
+_worker_pool: Optional[SharedFramePool] = None
+
+def _init_worker(pool: SharedFramePool) -> None:
+    global _worker_pool
+    _worker_pool = pool
+
+def _brightness_from_slot(slot: int) -> float:
+    """Tarefa do exemplo: lê o quadro do slot sem cópia, calcula a média e libera o slot."""
+    assert _worker_pool is not None
+    try:
+        return float(_worker_pool.view(slot)[::8, ::8].mean())
+    finally:
+        _worker_pool.release(slot)
+
+def _brightness_from_array(frame: np.ndarray) -> float:
+    """Mesma tarefa, recebendo o quadro serializado (pickle) pelo pool de processos."""
+    return float(frame[::8, ::8].mean())
+
+if __name__ == '__main__':
+    from concurrent.futures import ProcessPoolExecutor
+
+    forma = (1080, 1920, 3)
+    quadros = [np.full(forma, i % 256, np.uint8) for i in range(8)]
+    total = 200
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        inicio = time.perf_counter()
+        list(executor.map(_brightness_from_array, (quadros[i % 8] for i in range(total))))
+        com_pickle = time.perf_counter() - inicio
+
+    with SharedFramePool(forma, slots=8) as pool:
+        with ProcessPoolExecutor(max_workers=2, initializer=_init_worker, initargs=(pool,)) as executor:
+            inicio = time.perf_counter()
+            futuros = []
+            for i in range(total):
+                slot = pool.put(quadros[i % 8])
+                futuros.append(executor.submit(_brightness_from_slot, slot))
+            medias = [f.result() for f in futuros]
+            compartilhado = time.perf_counter() - inicio
+        esquecido = pool.acquire()
+        print(f"{total} quadros 1080p | pickle: {com_pickle * 1000 / total:.2f} ms/quadro | "
+              f"memória compartilhada: {compartilhado * 1000 / total:.2f} ms/quadro | {pool.stats()}")
+        print(f"vazamentos detectados: {pool.leaks(max_age=0.0)}")
+        if esquecido is not None:
+            pool.release(esquecido)
@@ -0,0 +1,443 @@
+
+import json
+import os
+import struct
+import threading
+import zlib
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from . import config
+from .concurrent_gallery import ConcurrentGallery
+
+_ENROLL, _REMOVE = 1, 2
+_FRAME = struct.Struct("<II")     # tamanho e CRC32 do payload
+_HEADER = struct.Struct("<BqH")   # operação, LSN e tamanho do nome em bytes
+
+Record = Tuple[int, int, str, Optional[np.ndarray]]
+
+def _encode_record(op: int, lsn: int, identity: str, encoding: Optional[np.ndarray] = None) -> bytes:
+    """Serializa uma operação do log como um quadro [tamanho][crc][payload]."""
+    name = identity.encode("utf-8")
+    payload = _HEADER.pack(op, lsn, len(name)) + name
+    if encoding is not None:
+        payload += np.asarray(encoding, dtype="<f4").tobytes()
+    return _FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+def _read_wal(path: str) -> Tuple[List[Record], int]:
+    """
+    Lê os registros íntegros de um arquivo de log.
+
+    Returns:
+        Tuple[List[Record], int]: Os registros (operação, LSN, identidade, encoding) e o número de
+            bytes válidos; um registro incompleto ou corrompido encerra a leitura.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    records: List[Record] = []
+    pos = 0
+    while pos + _FRAME.size <= len(data):
+        size, crc = _FRAME.unpack_from(data, pos)
+        payload = data[pos + _FRAME.size:pos + _FRAME.size + size]
+        if len(payload) < size or zlib.crc32(payload) != crc:
+            break
+        op, lsn, name_len = _HEADER.unpack_from(payload)
+        name = payload[_HEADER.size:_HEADER.size + name_len].decode("utf-8")
+        encoding = None
+        if op == _ENROLL:
+            encoding = np.frombuffer(payload, dtype="<f4", count=128, offset=_HEADER.size + name_len)
+        records.append((op, lsn, name, encoding))
+        pos += _FRAME.size + size
+    return records, pos
+
+def _fsync_dir(path: str) -> None:
+    """Garante que renomeações e criações de arquivos no diretório sejam persistidas."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _atomic_save(path: str, write: Any) -> None:
+    """Escreve um arquivo em um temporário, faz fsync e o renomeia sobre o destino."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(os.path.dirname(path))
+
+class GalleryStore:
+    """
+    Persistência à prova de falhas para uma `ConcurrentGallery`, com log de escrita antecipada (WAL).
+
+    Cada cadastro e remoção é aplicado à galeria e registrado no log; uma thread grava os registros
+    pendentes em lote com um único fsync (group commit). Periodicamente o log é selado e convertido em
+    um checkpoint incremental (.npz) contendo apenas as operações desde o checkpoint anterior. Ao
+    reabrir o diretório, os checkpoints são carregados e o log restante é reaplicado por cima.
+    """
+
+    def __init__(self, directory: Optional[str] = None, gallery: Optional[ConcurrentGallery] = None,
+                 checkpoint_bytes: Optional[int] = None, max_checkpoints: Optional[int] = None) -> None:
+        """
+        Abre (ou cria) o armazenamento e recupera o estado persistido.
+
+        Args:
+            directory (Optional[str]): O diretório do armazenamento. Padrão de `config.GALLERY_STORE`.
+            gallery (Optional[ConcurrentGallery]): Uma galeria vazia a ser preenchida; uma nova é criada se None.
+            checkpoint_bytes (Optional[int]): Tamanho do log que dispara um checkpoint automático.
+            max_checkpoints (Optional[int]): Número de checkpoints incrementais que dispara a compactação.
+        """
+        cfg = config.GALLERY_STORE
+        self.directory: str = os.path.abspath(directory or cfg["directory"])
+        self.checkpoint_bytes: int = checkpoint_bytes or cfg["checkpoint_bytes"]
+        self.max_checkpoints: int = max_checkpoints or cfg["max_checkpoints"]
+        self.gallery = gallery if gallery is not None else ConcurrentGallery()
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._checkpoint_lock = threading.Lock()
+        self._pending: List[bytes] = []
+        self._lsn: int = 0
+        self._durable_lsn: int = 0
+        self._error: Optional[BaseException] = None
+        self._closed = False
+
+        self._manifest: Dict[str, Any] = {"checkpoints": [], "checkpoint_lsn": 0}
+        manifest_path = os.path.join(self.directory, "MANIFEST.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                self._manifest = json.load(f)
+        self._sealed: List[str] = self._recover()
+        self._durable_lsn = self._lsn
+        self._open_wal()
+
+        self._checkpoint_wanted = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="gallery-wal", daemon=True)
+        self._checkpointer = threading.Thread(target=self._checkpoint_loop, name="gallery-checkpoint",
+                                              daemon=True)
+        self._flusher.start()
+        self._checkpointer.start()
+
+    # ------------------------------------------------------------------ recuperação
+
+    def _apply(self, ops: List[Record]) -> None:
+        """Aplica operações à galeria em ordem, agrupando cadastros consecutivos."""
+        names: List[str] = []
+        vectors: List[np.ndarray] = []
+        for op, lsn, name, encoding in ops:
+            if op == _ENROLL:
+                names.append(name)
+                vectors.append(encoding)
+            else:
+                if names:
+                    self.gallery.enroll_many(names, vectors)
+                    names, vectors = [], []
+                self.gallery.remove(name)
+            self._lsn = max(self._lsn, lsn)
+        if names:
+            self.gallery.enroll_many(names, vectors)
+
+    def _load_checkpoint(self, filename: str) -> List[Record]:
+        """Lê as operações de um arquivo de checkpoint, ordenadas por LSN."""
+        with np.load(os.path.join(self.directory, filename), allow_pickle=False) as data:
+            ops: List[Record] = [(_ENROLL, int(lsn), str(name), vec) for lsn, name, vec in
+                                 zip(data["enroll_lsn"], data["enroll_names"], data["vectors"])]
+            ops += [(_REMOVE, int(lsn), str(name), None) for lsn, name in
+                    zip(data["remove_lsn"], data["remove_names"])]
+        ops.sort(key=lambda r: r[1])
+        return ops
+
+    def _wal_files(self) -> List[str]:
+        """Lista os arquivos de log do diretório, em ordem de LSN inicial."""
+        return sorted(f for f in os.listdir(self.directory) if f.startswith("wal-") and f.endswith(".log"))
+
+    def _recover(self) -> List[str]:
+        """Carrega os checkpoints e reaplica o log; retorna os arquivos de log ainda não convertidos."""
+        for filename in self._manifest["checkpoints"]:
+            self._apply(self._load_checkpoint(filename))
+        self._lsn = max(self._lsn, self._manifest["checkpoint_lsn"])
+
+        sealed: List[str] = []
+        for filename in self._wal_files():
+            path = os.path.join(self.directory, filename)
+            records, valid = _read_wal(path)
+            if valid < os.path.getsize(path):
+                print(f"Aviso: registro incompleto no fim de {filename}; descartando {os.path.getsize(path) - valid} bytes.")
+                with open(path, "r+b") as f:
+                    f.truncate(valid)
+                    os.fsync(f.fileno())
+            if not records:
+                os.remove(path)
+                continue
+            self._apply([r for r in records if r[1] > self._manifest["checkpoint_lsn"]])
+            sealed.append(filename)
+        return sealed
+
+    # ------------------------------------------------------------------ escrita
+
+    def _open_wal(self) -> None:
+        """Abre um novo arquivo de log começando no próximo LSN."""
+        self._wal_name = f"wal-{self._lsn + 1:020d}.log"
+        self._wal = open(os.path.join(self.directory, self._wal_name), "ab")
+        self._wal_bytes = 0
+        _fsync_dir(self.directory)
+
+    def _log(self, record: bytes) -> None:
+        """Enfileira um registro para o próximo group commit (deve ser chamado com `_cond` adquirido)."""
+        self._pending.append(record)
+        self._cond.notify_all()
+
+    def _wait_durable(self, lsn: int) -> None:
+        """Bloqueia até que o registro `lsn` esteja gravado em disco."""
+        with self._cond:
+            while self._durable_lsn < lsn and self._error is None:
+                self._cond.wait()
+            if self._error is not None:
+                raise IOError("Falha ao gravar o log da galeria.") from self._error
+
+    def enroll(self, identity: str, encoding: np.ndarray, wait: bool = True) -> int:
+        """
+        Cadastra um template e o registra no log.
+
+        Args:
+            identity (str): O nome da identidade.
+            encoding (np.ndarray): O encoding de 128 dimensões do rosto.
+            wait (bool): Se True, só retorna depois que o registro estiver em disco.
+
+        Returns:
+            int: O LSN do registro.
+        """
+        return self.enroll_many([identity], [encoding], wait)
+
+    def enroll_many(self, identities: Sequence[str], encodings: Sequence[np.ndarray], wait: bool = True) -> int:
+        """
+        Cadastra vários templates e os registra no log, aguardando (opcionalmente) um único commit.
+
+        Args:
+            identities (Sequence[str]): O nome da identidade de cada template.
+            encodings (Sequence[np.ndarray]): Os encodings de 128 dimensões, na mesma ordem.
+            wait (bool): Se True, só retorna depois que todos os registros estiverem em disco.
+
+        Returns:
+            int: O LSN do último registro.
+        """
+        with self._cond:
+            records = []
+            for identity, encoding in zip(identities, encodings):
+                self._lsn += 1
+                records.append(_encode_record(_ENROLL, self._lsn, identity, encoding))
+            self.gallery.enroll_many(identities, encodings)
+            self._log(b"".join(records))
+            lsn = self._lsn
+        if wait:
+            self._wait_durable(lsn)
+        return lsn
+
+    def remove(self, identity: str, wait: bool = True) -> bool:
+        """
+        Remove uma identidade e registra a remoção no log.
+
+        Args:
+            identity (str): O nome da identidade.
+            wait (bool): Se True, só retorna depois que o registro estiver em disco.
+
+        Returns:
+            bool: True se a identidade era conhecida.
+        """
+        with self._cond:
+            if not self.gallery.remove(identity):
+                return False
+            self._lsn += 1
+            self._log(_encode_record(_REMOVE, self._lsn, identity))
+            lsn = self._lsn
+        if wait:
+            self._wait_durable(lsn)
+        return True
+
+    def search(self, encoding: np.ndarray) -> Dict[str, Any]:
+        """Identifica um rosto na galeria (veja `ConcurrentGallery.search`)."""
+        return self.gallery.search(encoding)
+
+    def _flush(self) -> None:
+        """Grava todos os registros pendentes com um único fsync (group commit)."""
+        with self._flush_lock:
+            self._flush_pending_locked()
+        if self._wal_bytes >= self.checkpoint_bytes:
+            self._checkpoint_wanted.set()
+
+    def _flush_loop(self) -> None:
+        """Laço da thread de group commit."""
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._pending:
+                    return
+            try:
+                self._flush()
+            except BaseException as exc:
+                with self._cond:
+                    self._error = exc
+                    self._cond.notify_all()
+                return
+
+    # ------------------------------------------------------------------ checkpoints
+
+    def _write_checkpoint(self, filename: str, ops: List[Record]) -> None:
+        """Grava uma lista de operações como arquivo de checkpoint."""
+        enrolls = [r for r in ops if r[0] == _ENROLL]
+        removes = [r for r in ops if r[0] == _REMOVE]
+        arrays = {
+            "enroll_lsn": np.array([r[1] for r in enrolls], dtype=np.int64),
+            "enroll_names": np.array([r[2] for r in enrolls], dtype=str),
+            "vectors": np.array([r[3] for r in enrolls], dtype=np.float32).reshape(-1, 128),
+            "remove_lsn": np.array([r[1] for r in removes], dtype=np.int64),
+            "remove_names": np.array([r[2] for r in removes], dtype=str),
+        }
+        _atomic_save(os.path.join(self.directory, filename), lambda f: np.savez(f, **arrays))
+
+    def _save_manifest(self, checkpoints: List[str], checkpoint_lsn: int) -> None:
+        """Substitui atomicamente o manifesto de checkpoints."""
+        manifest = {"checkpoints": checkpoints, "checkpoint_lsn": checkpoint_lsn}
+        _atomic_save(os.path.join(self.directory, "MANIFEST.json"),
+                     lambda f: f.write(json.dumps(manifest).encode("utf-8")))
+        self._manifest = manifest
+
+    def checkpoint(self) -> Optional[str]:
+        """
+        Sela o log atual e converte os logs selados em um checkpoint incremental.
+
+        Returns:
+            Optional[str]: O nome do arquivo de checkpoint criado, ou None se não havia operações novas.
+        """
+        with self._checkpoint_lock:
+            with self._flush_lock:
+                self._flush_pending_locked()
+                if self._wal_bytes:
+                    self._wal.close()
+                    self._sealed.append(self._wal_name)
+                    self._open_wal()
+            sealed = list(self._sealed)
+            ops: List[Record] = []
+            for filename in sealed:
+                ops += _read_wal(os.path.join(self.directory, filename))[0]
+            ops = [r for r in ops if r[1] > self._manifest["checkpoint_lsn"]]
+
+            created: Optional[str] = None
+            checkpoints = list(self._manifest["checkpoints"])
+            last_lsn = self._manifest["checkpoint_lsn"]
+            if ops:
+                last_lsn = ops[-1][1]
+                created = f"ckpt-{ops[0][1]:020d}-{last_lsn:020d}.npz"
+                self._write_checkpoint(created, ops)
+                checkpoints.append(created)
+                self._save_manifest(checkpoints, last_lsn)
+            for filename in sealed:
+                os.remove(os.path.join(self.directory, filename))
+            self._sealed = self._sealed[len(sealed):]
+            if len(checkpoints) > self.max_checkpoints:
+                self._compact_locked()
+            return created
+
+    def _flush_pending_locked(self) -> None:
+        """Grava os registros pendentes com `_flush_lock` já adquirido."""
+        with self._cond:
+            batch, self._pending = self._pending, []
+            target = self._lsn
+        if batch:
+            data = b"".join(batch)
+            self._wal.write(data)
+            self._wal.flush()
+            os.fsync(self._wal.fileno())
+            self._wal_bytes += len(data)
+        with self._cond:
+            self._durable_lsn = max(self._durable_lsn, target)
+            self._cond.notify_all()
+
+    def _compact_locked(self) -> None:
+        """Funde todos os checkpoints em um único arquivo contendo apenas os templates vivos."""
+        old = list(self._manifest["checkpoints"])
+        removed_at: Dict[str, int] = {}
+        enrolls: List[Record] = []
+        for filename in old:
+            for record in self._load_checkpoint(filename):
+                if record[0] == _REMOVE:
+                    removed_at[record[2]] = record[1]
+                else:
+                    enrolls.append(record)
+        live = [r for r in enrolls if r[1] > removed_at.get(r[2], 0)]
+        last_lsn = self._manifest["checkpoint_lsn"]
+        compacted = f"ckpt-{0:020d}-{last_lsn:020d}.npz"
+        self._write_checkpoint(compacted, live)
+        self._save_manifest([compacted], last_lsn)
+        for filename in old:
+            if filename != compacted:
+                os.remove(os.path.join(self.directory, filename))
+
+    def _checkpoint_loop(self) -> None:
+        """Laço da thread de checkpoints automáticos."""
+        while True:
+            self._checkpoint_wanted.wait()
+            self._checkpoint_wanted.clear()
+            if self._closed:
+                return
+            self.checkpoint()
+
+    def close(self) -> None:
+        """Grava os registros pendentes, encerra as threads e fecha o log."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._flusher.join()
+        self._checkpoint_wanted.set()
+        self._checkpointer.join()
+        with self._flush_lock:
+            self._flush_pending_locked()
+            self._wal.close()
+        self.gallery.close()
+
+if __name__ == '__main__':
+    import shutil
+    import tempfile
+    import time
+
+    # Mede a vazão de cadastro com group commit e verifica a recuperação após reabrir
+    diretorio = tempfile.mkdtemp(prefix="gallery_store_")
+    rng = np.random.default_rng(0)
+    encodings = rng.normal(0, 0.15, (200000, 128)).astype(np.float32)
+
+    store = GalleryStore(diretorio)
+    n_threads, por_thread = 8, 5000
+
+    def cadastrar(t: int) -> None:
+        for i in range(t * por_thread, (t + 1) * por_thread):
+            store.enroll(f"pessoa_{i}", encodings[i])
+
+    inicio = time.perf_counter()
+    threads = [threading.Thread(target=cadastrar, args=(t,)) for t in range(n_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duracao = time.perf_counter() - inicio
+    print(f"{n_threads} threads, fsync por commit em grupo: {n_threads * por_thread / duracao:.0f} cadastros/s")
+
+    inicio = time.perf_counter()
+    base = n_threads * por_thread
+    for lote in range(base, 200000, 1000):
+        store.enroll_many([f"pessoa_{i}" for i in range(lote, lote + 1000)], encodings[lote:lote + 1000])
+    print(f"lotes de 1000: {(200000 - base) / (time.perf_counter() - inicio):.0f} cadastros/s")
+
+    store.remove("pessoa_7")
+    store.checkpoint()
+    store.enroll("pessoa_7", encodings[8])
+    store.close()
+
+    inicio = time.perf_counter()
+    reaberto = GalleryStore(diretorio)
+    print(f"recuperação em {time.perf_counter() - inicio:.2f}s, {len(reaberto.gallery.snapshot())} linhas")
+    print(reaberto.search(encodings[8]))
+    reaberto.close()
+    shutil.rmtree(diretorio)
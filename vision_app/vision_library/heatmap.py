@@ -0,0 +1,174 @@
+
+import os
+import time
+from typing import Any, Dict, Optional
+import cv2
+import numpy as np
+from . import config
+from .people_counting import PeopleCounter
+
+class OccupancyHeatmap:
+    """
+    Acumula, ao longo de um fluxo, onde há primeiro plano no quadro (mapa de calor de ocupação).
+
+    A cada quadro a máscara de `PeopleCounter._preprocess` é reduzida para um buffer pré-alocado e
+    somada, no próprio lugar, a um acumulador float32. Com `decay` < 1 o acumulador é multiplicado
+    pelo fator antes da soma, de modo que o mapa reflete principalmente o passado recente. Nenhum
+    array é alocado por quadro além da máscara do pré-processamento.
+    """
+
+    def __init__(self, scale: Optional[float] = None, decay: Optional[float] = None,
+                 snapshot_dir: Optional[str] = None, snapshot_interval: Optional[float] = None,
+                 save_png: Optional[bool] = None, counter: Optional[PeopleCounter] = None) -> None:
+        """
+        Inicializa o acumulador com as configurações do projeto.
+
+        Args:
+            scale (Optional[float]): Fator de redução da máscara, arredondado para 1/n. Padrão de `config.HEATMAP`.
+            decay (Optional[float]): Fator aplicado ao acumulado a cada quadro (1.0 = sem esquecimento).
+            snapshot_dir (Optional[str]): Diretório dos snapshots periódicos (None desativa).
+            snapshot_interval (Optional[float]): Intervalo entre snapshots, em segundos.
+            save_png (Optional[bool]): Grava também uma imagem colorida em cada snapshot.
+            counter (Optional[PeopleCounter]): O contador cujo pré-processamento é usado. Padrão: um `PeopleCounter` novo.
+        """
+        cfg = config.HEATMAP
+        self.scale: float = scale or cfg["scale"]
+        self.factor: int = max(int(round(1.0 / self.scale)), 1)
+        self.decay: float = cfg["decay"] if decay is None else decay
+        self.snapshot_dir: Optional[str] = snapshot_dir or cfg["snapshot_dir"]
+        self.snapshot_interval: float = snapshot_interval or cfg["snapshot_interval"]
+        self.save_png: bool = cfg["save_png"] if save_png is None else save_png
+        self.counter = counter or PeopleCounter()
+
+        self.frames: int = 0
+        self.weight: float = 0.0  # Número efetivo de quadros acumulados (considerando o decaimento)
+        self.snapshots: int = 0
+        self._acc: Optional[np.ndarray] = None
+        self._small: Optional[np.ndarray] = None
+        self._last_snapshot: Optional[float] = None
+
+    def add_mask(self, mask: np.ndarray, timestamp: Optional[float] = None) -> None:
+        """
+        Soma uma máscara de primeiro plano (0/255, em resolução cheia) ao acumulador.
+
+        Args:
+            mask (np.ndarray): A máscara binária do quadro (ex.: `PeopleCounter._preprocess`).
+            timestamp (Optional[float]): O instante do quadro, em segundos. Padrão: `time.time()`.
+        """
+        if self._acc is None:
+            shape = (max(mask.shape[0] // self.factor, 1), max(mask.shape[1] // self.factor, 1))
+            self._acc = np.zeros(shape, dtype=np.float32)
+            self._small = np.empty(shape, dtype=np.uint8)
+        assert self._small is not None
+        rows, cols = self._acc.shape
+        # Com um fator inteiro o INTER_AREA usa o caminho rápido (média de blocos); as últimas
+        # linhas e colunas que não completam um bloco são ignoradas
+        cv2.resize(mask[:rows * self.factor, :cols * self.factor], (cols, rows), dst=self._small,
+                   interpolation=cv2.INTER_AREA)
+        if self.decay < 1.0:
+            self._acc *= self.decay
+        cv2.accumulate(self._small, self._acc)
+        self.weight = self.weight * self.decay + 1.0
+        self.frames += 1
+
+        if self.snapshot_dir is not None:
+            now = time.time() if timestamp is None else timestamp
+            if self._last_snapshot is None:
+                self._last_snapshot = now
+            elif now - self._last_snapshot >= self.snapshot_interval:
+                self.snapshot(os.path.join(self.snapshot_dir, f"heatmap-{int(now)}"))
+                self._last_snapshot = now
+
+    def update(self, frame: np.ndarray, timestamp: Optional[float] = None) -> None:
+        """
+        Pré-processa um quadro e soma a sua máscara ao acumulador.
+
+        Args:
+            frame (np.ndarray): O quadro de vídeo (BGR).
+            timestamp (Optional[float]): O instante do quadro, em segundos.
+        """
+        self.add_mask(self.counter._preprocess(frame), timestamp)
+
+    def heatmap(self) -> Optional[np.ndarray]:
+        """
+        Retorna o mapa de ocupação normalizado.
+
+        Returns:
+            Optional[np.ndarray]: A fração (ponderada pelo decaimento) dos quadros em que cada célula esteve
+                em primeiro plano, entre 0 e 1, ou None se nenhum quadro foi acumulado.
+        """
+        if self._acc is None or self.weight == 0.0:
+            return None
+        return self._acc / np.float32(255.0 * self.weight)
+
+    def render(self) -> Optional[np.ndarray]:
+        """Retorna o mapa de ocupação como imagem BGR colorida (COLORMAP_JET), ou None se estiver vazio."""
+        heat = self.heatmap()
+        if heat is None:
+            return None
+        peak = float(heat.max()) or 1.0
+        return cv2.applyColorMap((heat * (255.0 / peak)).astype(np.uint8), cv2.COLORMAP_JET)
+
+    def snapshot(self, path: str) -> Optional[str]:
+        """
+        Grava o mapa de ocupação atual em `<path>.npy` (e `<path>.png`, se `save_png`).
+
+        Args:
+            path (str): O caminho de destino, sem extensão.
+
+        Returns:
+            Optional[str]: O caminho do arquivo .npy, ou None se nenhum quadro foi acumulado.
+        """
+        heat = self.heatmap()
+        if heat is None:
+            return None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Grava em um temporário e renomeia, para que leitores nunca vejam um arquivo incompleto
+        tmp = path + ".tmp.npy"
+        np.save(tmp, heat)
+        os.replace(tmp, path + ".npy")
+        if self.save_png:
+            image = self.render()
+            assert image is not None
+            cv2.imwrite(path + ".tmp.png", image)
+            os.replace(path + ".tmp.png", path + ".png")
+        self.snapshots += 1
+        return path + ".npy"
+
+    def reset(self) -> None:
+        """Zera o acumulador, mantendo os buffers."""
+        if self._acc is not None:
+            self._acc.fill(0.0)
+        self.weight = 0.0
+        self.frames = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna o número de quadros, o peso efetivo, o número de snapshots e o tamanho do mapa."""
+        return {
+            "frames": self.frames,
+            "weight": self.weight,
+            "snapshots": self.snapshots,
+            "shape": None if self._acc is None else self._acc.shape,
+        }
+
+if __name__ == '__main__':
+    import tempfile
+
+    # Simula pessoas atravessando sempre o mesmo corredor diagonal
+    mapa = OccupancyHeatmap(snapshot_dir=tempfile.mkdtemp(), snapshot_interval=10.0)
+    rng = np.random.default_rng(0)
+    quadros = []
+    for i in range(300):
+        frame = np.full((720, 1100, 3), 200, np.uint8)
+        cx, cy = 100 + (i * 3) % 900, 100 + (i * 2) % 500
+        frame[cy:cy + 120, cx:cx + 60] = rng.integers(0, 80, (120, 60, 3), dtype=np.uint8)
+        quadros.append(frame)
+
+    mascaras = [mapa.counter._preprocess(frame) for frame in quadros]
+    inicio = time.perf_counter()
+    for i, mascara in enumerate(mascaras):
+        mapa.add_mask(mascara, timestamp=i / 10)
+    duracao = time.perf_counter() - inicio
+    calor = mapa.heatmap()
+    assert calor is not None
+    print(f"{mapa.stats()} | {duracao / len(mascaras) * 1e6:.0f} us por quadro | pico de ocupação: {calor.max():.2f}")
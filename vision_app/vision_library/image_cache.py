@@ -0,0 +1,134 @@
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+from . import config, utils
+
+CacheKey = Tuple[str, int, int, Optional[float], Optional[Tuple[int, int]]]
+
+class ImageCache:
+    """
+    Cache LRU de imagens decodificadas, limitado por um orçamento de bytes.
+
+    A chave combina o caminho absoluto, a data de modificação (ns) e o tamanho do arquivo com os
+    parâmetros de redução, então um arquivo sobrescrito nunca devolve a imagem antiga. Os arrays
+    guardados são marcados como somente leitura: quem precisar alterar a imagem deve copiá-la.
+    A decodificação acontece fora do lock, para não serializar leituras de arquivos diferentes.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None) -> None:
+        """
+        Inicializa o cache.
+
+        Args:
+            max_bytes (Optional[int]): O total máximo de bytes das imagens guardadas. Padrão de `config.IMAGE_LOADING`.
+        """
+        self.max_bytes: int = max_bytes or config.IMAGE_LOADING["cache_max_bytes"]
+        self._entries: "OrderedDict[CacheKey, Tuple[np.ndarray, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def load(self, path: str, scale: Optional[float] = None,
+             target_size: Optional[Tuple[int, int]] = None) -> Tuple[Optional[np.ndarray], float]:
+        """
+        Retorna a imagem do cache ou a decodifica e a guarda (mesma interface de `utils.load_image_scaled`).
+
+        Args:
+            path (str): O caminho para o arquivo de imagem.
+            scale (Optional[float]): A escala mínima desejada em relação ao original.
+            target_size (Optional[Tuple[int, int]]): O tamanho mínimo desejado (largura, altura).
+
+        Returns:
+            Tuple[Optional[np.ndarray], float]: A imagem em RGB, somente leitura (ou None se o arquivo não for
+                encontrado), e a escala decodificada/original.
+        """
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            print(f"Erro: Arquivo de imagem não encontrado em {path}")
+            return None, 1.0
+        key: CacheKey = (os.path.abspath(path), st.st_mtime_ns, st.st_size, scale,
+                         None if target_size is None else tuple(target_size))  # type: ignore[assignment]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        img, decoded_scale = utils._read_image(path, scale, target_size)
+        if img is None:
+            return None, decoded_scale
+        img.setflags(write=False)
+        if img.nbytes > self.max_bytes:
+            return img, decoded_scale
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (img, decoded_scale)
+                self.bytes += img.nbytes
+                while self.bytes > self.max_bytes:
+                    _, (old, _) = self._entries.popitem(last=False)
+                    self.bytes -= old.nbytes
+                    self.evictions += 1
+            return self._entries.get(key, (img, decoded_scale))
+
+    def clear(self) -> None:
+        """Remove todas as entradas (as estatísticas são mantidas)."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna as estatísticas do cache.
+
+        Returns:
+            Dict[str, Any]: Um dicionário contendo "entries", "bytes", "max_bytes", "hits", "misses",
+                "evictions" e "hit_rate".
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+if __name__ == '__main__':
+    import tempfile
+    import time
+    import cv2
+
+    # Cada imagem é lida três vezes seguidas (detecção, encoding, desenho); orçamento para 12 imagens
+    pasta = tempfile.mkdtemp()
+    rng = np.random.default_rng(0)
+    caminhos = []
+    for i in range(20):
+        caminho = os.path.join(pasta, f"img{i:02d}.jpg")
+        cv2.imwrite(caminho, cv2.resize(rng.integers(0, 255, (120, 160, 3), dtype=np.uint8), (1600, 1200)))
+        caminhos.append(caminho)
+
+    def passadas() -> float:
+        inicio = time.perf_counter()
+        for caminho in caminhos:
+            for _ in range(3):
+                utils.load_image_scaled(caminho, scale=0.5)
+        return time.perf_counter() - inicio
+
+    sem_cache = passadas()
+    cache = utils.enable_image_cache(max_bytes=12 * 800 * 600 * 3)
+    com_cache = passadas()
+    print(f"sem cache: {sem_cache * 1000:.0f} ms | com cache: {com_cache * 1000:.0f} ms | {cache.stats()}")
+    imagem, _ = utils.load_image_scaled(caminhos[-1], scale=0.5)
+    assert imagem is not None and not imagem.flags.writeable
+    utils.disable_image_cache()
@@ -0,0 +1,203 @@
+
+import http.client
+import json
+import socket
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from . import config, utils
+from .inference_server import encode_payload
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """Conexão HTTP sobre um socket Unix."""
+
+    def __init__(self, path: str, timeout: float) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.unix_socket = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_socket)
+
+class InferenceClient:
+    """
+    Cliente do `inference_server.InferenceServer`, com os nomes e as assinaturas das funções locais.
+
+    `locate_faces`/`find_faces` correspondem a `face_detection`, e `get_face_encodings`/`compare_faces`
+    a `face_recognition`; trocar o módulo pelo cliente não muda o código que usa os resultados. O
+    cliente não importa o face_recognition/dlib. Cada thread mantém a sua própria conexão persistente,
+    então uma mesma instância pode ser usada por várias threads.
+    """
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None, unix_socket: Optional[str] = None,
+                 timeout: Optional[float] = None) -> None:
+        """
+        Configura o cliente (a conexão é aberta na primeira requisição).
+
+        Args:
+            host (Optional[str]): O endereço HTTP do servidor. Padrão de `config.INFERENCE_SERVER`.
+            port (Optional[int]): A porta HTTP do servidor.
+            unix_socket (Optional[str]): O caminho do socket Unix do servidor; se definido, substitui host/porta.
+            timeout (Optional[float]): O tempo limite de cada requisição, em segundos.
+        """
+        cfg = config.INFERENCE_SERVER
+        self.host: str = host or cfg["host"]
+        self.port: int = port or cfg["port"]
+        self.unix_socket: Optional[str] = unix_socket or cfg["unix_socket"]
+        self.timeout: float = timeout or cfg["timeout"]
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.unix_socket:
+                conn = _UnixHTTPConnection(self.unix_socket, self.timeout)
+            else:
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _request(self, method: str, route: str, body: Optional[bytes] = None) -> Dict[str, Any]:
+        headers = {"Content-Type": "application/octet-stream"} if body is not None else {}
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, route, body, headers)
+                response = conn.getresponse()
+                data = response.read()
+                break
+            except (ConnectionError, http.client.HTTPException):
+                # Conexão persistente fechada pelo servidor: tenta uma vez com uma nova (as rotas não alteram estado)
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+        result = json.loads(data)
+        if response.status != 200:
+            raise RuntimeError(f"Erro do servidor de inferência ({response.status}): {result.get('error')}")
+        return result
+
+    def _post(self, route: str, **arrays: Any) -> Dict[str, Any]:
+        return self._request("POST", route, encode_payload(**arrays))
+
+    @staticmethod
+    def _face_region(image: np.ndarray, locations: List[tuple]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Recorta a região da imagem que contém os rostos, com uma margem do tamanho de cada rosto.
+
+        Os pontos de referência e o recorte alinhado (com padding de 25%) dependem apenas dos pixels
+        próximos ao rosto, então o resultado é o mesmo da imagem inteira; só a região trafega pelo socket.
+        """
+        boxes = np.asarray(locations, dtype=np.int64).reshape(-1, 4)
+        if boxes.size == 0:
+            return image[:0, :0], boxes
+        top, right, bottom, left = boxes.T
+        margin = np.maximum(bottom - top, right - left)
+        y0, x0 = max(int((top - margin).min()), 0), max(int((left - margin).min()), 0)
+        y1, x1 = int((bottom + margin).max()), int((right + margin).max())
+        return image[y0:y1, x0:x1], boxes - np.array([y0, x0, y0, x0])
+
+    def locate_faces(self, image: np.ndarray) -> List[tuple]:
+        """
+        Encontra todos os rostos em uma imagem já carregada (como `face_detection.locate_faces`).
+
+        Args:
+            image (np.ndarray): A imagem em RGB (array NumPy).
+
+        Returns:
+            List[tuple]: Uma lista de tuplas com as coordenadas (top, right, bottom, left) dos rostos.
+        """
+        return [tuple(location) for location in self._post("/detect", image=image)["locations"]]
+
+    def find_faces(self, image_path: str) -> Tuple[Optional[np.ndarray], List[tuple]]:
+        """
+        Carrega uma imagem localmente e encontra os seus rostos no servidor (como `face_detection.find_faces`).
+
+        Args:
+            image_path (str): O caminho para o arquivo de imagem.
+
+        Returns:
+            Tuple[Optional[np.ndarray], List[tuple]]: A imagem carregada (ou None se não encontrada) e a
+                lista de coordenadas dos rostos.
+        """
+        # Decodificada pelo OpenCV (escala 1.0), sem importar o face_recognition neste processo
+        img, _ = utils.load_image_scaled(image_path, scale=1.0)
+        if img is None:
+            return None, []
+        return img, self.locate_faces(img)
+
+    def get_face_encodings(self, image: np.ndarray, locations: List[tuple]) -> List[np.ndarray]:
+        """
+        Calcula os encodings dos rostos de uma imagem (como `face_recognition.get_face_encodings`).
+
+        Args:
+            image (np.ndarray): A imagem (como array NumPy) contendo os rostos.
+            locations (List[tuple]): Uma lista de coordenadas (top, right, bottom, left) para cada rosto.
+
+        Returns:
+            List[np.ndarray]: Os encodings de 128 dimensões, na mesma ordem de `locations`.
+        """
+        region, boxes = self._face_region(image, locations)
+        result = self._post("/encode", image=region, locations=boxes)
+        return [np.array(encoding) for encoding in result["encodings"]]
+
+    def compare_faces(self, reference_encoding: np.ndarray, test_image: np.ndarray,
+                      test_locations: List[tuple]) -> List[Dict[str, Any]]:
+        """
+        Compara um encoding de referência com os rostos de uma imagem (como `face_recognition.compare_faces`).
+
+        Args:
+            reference_encoding (np.ndarray): O encoding do rosto de referência.
+            test_image (np.ndarray): A imagem de teste (array NumPy).
+            test_locations (List[tuple]): As localizações dos rostos na imagem de teste.
+
+        Returns:
+            List[Dict[str, Any]]: Um dicionário por rosto, com "location", "is_match" e "distance".
+        """
+        region, boxes = self._face_region(test_image, test_locations)
+        result = self._post("/verify", image=region, locations=boxes, reference=reference_encoding)
+        # As localizações retornadas são as originais, não as da região enviada
+        return [dict(r, location=tuple(location)) for r, location in zip(result["results"], test_locations)]
+
+    def identify(self, image: np.ndarray, locations: Optional[List[tuple]] = None) -> List[Dict[str, Any]]:
+        """
+        Identifica os rostos de uma imagem na galeria do servidor.
+
+        Args:
+            image (np.ndarray): A imagem em RGB (array NumPy).
+            locations (Optional[List[tuple]]): As localizações dos rostos; se None, o servidor as detecta.
+
+        Returns:
+            List[Dict[str, Any]]: Um dicionário por rosto, com "location", "identity", "is_match" e "distance".
+        """
+        if locations is None:
+            result = self._post("/identify", image=image)
+            return [dict(r, location=tuple(r["location"])) for r in result["results"]]
+        region, boxes = self._face_region(image, locations)
+        result = self._post("/identify", image=region, locations=boxes)
+        return [dict(r, location=tuple(location)) for r, location in zip(result["results"], locations)]
+
+    def health(self) -> Dict[str, Any]:
+        """Retorna as estatísticas do servidor (veja `InferenceServer.stats`)."""
+        return self._request("GET", "/health")
+
+    def close(self) -> None:
+        """Fecha a conexão da thread atual."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+if __name__ == '__main__':
+    # Requer um servidor em execução: python -m vision_library.inference_server
+    cfg = config.FACE_COMPARISON
+    cliente = InferenceClient()
+    ref_img, ref_locs = cliente.find_faces(cfg["reference_image"])
+    test_img, test_locs = cliente.find_faces(cfg["test_image"])
+    if ref_img is None or test_img is None or not ref_locs:
+        raise SystemExit("Imagens de referência/teste não encontradas ou sem rostos.")
+    ref_encoding = cliente.get_face_encodings(ref_img, ref_locs)[0]
+    for resultado in cliente.compare_faces(ref_encoding, test_img, test_locs):
+        print(resultado)
+    print(cliente.health())
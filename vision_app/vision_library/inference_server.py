@@ -0,0 +1,332 @@
+
+import io
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, List, Optional
+import numpy as np
+from . import config, models
+from .micro_batching import BatchedFaceEncoder
+
+Route = Callable[[Dict[str, np.ndarray]], Dict[str, Any]]
+
+def encode_payload(**arrays: Any) -> bytes:
+    """
+    Serializa os arrays de uma requisição: uma linha JSON com os nomes seguida de um .npy por array.
+
+    O formato .npy (sem pickle) é escrito sem o contêiner zip do .npz, cujo CRC custaria mais que a
+    própria cópia de uma imagem grande.
+
+    Args:
+        **arrays (Any): Os arrays nomeados (ex.: image=..., locations=...); valores None são omitidos.
+
+    Returns:
+        bytes: O corpo da requisição.
+    """
+    names = [name for name, value in arrays.items() if value is not None]
+    parts: List[Any] = [json.dumps(names).encode("utf-8") + b"\n"]
+    for name in names:
+        array = np.ascontiguousarray(arrays[name])
+        header = io.BytesIO()
+        np.lib.format.write_array_header_1_0(header, np.lib.format.header_data_from_array_1_0(array))
+        parts.append(header.getvalue())
+        parts.append(array.reshape(-1).view(np.uint8))
+    return b"".join(parts)
+
+def decode_payload(data: bytes) -> Dict[str, np.ndarray]:
+    """
+    Lê os arrays de uma requisição serializada por `encode_payload`.
+
+    Args:
+        data (bytes): O corpo da requisição.
+
+    Returns:
+        Dict[str, np.ndarray]: Os arrays, pelo nome.
+    """
+    stream = io.BytesIO(data)
+    names = json.loads(stream.readline())
+    return {name: np.lib.format.read_array(stream, allow_pickle=False) for name in names}
+
+class _HTTPServer(ThreadingHTTPServer):
+    """Servidor HTTP com uma thread por conexão, ligado ao `InferenceServer` que atende as rotas."""
+    app: "InferenceServer"
+    # Fila de conexões pendentes; o padrão (5) recusa rajadas de clientes conectando ao mesmo tempo
+    request_queue_size = 128
+
+class _UnixHTTPServer(_HTTPServer):
+    """O mesmo servidor, escutando em um socket Unix."""
+    address_family = socket.AF_UNIX
+
+    def server_bind(self) -> None:
+        # O HTTPServer tentaria resolver o caminho do socket como um nome de host
+        socketserver.TCPServer.server_bind(self)
+        self.server_name, self.server_port = "localhost", 0
+
+class _Handler(BaseHTTPRequestHandler):
+    """Traduz as requisições HTTP para as rotas do `InferenceServer`."""
+    # Conexões persistentes: o cliente reutiliza a mesma conexão entre requisições
+    protocol_version = "HTTP/1.1"
+    # Cabeçalho e corpo da resposta são enviados separadamente; sem Nagle não há espera pelo ACK atrasado
+    disable_nagle_algorithm = True
+    server: _HTTPServer
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._reply(200, self.server.app.stats())
+        else:
+            self._reply(404, {"error": f"Rota desconhecida: {self.path}"})
+
+    def do_POST(self) -> None:
+        app = self.server.app
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > app.max_body_bytes:
+            self.close_connection = True
+            self._reply(413, {"error": f"Requisição maior que o limite de {app.max_body_bytes} bytes."})
+            return
+        body = self.rfile.read(length)
+        route = app.routes.get(self.path)
+        if route is None:
+            self._reply(404, {"error": f"Rota desconhecida: {self.path}"})
+            return
+        start = time.perf_counter()
+        try:
+            result = route(decode_payload(body))
+        except (KeyError, ValueError) as exc:
+            app._record(self.path, time.perf_counter() - start, error=True)
+            self._reply(400, {"error": f"Requisição inválida: {exc}"})
+            return
+        except Exception as exc:
+            app._record(self.path, time.perf_counter() - start, error=True)
+            self._reply(500, {"error": f"{type(exc).__name__}: {exc}"})
+            return
+        app._record(self.path, time.perf_counter() - start)
+        self._reply(200, result)
+
+    def _reply(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Sem uma linha no stderr por requisição; os erros são contados em `InferenceServer.stats`
+        pass
+
+class _UnixHandler(_Handler):
+    disable_nagle_algorithm = False  # TCP_NODELAY não se aplica a sockets Unix
+
+class InferenceServer:
+    """
+    Servidor local de inferência que mantém os modelos carregados entre as chamadas.
+
+    Scripts que usam a biblioteca diretamente pagam a importação do dlib e a carga dos modelos a
+    cada execução; com o servidor, esse custo é pago uma única vez (`models.warmup` ao iniciar) e
+    os clientes (`inference_client.InferenceClient`) enviam apenas as imagens. As rotas são:
+
+    - POST /detect: {"locations": [...]} a partir de "image".
+    - POST /encode: {"encodings": [...]} a partir de "image" e "locations".
+    - POST /verify: {"results": [...]} (como `face_recognition.compare_faces`) a partir de "image",
+      "locations" e "reference".
+    - POST /identify: {"results": [...]} com a busca de cada rosto na galeria, a partir de "image" e,
+      opcionalmente, "locations" (sem elas, os rostos são detectados).
+    - GET /health: as estatísticas de `stats`.
+
+    O corpo das requisições traz os arrays no formato .npy (`encode_payload`) e as respostas são
+    JSON. Cada conexão é atendida em uma thread; os recortes de rosto de requisições simultâneas são agrupados em um
+    micro-lote por chamada ao modelo de encoding (`micro_batching.BatchedFaceEncoder`). A detecção
+    HOG não tem versão em lote, então é executada por requisição, com no máximo `detect_workers`
+    detecções ao mesmo tempo para não disputar as CPUs com o encoding.
+    """
+
+    def __init__(self, gallery: Optional[Any] = None, host: Optional[str] = None, port: Optional[int] = None,
+                 unix_socket: Optional[str] = None, detect_workers: Optional[int] = None,
+                 max_batch_size: Optional[int] = None, max_wait_ms: Optional[float] = None) -> None:
+        """
+        Configura o servidor (nada é carregado até `start`).
+
+        Args:
+            gallery (Optional[Any]): A galeria usada em /identify (qualquer objeto com `search(encoding)`, como
+                `FaceGallery`, `ConcurrentGallery` ou `GalleryStore`). Sem galeria, /identify retorna erro.
+            host (Optional[str]): O endereço HTTP. Padrão de `config.INFERENCE_SERVER`.
+            port (Optional[int]): A porta HTTP (0 escolhe uma porta livre).
+            unix_socket (Optional[str]): O caminho de um socket Unix; se definido, substitui host/porta.
+            detect_workers (Optional[int]): O número máximo de detecções simultâneas.
+            max_batch_size (Optional[int]): O número máximo de recortes por chamada ao modelo de encoding.
+            max_wait_ms (Optional[float]): A espera máxima para juntar requisições em um lote.
+        """
+        cfg = config.INFERENCE_SERVER
+        self.gallery = gallery
+        self.host: str = host or cfg["host"]
+        self.port: int = cfg["port"] if port is None else port
+        self.unix_socket: Optional[str] = unix_socket or cfg["unix_socket"]
+        self.detect_workers: int = detect_workers or cfg["detect_workers"] or os.cpu_count() or 1
+        self.max_batch_size: int = max_batch_size or cfg["max_batch_size"]
+        self.max_wait_ms: float = cfg["max_wait_ms"] if max_wait_ms is None else max_wait_ms
+        self.max_body_bytes: int = cfg["max_body_bytes"]
+        self.routes: Dict[str, Route] = {
+            "/detect": self._detect,
+            "/encode": self._encode,
+            "/verify": self._verify,
+            "/identify": self._identify,
+        }
+        self.warmup_timings: Dict[str, float] = {}
+        self.encoder: Optional[BatchedFaceEncoder] = None
+        self._detect_slots = threading.BoundedSemaphore(self.detect_workers)
+        self._httpd: Optional[_HTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = defaultdict(int)
+        self._errors: Dict[str, int] = defaultdict(int)
+        self._latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=10000))
+
+    @property
+    def address(self) -> str:
+        """O endereço em que o servidor escuta (URL HTTP ou caminho do socket Unix)."""
+        return self.unix_socket if self.unix_socket else f"http://{self.host}:{self.port}"
+
+    def start(self) -> "InferenceServer":
+        """
+        Aquece os modelos, abre o socket e passa a atender em uma thread de fundo.
+
+        Returns:
+            InferenceServer: O próprio servidor, para encadear chamadas.
+        """
+        if self._httpd is not None:
+            raise RuntimeError("O servidor de inferência já foi iniciado.")
+        # Antes de criar qualquer thread (veja `models.warmup`)
+        self.warmup_timings = models.warmup()
+        self.encoder = BatchedFaceEncoder(self.max_batch_size, self.max_wait_ms)
+        if self.unix_socket:
+            if os.path.exists(self.unix_socket):
+                os.unlink(self.unix_socket)  # Socket deixado por uma execução anterior
+            self._httpd = _UnixHTTPServer(self.unix_socket, _UnixHandler)
+        else:
+            self._httpd = _HTTPServer((self.host, self.port), _Handler)
+            self.port = self._httpd.server_address[1]
+        self._httpd.app = self
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="inference-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        """Para de aceitar conexões, encerra o agendador de lotes e remove o socket Unix."""
+        if self._httpd is None:
+            return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        if self.encoder is not None:
+            self.encoder.close()
+        if self.unix_socket and os.path.exists(self.unix_socket):
+            os.unlink(self.unix_socket)
+        self._httpd = None
+
+    def __enter__(self) -> "InferenceServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    @staticmethod
+    def _image(arrays: Dict[str, np.ndarray]) -> np.ndarray:
+        image = arrays["image"]
+        if image.dtype != np.uint8 or image.ndim != 3 or image.shape[2] != 3:
+            raise ValueError("a imagem deve ser um array uint8 (altura, largura, 3) em RGB.")
+        return image
+
+    @staticmethod
+    def _locations(arrays: Dict[str, np.ndarray]) -> List[tuple]:
+        return [tuple(int(v) for v in row) for row in arrays["locations"].reshape(-1, 4)]
+
+    def _locate(self, image: np.ndarray) -> List[tuple]:
+        from . import face_detection
+        with self._detect_slots:
+            return face_detection.locate_faces(image)
+
+    def _detect(self, arrays: Dict[str, np.ndarray]) -> Dict[str, Any]:
+        return {"locations": self._locate(self._image(arrays))}
+
+    def _encode(self, arrays: Dict[str, np.ndarray]) -> Dict[str, Any]:
+        assert self.encoder is not None
+        encodings = self.encoder.encode(self._image(arrays), self._locations(arrays), stream_id="/encode")
+        return {"encodings": [encoding.tolist() for encoding in encodings]}
+
+    def _verify(self, arrays: Dict[str, np.ndarray]) -> Dict[str, Any]:
+        from . import face_recognition
+        assert self.encoder is not None
+        locations = self._locations(arrays)
+        encodings = self.encoder.encode(self._image(arrays), locations, stream_id="/verify")
+        return {"results": face_recognition.match_encodings(arrays["reference"], encodings, locations)}
+
+    def _identify(self, arrays: Dict[str, np.ndarray]) -> Dict[str, Any]:
+        assert self.encoder is not None
+        if self.gallery is None:
+            raise ValueError("o servidor foi iniciado sem uma galeria de identidades.")
+        image = self._image(arrays)
+        locations = self._locations(arrays) if "locations" in arrays else self._locate(image)
+        encodings = self.encoder.encode(image, locations, stream_id="/identify")
+        return {"results": [{"location": location, **self.gallery.search(encoding)}
+                            for location, encoding in zip(locations, encodings)]}
+
+    def _record(self, route: str, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            self._counts[route] += 1
+            if error:
+                self._errors[route] += 1
+            else:
+                self._latencies[route].append(seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna as estatísticas do servidor.
+
+        Returns:
+            Dict[str, Any]: Um dicionário contendo "warm" (modelos aquecidos), "address", "routes" (por rota:
+                "requests", "errors" e p50/p99 do tempo de processamento, em ms, sobre as requisições mais
+                recentes) e "batching" (veja `MicroBatcher.stats`).
+        """
+        with self._lock:
+            snapshot = {route: (self._counts[route], self._errors[route], list(self._latencies[route]))
+                        for route in self._counts}
+        routes = {}
+        for route, (count, errors, latencies) in snapshot.items():
+            ms = np.array(latencies) * 1000.0 if latencies else np.zeros(1)
+            routes[route] = {"requests": count, "errors": errors,
+                             "p50_ms": float(np.percentile(ms, 50)), "p99_ms": float(np.percentile(ms, 99))}
+        return {
+            "warm": models.is_warm(),
+            "address": self.address,
+            "routes": routes,
+            "batching": self.encoder.stats() if self.encoder is not None else {},
+        }
+
+if __name__ == '__main__':
+    import sys
+
+    # Uso: python -m vision_library.inference_server [socket_unix] [diretório_da_galeria]
+    galeria = None
+    if len(sys.argv) > 2:
+        from .gallery_store import GalleryStore
+        galeria = GalleryStore(sys.argv[2])
+    servidor = InferenceServer(gallery=galeria, unix_socket=sys.argv[1] if len(sys.argv) > 1 else None)
+    servidor.start()
+    tempos = ", ".join(f"{etapa} {segundos * 1000:.0f} ms" for etapa, segundos in servidor.warmup_timings.items()
+                       if etapa != "frozen")
+    print(f"Servidor de inferência em {servidor.address} (aquecimento: {tempos})", flush=True)
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.close()
+        if galeria is not None:
+            galeria.close()
@@ -0,0 +1,197 @@
+
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+import numpy as np
+from . import config
+
+class MicroBatcher:
+    """
+    Agrupa requisições de vários fluxos em micro-lotes e executa uma única chamada por lote.
+
+    Um lote é fechado quando atinge `max_batch_size` itens ou quando o item mais antigo espera
+    `max_wait_ms`, o que vier primeiro. Assim o custo fixo de cada chamada é dividido entre os
+    itens do lote, com um limite explícito para a latência adicional.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], max_batch_size: Optional[int] = None,
+                 max_wait_ms: Optional[float] = None, name: str = "micro-batcher") -> None:
+        """
+        Inicia o agendador.
+
+        Args:
+            batch_fn (Callable[[List[Any]], List[Any]]): Função que processa uma lista de itens e retorna
+                um resultado por item, na mesma ordem.
+            max_batch_size (Optional[int]): Número máximo de itens por lote. Padrão de `config.MICRO_BATCHING`.
+            max_wait_ms (Optional[float]): Espera máxima do item mais antigo antes de fechar o lote.
+            name (str): Nome da thread do agendador.
+        """
+        cfg = config.MICRO_BATCHING
+        self.batch_fn = batch_fn
+        self.max_batch_size: int = max_batch_size or cfg["max_batch_size"]
+        self.max_wait: float = (cfg["max_wait_ms"] if max_wait_ms is None else max_wait_ms) / 1000.0
+
+        self._queue: Deque[Tuple[Any, Future, float, Any]] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        # Janelas limitadas, para que as estatísticas não cresçam indefinidamente em serviços longos
+        self._batch_sizes: Deque[int] = deque(maxlen=10000)
+        self._latencies: Dict[Any, Deque[float]] = defaultdict(lambda: deque(maxlen=10000))
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Any, stream_id: Any = None) -> Future:
+        """
+        Enfileira um item para o próximo lote.
+
+        Args:
+            item (Any): O item a processar.
+            stream_id (Any): Identificador do fluxo de origem, usado nas estatísticas.
+
+        Returns:
+            Future: Recebe o resultado do item quando o lote for processado.
+        """
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("O agendador de micro-lotes já foi encerrado.")
+            self._queue.append((item, future, time.perf_counter(), stream_id))
+            if len(self._queue) >= self.max_batch_size or len(self._queue) == 1:
+                self._cond.notify()
+        return future
+
+    def _next_batch(self) -> List[Tuple[Any, Future, float, Any]]:
+        """Aguarda até que um lote esteja completo ou o item mais antigo atinja a espera máxima."""
+        with self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            deadline = self._queue[0][2] + self.max_wait if self._queue else 0.0
+            while len(self._queue) < self.max_batch_size and not self._closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            n = min(len(self._queue), self.max_batch_size)
+            return [self._queue.popleft() for _ in range(n)]
+
+    def _loop(self) -> None:
+        """Laço da thread que monta e executa os lotes."""
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            try:
+                results = self.batch_fn([entry[0] for entry in batch])
+                if len(results) != len(batch):
+                    raise ValueError("batch_fn deve retornar um resultado por item.")
+            except Exception as exc:
+                for _, future, _, _ in batch:
+                    future.set_exception(exc)
+                continue
+            done = time.perf_counter()
+            self._batch_sizes.append(len(batch))
+            for (_, future, submitted, stream_id), result in zip(batch, results):
+                self._latencies[stream_id].append(done - submitted)
+                future.set_result(result)
+
+    def close(self) -> None:
+        """Processa os itens pendentes e encerra a thread do agendador."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna as estatísticas acumuladas.
+
+        Returns:
+            Dict[str, Any]: Um dicionário (sobre os lotes mais recentes) contendo "batches", "items", "mean_batch_size",
+                "latency_ms" (p50/p99 de todos os itens) e "streams" (p99 por fluxo, em ms).
+        """
+        sizes = np.array(self._batch_sizes) if self._batch_sizes else np.zeros(1)
+        per_stream = [(s, list(v)) for s, v in list(self._latencies.items())]
+        all_latencies = [v for _, values in per_stream for v in values]
+        ms = np.array(all_latencies) * 1000.0 if all_latencies else np.zeros(1)
+        return {
+            "batches": len(self._batch_sizes),
+            "items": int(sizes.sum()),
+            "mean_batch_size": float(sizes.mean()),
+            "latency_ms": {"p50": float(np.percentile(ms, 50)), "p99": float(np.percentile(ms, 99))},
+            "streams": {s: float(np.percentile(np.array(v) * 1000.0, 99)) for s, v in per_stream},
+        }
+
+class BatchedFaceEncoder:
+    """
+    Calcula encodings de rostos de muitos fluxos com uma chamada ao modelo por micro-lote.
+
+    O recorte alinhado de cada rosto é feito na thread de quem chama (custo baixo); apenas o
+    cálculo do descritor, que domina o custo, é agrupado entre os fluxos.
+    """
+
+    def __init__(self, max_batch_size: Optional[int] = None, max_wait_ms: Optional[float] = None) -> None:
+        """
+        Inicia o codificador.
+
+        Args:
+            max_batch_size (Optional[int]): Número máximo de recortes por chamada ao modelo.
+            max_wait_ms (Optional[float]): Espera máxima antes de fechar um lote incompleto.
+        """
+        self.batcher = MicroBatcher(self._encode_batch, max_batch_size, max_wait_ms, name="face-encoder")
+
+    @staticmethod
+    def _encode_batch(chips: List[np.ndarray]) -> List[np.ndarray]:
+        from . import face_recognition
+        return face_recognition.encode_face_chips(chips)
+
+    def encode(self, image: np.ndarray, locations: List[tuple], stream_id: Any = None) -> List[np.ndarray]:
+        """
+        Calcula os encodings dos rostos de uma imagem, compartilhando o lote com outros fluxos.
+
+        Args:
+            image (np.ndarray): A imagem (como array NumPy) contendo os rostos.
+            locations (List[tuple]): Uma lista de coordenadas (top, right, bottom, left) para cada rosto.
+            stream_id (Any): Identificador do fluxo de origem.
+
+        Returns:
+            List[np.ndarray]: Os encodings, na mesma ordem de `locations` (como `get_face_encodings`).
+        """
+        from . import face_recognition
+        chips = face_recognition.extract_face_chips(image, locations)
+        futures = [self.batcher.submit(chip, stream_id) for chip in chips]
+        return [f.result() for f in futures]
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna as estatísticas do agendador (veja `MicroBatcher.stats`)."""
+        return self.batcher.stats()
+
+    def close(self) -> None:
+        """Encerra o agendador."""
+        self.batcher.close()
+
+if __name__ == '__main__':
+    # Simula 40 câmeras com um modelo de custo fixo por chamada (5 ms) mais 1 ms por rosto
+    def modelo(itens: List[Any]) -> List[Any]:
+        time.sleep(0.005 + 0.001 * len(itens))
+        return itens
+
+    def camera(batcher: MicroBatcher, stream: int, quadros: int) -> None:
+        for q in range(quadros):
+            batcher.submit(q, stream).result()
+            time.sleep(0.02)
+
+    for tamanho, espera in ((1, 0.0), (8, 2.0), (16, 5.0), (32, 10.0)):
+        batcher = MicroBatcher(modelo, max_batch_size=tamanho, max_wait_ms=espera)
+        inicio = time.perf_counter()
+        threads = [threading.Thread(target=camera, args=(batcher, s, 30)) for s in range(40)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        duracao = time.perf_counter() - inicio
+        batcher.close()
+        st = batcher.stats()
+        print(f"lote<={tamanho:2d} espera={espera:4.1f}ms: {st['items'] / duracao:6.1f} itens/s, "
+              f"lote médio={st['mean_batch_size']:.1f}, p50={st['latency_ms']['p50']:.1f}ms p99={st['latency_ms']['p99']:.1f}ms")
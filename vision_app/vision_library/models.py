@@ -0,0 +1,76 @@
+
+import gc
+import threading
+import time
+from typing import Dict
+import numpy as np
+from . import config
+
+_lock = threading.Lock()
+_warm = False
+
+def is_warm() -> bool:
+    """Indica se `warmup` já foi executado neste processo (ou herdado do processo pai)."""
+    return _warm
+
+def warmup(force: bool = False) -> Dict[str, float]:
+    """
+    Carrega e exercita todos os modelos usados pela biblioteca (detecção HOG, pontos de referência
+    de 5 pontos e a rede de encodings), para que a primeira requisição real não pague esse custo.
+
+    Pode ser chamado no processo pai antes de criar workers com `fork`: os modelos (memória nativa
+    do dlib) são herdados e compartilhados copy-on-write entre os workers. Com `freeze_gc`, os objetos
+    Python existentes são movidos para a geração permanente do coletor (`gc.freeze`), que deixa de
+    escrever nos seus cabeçalhos e, portanto, de duplicar essas páginas nos filhos. A função não cria
+    threads; chame-a antes de iniciar pools de threads no processo pai.
+
+    Args:
+        force (bool): Executa novamente mesmo se os modelos já estiverem aquecidos.
+
+    Returns:
+        Dict[str, float]: Os tempos, em segundos, de "import" (carga dos modelos), "detection", "encoding"
+            e "batch_encoding", além de "frozen" (objetos na geração permanente do GC).
+    """
+    global _warm
+    cfg = config.WARMUP
+    with _lock:
+        if _warm and not force:
+            return {}
+        timings: Dict[str, float] = {}
+
+        start = time.perf_counter()
+        # O face_recognition carrega todos os modelos do dlib ao ser importado
+        from . import face_detection, face_recognition
+        timings["import"] = time.perf_counter() - start
+
+        # Imagem com textura para que o detector e a rede percorram o caminho completo
+        height, width = cfg["image_size"]
+        rng = np.random.default_rng(0)
+        image = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+        box = (height // 4, width // 2 + height // 4, 3 * height // 4, width // 2 - height // 4)
+
+        start = time.perf_counter()
+        face_detection.locate_faces(image)
+        timings["detection"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        face_recognition.get_face_encodings(image, [box])
+        timings["encoding"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        face_recognition.encode_face_chips(face_recognition.extract_face_chips(image, [box, box]))
+        timings["batch_encoding"] = time.perf_counter() - start
+
+        if cfg["freeze_gc"]:
+            gc.collect()
+            gc.freeze()
+        timings["frozen"] = float(gc.get_freeze_count())
+        _warm = True
+        return timings
+
+if __name__ == '__main__':
+    primeira = warmup()
+    segunda = warmup(force=True)
+    for etapa in ("import", "detection", "encoding", "batch_encoding"):
+        print(f"{etapa:15s} primeira: {primeira[etapa] * 1000:8.1f} ms | aquecida: {segunda[etapa] * 1000:8.1f} ms")
+    print(f"objetos congelados no GC: {int(segunda['frozen'])}")
@@ -0,0 +1,201 @@
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+import cv2
+import numpy as np
+from . import config
+from .people_counting import PeopleCounter
+from .realtime import LatestFrameGrabber
+
+class _Stream:
+    """Estado de um fluxo: fonte, contador próprio e estatísticas."""
+
+    def __init__(self, stream_id: str, grabber: LatestFrameGrabber, counter: PeopleCounter,
+                 frame_size: Optional[Tuple[int, int]]) -> None:
+        self.stream_id = stream_id
+        self.grabber = grabber
+        self.counter = counter
+        self.frame_size = frame_size
+        self.in_flight = False
+        self.processed: int = 0
+        self.errors: int = 0
+        self.finished_at: List[float] = []
+        self.recent: Deque[float] = deque(maxlen=64)
+
+class MultiStreamCounter:
+    """
+    Executa vários `PeopleCounter` (um por câmera) sobre um pool fixo de workers.
+
+    Cada fluxo tem uma thread de captura que mantém só o quadro mais recente e um contador próprio,
+    com ROI e limiar independentes. Um despachante percorre os fluxos em rodízio e envia ao pool no
+    máximo um quadro por fluxo de cada vez, o que garante a ordem dos quadros de cada contador e uma
+    divisão justa dos workers; quadros que chegam enquanto o fluxo está ocupado são descartados.
+    """
+
+    def __init__(self, workers: Optional[int] = None) -> None:
+        """
+        Inicializa o executor com as configurações do projeto.
+
+        Args:
+            workers (Optional[int]): O tamanho do pool de workers. Padrão de `config.MULTI_STREAM`.
+        """
+        cfg = config.MULTI_STREAM
+        self.workers: int = workers or cfg["workers"]
+        self._streams: Dict[str, _Stream] = {}
+        self._order: List[str] = []
+        self._next: int = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._slots = threading.Semaphore(self.workers)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._running = False
+
+    def add_stream(self, stream_id: str, source: Union[str, int, Any],
+                   roi_coords: Optional[Tuple[int, int, int, int]] = None, threshold: Optional[int] = None,
+                   frame_size: Optional[Tuple[int, int]] = None) -> bool:
+        """
+        Adiciona uma câmera ou vídeo ao executor.
+
+        Args:
+            stream_id (str): Identificador único do fluxo.
+            source (Union[str, int, Any]): Caminho/URL do vídeo, índice da câmera ou um objeto com `read()`
+                e `release()` (como `cv2.VideoCapture`).
+            roi_coords (Optional[Tuple[int, int, int, int]]): A ROI (x, y, w, h) deste fluxo.
+            threshold (Optional[int]): O limiar de pixels brancos deste fluxo.
+            frame_size (Optional[Tuple[int, int]]): Redimensiona os quadros para (largura, altura) antes da contagem.
+
+        Returns:
+            bool: True se a fonte foi aberta.
+        """
+        capture = cv2.VideoCapture(source) if isinstance(source, (str, int)) else source
+        if isinstance(capture, cv2.VideoCapture) and not capture.isOpened():
+            print(f"Erro ao abrir o fluxo {stream_id}: {source}")
+            return False
+        grabber = LatestFrameGrabber(capture, on_frame=self._wakeup.set)
+        stream = _Stream(stream_id, grabber, PeopleCounter(roi_coords, threshold),
+                         frame_size or config.MULTI_STREAM["frame_size"])
+        with self._lock:
+            self._streams[stream_id] = stream
+            self._order.append(stream_id)
+        self._wakeup.set()
+        return True
+
+    def _process(self, stream: _Stream, frame: np.ndarray) -> None:
+        """Tarefa executada no pool: conta um quadro de um fluxo."""
+        try:
+            if stream.frame_size is not None:
+                frame = cv2.resize(frame, stream.frame_size)
+            stream.counter.count(frame)
+            stream.processed += 1
+            stream.recent.append(time.monotonic())
+        except Exception as exc:
+            print(f"Erro no fluxo {stream.stream_id}: {exc}")
+            stream.errors += 1
+        finally:
+            stream.in_flight = False
+            self._slots.release()
+            self._wakeup.set()
+
+    def _dispatch_loop(self) -> None:
+        """Distribui os quadros disponíveis entre os workers, em rodízio entre os fluxos."""
+        while self._running:
+            self._wakeup.wait(0.5)
+            self._wakeup.clear()
+            with self._lock:
+                order = list(self._order)
+            if not order:
+                continue
+            # Começa em um fluxo diferente a cada passada para não favorecer os primeiros da lista
+            start = self._next % len(order)
+            self._next += 1
+            for stream_id in order[start:] + order[:start]:
+                stream = self._streams[stream_id]
+                if stream.in_flight:
+                    continue
+                latest = stream.grabber.poll()
+                if latest is None:
+                    continue
+                self._slots.acquire()
+                stream.in_flight = True
+                assert self._pool is not None
+                self._pool.submit(self._process, stream, latest[2])
+
+    def start(self) -> "MultiStreamCounter":
+        """Inicia o pool de workers e o despachante."""
+        self._running = True
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="counter")
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="dispatcher", daemon=True)
+        self._dispatcher.start()
+        return self
+
+    def active(self) -> bool:
+        """Indica se algum fluxo ainda está produzindo ou processando quadros."""
+        return any(s.grabber.running or s.in_flight for s in self._streams.values())
+
+    def stop(self) -> None:
+        """Encerra o despachante, as capturas e o pool."""
+        self._running = False
+        self._wakeup.set()
+        if self._dispatcher is not None:
+            self._dispatcher.join()
+        for stream in self._streams.values():
+            stream.grabber.stop()
+        if self._pool is not None:
+            self._pool.shutdown()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna as estatísticas de cada fluxo.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Por fluxo, um dicionário contendo "count", "fps" (quadros
+                processados por segundo, na janela recente), "processed", "dropped" e "errors".
+        """
+        result: Dict[str, Dict[str, Any]] = {}
+        for stream_id, s in list(self._streams.items()):
+            recent = list(s.recent)
+            fps = (len(recent) - 1) / (recent[-1] - recent[0]) if len(recent) > 1 and recent[-1] > recent[0] else 0.0
+            result[stream_id] = {
+                "count": s.counter.contador,
+                "fps": fps,
+                "processed": s.processed,
+                "dropped": s.grabber.dropped,
+                "errors": s.errors,
+            }
+        return result
+
+if __name__ == '__main__':
+    # Simula 60 câmeras de baixa resolução a 15 fps sobre o pool configurado
+    class CameraSintetica:
+        def __init__(self, seed: int, quadros: int) -> None:
+            self.rng = np.random.default_rng(seed)
+            self.restantes = quadros
+
+        def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+            time.sleep(1 / 15)
+            self.restantes -= 1
+            return self.restantes >= 0, self.rng.integers(0, 255, (240, 320, 3), dtype=np.uint8)
+
+        def release(self) -> None:
+            pass
+
+    runner = MultiStreamCounter()
+    for i in range(60):
+        runner.add_stream(f"cam{i:02d}", CameraSintetica(i, 150), roi_coords=(100, 60, 30, 120), threshold=1800)
+    runner.start()
+    inicio = time.perf_counter()
+    while runner.active():
+        time.sleep(0.2)
+    duracao = time.perf_counter() - inicio
+    runner.stop()
+
+    stats = runner.stats()
+    processados = sum(s["processed"] for s in stats.values())
+    descartados = sum(s["dropped"] for s in stats.values())
+    print(f"{len(stats)} fluxos, {runner.workers} workers: {processados / duracao:.0f} quadros/s, {descartados} descartados")
+    for stream_id in list(stats)[:3]:
+        print(f"  {stream_id}: {stats[stream_id]}")
@@ -0,0 +1,167 @@
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import cv2
+import numpy as np
+from . import config, utils
+from .people_counting import PeopleCounter
+
+def _white_pixel_series(path: str, start: int, end: Optional[int], roi_coords: Tuple[int, int, int, int],
+                        threshold: int, frame_size: Optional[Tuple[int, int]]) -> np.ndarray:
+    """Lê os quadros [start, end) do vídeo e retorna a série de pixels brancos da ROI."""
+    video = cv2.VideoCapture(path)
+    if not video.isOpened():
+        raise IOError(f"Erro ao abrir o vídeo: {path}")
+    counter = PeopleCounter(roi_coords, threshold)
+    series: List[int] = []
+    try:
+        if start:
+            video.set(cv2.CAP_PROP_POS_FRAMES, start)
+        while end is None or start + len(series) < end:
+            ret, frame = video.read()
+            if not ret:
+                break
+            if frame_size is not None:
+                frame = cv2.resize(frame, frame_size)
+            series.append(counter.white_pixels(frame))
+    finally:
+        video.release()
+    return np.array(series, dtype=np.int64)
+
+def _simulate(series: np.ndarray, roi_coords: Tuple[int, int, int, int], threshold: int,
+              liberado: bool) -> Tuple[int, bool]:
+    """Aplica a histerese do `PeopleCounter` a uma série, partindo de um estado `liberado` conhecido."""
+    counter = PeopleCounter(roi_coords, threshold)
+    counter.liberado = liberado
+    for brancos in series.tolist():
+        counter.update(brancos)
+    return counter.contador, counter.liberado
+
+def count_chunk(path: str, start: int, end: Optional[int], roi_coords: Tuple[int, int, int, int],
+                threshold: int, frame_size: Optional[Tuple[int, int]]) -> Dict[str, Any]:
+    """
+    Processa um trecho do vídeo em um processo worker.
+
+    Como o estado `liberado` no início do trecho só é conhecido depois dos trechos anteriores, o
+    resultado é calculado para os dois estados iniciais possíveis; a reconciliação escolhe o correto.
+
+    Args:
+        path (str): O caminho para o arquivo de vídeo.
+        start (int): O primeiro quadro do trecho.
+        end (Optional[int]): O quadro final (exclusivo), ou None para ler até o fim do vídeo.
+        roi_coords (Tuple[int, int, int, int]): A ROI (x, y, w, h).
+        threshold (int): O limiar de pixels brancos.
+        frame_size (Optional[Tuple[int, int]]): Redimensiona os quadros para (largura, altura) antes da contagem.
+
+    Returns:
+        Dict[str, Any]: Um dicionário contendo "start", "frames" e "outcomes", que mapeia o estado
+            `liberado` inicial para a tupla (contagem do trecho, `liberado` final).
+    """
+    series = _white_pixel_series(path, start, end, roi_coords, threshold, frame_size)
+    return {
+        "start": start,
+        "frames": int(series.size),
+        "outcomes": {initial: _simulate(series, roi_coords, threshold, initial) for initial in (True, False)},
+    }
+
+def reconcile(chunks: List[Dict[str, Any]], liberado: bool = True) -> Tuple[int, bool]:
+    """
+    Combina os resultados dos trechos, em ordem, propagando o estado `liberado` entre eles.
+
+    Args:
+        chunks (List[Dict[str, Any]]): Os resultados de `count_chunk`, ordenados por "start".
+        liberado (bool): O estado inicial do contador (True, como em `PeopleCounter`).
+
+    Returns:
+        Tuple[int, bool]: A contagem total e o estado `liberado` final, idênticos aos de uma execução sequencial.
+    """
+    total = 0
+    for chunk in chunks:
+        delta, liberado = chunk["outcomes"][liberado]
+        total += delta
+    return total, liberado
+
+def count_video_parallel(path: str, workers: Optional[int] = None, chunks: Optional[int] = None,
+                         roi_coords: Optional[Tuple[int, int, int, int]] = None, threshold: Optional[int] = None,
+                         frame_size: Optional[Tuple[int, int]] = utils.FROM_CONFIG) -> Optional[Dict[str, Any]]:
+    """
+    Conta as pessoas de um vídeo longo dividindo-o em trechos processados em paralelo.
+
+    Cada worker abre o vídeo, posiciona-se no início do seu trecho e calcula a série de pixels brancos.
+    A contagem final é exatamente a mesma de processar o vídeo inteiro com um único `PeopleCounter`.
+
+    Args:
+        path (str): O caminho para o arquivo de vídeo.
+        workers (Optional[int]): O número de processos. Padrão de `config.OFFLINE_COUNTING` (número de CPUs).
+        chunks (Optional[int]): O número de trechos. Padrão: `chunks_per_worker` por worker.
+        roi_coords (Optional[Tuple[int, int, int, int]]): A ROI (x, y, w, h). Padrão de `config.PEOPLE_COUNTING`.
+        threshold (Optional[int]): O limiar de pixels brancos. Padrão de `config.PEOPLE_COUNTING`.
+        frame_size (Optional[Tuple[int, int]]): Redimensiona os quadros para (largura, altura) antes da contagem
+            (None não redimensiona). Padrão de `config.OFFLINE_COUNTING`.
+
+    Returns:
+        Optional[Dict[str, Any]]: Um dicionário contendo "count", "frames", "chunks" e "elapsed", ou None
+            se o vídeo não puder ser aberto.
+    """
+    cfg = config.OFFLINE_COUNTING
+    counting = config.PEOPLE_COUNTING
+    workers = workers or cfg["workers"] or os.cpu_count() or 1
+    chunks = chunks or workers * cfg["chunks_per_worker"]
+    roi_coords = roi_coords or counting["roi_coords"]
+    threshold = counting["threshold"] if threshold is None else threshold
+    frame_size = cfg["frame_size"] if frame_size is utils.FROM_CONFIG else frame_size
+
+    video = utils.load_video(path)
+    if video is None:
+        return None
+    total_frames = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+    video.release()
+
+    start_time = time.perf_counter()
+    # O número de quadros informado pelo contêiner pode ser aproximado: o último trecho lê até o fim
+    bounds = np.linspace(0, max(total_frames, 0), chunks + 1).astype(int)
+    ranges = [(int(bounds[i]), int(bounds[i + 1]) if i + 1 < chunks else None) for i in range(chunks)]
+    ranges = [r for r in ranges if r[1] is None or r[1] > r[0]]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(count_chunk, path, s, e, roi_coords, threshold, frame_size) for s, e in ranges]
+        results = sorted((f.result() for f in futures), key=lambda r: r["start"])
+
+    count, _ = reconcile(results)
+    return {
+        "count": count,
+        "frames": sum(r["frames"] for r in results),
+        "chunks": len(results),
+        "elapsed": time.perf_counter() - start_time,
+    }
+
+if __name__ == '__main__':
+    import sys
+    import tempfile
+
+    cfg = config.PEOPLE_COUNTING
+    caminho = sys.argv[1] if len(sys.argv) > 1 else cfg["video_path"]
+    if not os.path.exists(caminho):
+        # Gera um vídeo sintético com blocos texturizados cruzando a ROI
+        caminho = os.path.join(tempfile.mkdtemp(), "sintetico.avi")
+        writer = cv2.VideoWriter(caminho, cv2.VideoWriter_fourcc(*"MJPG"), 30, (1100, 720))
+        rng = np.random.default_rng(0)
+        x, y, w, h = cfg["roi_coords"]
+        for i in range(1200):
+            frame = np.full((720, 1100, 3), 200, np.uint8)
+            if (i // 20) % 2 == 0:
+                top = y - 80 + (i % 20) * 8
+                frame[max(top, 0):top + 180, x - 10:x + w + 10] = rng.integers(0, 255, (180 + min(top, 0), w + 20, 3), dtype=np.uint8)
+            writer.write(frame)
+        writer.release()
+
+    inicio = time.perf_counter()
+    sequencial = _simulate(_white_pixel_series(caminho, 0, None, cfg["roi_coords"], cfg["threshold"],
+                                               config.OFFLINE_COUNTING["frame_size"]),
+                           cfg["roi_coords"], cfg["threshold"], True)[0]
+    duracao = time.perf_counter() - inicio
+    paralelo = count_video_parallel(caminho)
+    if paralelo is not None:
+        print(f"sequencial: {sequencial} em {duracao:.2f}s | paralelo: {paralelo['count']} em "
+              f"{paralelo['elapsed']:.2f}s ({paralelo['chunks']} trechos, {paralelo['frames']} quadros)")
@@ -0,0 +1,159 @@
+
+import time
+import numpy as np
+from typing import Any, Dict, List, Optional
+from . import config
+
+class OnlineFaceClusterer:
+    """
+    Agrupa, em tempo real, rostos desconhecidos em identidades transitórias.
+
+    Cada identidade transitória guarda um centróide incremental e o instante da última aparição;
+    identidades não vistas há mais de `ttl_seconds` são descartadas. Como a busca percorre apenas as
+    identidades ativas (limitadas pelo TTL), o custo de inserção não cresce com o total de pessoas
+    vistas ao longo do dia.
+    """
+
+    def __init__(self, tolerance: Optional[float] = None, ttl_seconds: Optional[float] = None,
+                 initial_capacity: Optional[int] = None, max_count: Optional[int] = None) -> None:
+        """
+        Inicializa o agrupador com as configurações do projeto.
+
+        Args:
+            tolerance (Optional[float]): Distância máxima para associar um rosto a uma identidade existente.
+            ttl_seconds (Optional[float]): Tempo sem aparições após o qual uma identidade é descartada.
+            initial_capacity (Optional[int]): Número inicial de identidades pré-alocadas.
+            max_count (Optional[int]): Limite do peso do centróide; acima dele a média vira exponencial,
+                permitindo acompanhar mudanças lentas de aparência.
+        """
+        cfg = config.ONLINE_CLUSTERING
+        self.tolerance: float = cfg["tolerance"] if tolerance is None else tolerance
+        self.ttl_seconds: float = cfg["ttl_seconds"] if ttl_seconds is None else ttl_seconds
+        self.max_count: int = max_count or cfg["max_count"]
+        capacity = initial_capacity or cfg["initial_capacity"]
+
+        self._centroids = np.zeros((capacity, 128), dtype=np.float32)
+        self._norms = np.zeros(capacity, dtype=np.float32)
+        self._counts = np.zeros(capacity, dtype=np.int64)
+        self._last_seen = np.zeros(capacity, dtype=np.float64)
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._size: int = 0
+        self._next_id: int = 0
+        self._next_eviction: float = -np.inf
+
+    def __len__(self) -> int:
+        """Retorna o número de identidades transitórias ativas."""
+        return self._size
+
+    def _grow(self) -> None:
+        """Dobra a capacidade dos arrays de identidades."""
+        capacity = self._centroids.shape[0] * 2
+        for name in ("_centroids", "_norms", "_counts", "_last_seen", "_ids"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def evict(self, now: float) -> int:
+        """
+        Remove as identidades cuja última aparição é mais antiga que o TTL.
+
+        Args:
+            now (float): O instante atual, na mesma base de tempo usada em `assign`.
+
+        Returns:
+            int: O número de identidades removidas.
+        """
+        n = self._size
+        keep = self._last_seen[:n] >= now - self.ttl_seconds
+        removed = n - int(np.count_nonzero(keep))
+        if removed:
+            # Compacta as identidades sobreviventes no início dos arrays
+            for arr in (self._centroids, self._norms, self._counts, self._last_seen, self._ids):
+                arr[:n - removed] = arr[:n][keep]
+            self._size = n - removed
+        return removed
+
+    def assign(self, encoding: np.ndarray, timestamp: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Associa um encoding desconhecido a uma identidade transitória, criando uma nova se necessário.
+
+        Args:
+            encoding (np.ndarray): O encoding de 128 dimensões de um rosto sem correspondência na galeria.
+            timestamp (Optional[float]): O instante da observação, em segundos. Padrão: `time.monotonic()`.
+
+        Returns:
+            Dict[str, Any]: Um dicionário contendo:
+                - "identity": O identificador da identidade transitória.
+                - "is_new": True se a identidade acabou de ser criada.
+                - "visits": O número de vezes que a identidade foi vista.
+                - "distance": A distância ao centróide (0.0 para identidades novas).
+        """
+        now = time.monotonic() if timestamp is None else timestamp
+        if now >= self._next_eviction:
+            # A varredura de expiração é feita no máximo algumas vezes por TTL, amortizando seu custo
+            self.evict(now)
+            self._next_eviction = now + self.ttl_seconds / 8.0
+
+        x = np.asarray(encoding, dtype=np.float32)
+        n = self._size
+        if n:
+            d2 = self._norms[:n] - 2.0 * (self._centroids[:n] @ x) + float(x @ x)
+            # Identidades expiradas que ainda não foram removidas pela varredura não podem ser escolhidas
+            d2[self._last_seen[:n] < now - self.ttl_seconds] = np.inf
+            best = int(np.argmin(d2))
+            distance = float(np.sqrt(max(float(d2[best]), 0.0)))
+            if distance <= self.tolerance:
+                count = min(int(self._counts[best]) + 1, self.max_count)
+                self._centroids[best] += (x - self._centroids[best]) / count
+                self._norms[best] = self._centroids[best] @ self._centroids[best]
+                self._counts[best] += 1
+                self._last_seen[best] = now
+                return {"identity": int(self._ids[best]), "is_new": False,
+                        "visits": int(self._counts[best]), "distance": distance}
+
+        if n == self._centroids.shape[0]:
+            self._grow()
+        self._centroids[n] = x
+        self._norms[n] = x @ x
+        self._counts[n] = 1
+        self._last_seen[n] = now
+        self._ids[n] = self._next_id
+        self._size = n + 1
+        self._next_id += 1
+        return {"identity": int(self._ids[n]), "is_new": True, "visits": 1, "distance": 0.0}
+
+    def assign_unmatched(self, encodings: List[np.ndarray], results: List[Dict[str, Any]],
+                         timestamp: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Envia ao agrupador os rostos que não corresponderam à galeria.
+
+        Args:
+            encodings (List[np.ndarray]): Os encodings dos rostos de teste, na mesma ordem de `results`.
+            results (List[Dict[str, Any]]): Os resultados de `face_recognition.compare_faces`.
+            timestamp (Optional[float]): O instante da observação, em segundos.
+
+        Returns:
+            List[Dict[str, Any]]: Os resultados recebidos; os rostos sem correspondência ganham a chave
+                "transient", com o retorno de `assign`.
+        """
+        for encoding, result in zip(encodings, results):
+            if not result["is_match"]:
+                result["transient"] = self.assign(encoding, timestamp)
+        return results
+
+if __name__ == '__main__':
+    # Simula um dia de visitantes: cada pessoa aparece por alguns segundos e algumas retornam
+    rng = np.random.default_rng(0)
+    clusterer = OnlineFaceClusterer(ttl_seconds=600)
+    pessoas = rng.normal(0, 0.15, (5000, 128)).astype(np.float32)
+
+    inicio = time.perf_counter()
+    reconhecidos = 0
+    for t in range(50000):
+        pessoa = min(t // 10, 4999) if rng.random() > 0.05 else max(t // 10 - int(rng.integers(1, 30)), 0)
+        result = clusterer.assign(pessoas[pessoa] + rng.normal(0, 0.02, 128), timestamp=t * 0.5)
+        reconhecidos += not result["is_new"]
+    duracao = time.perf_counter() - inicio
+    print(f"{len(clusterer)} identidades ativas, {reconhecidos} reconhecimentos, "
+          f"{duracao / 50000 * 1e6:.1f} us por inserção")
@@ -1,17 +1,28 @@
 
 import cv2
 import numpy as np
-from typing import Tuple
+from typing import Any, Optional, Tuple
 from . import utils, config
 
 class PeopleCounter:
     """Processa quadros de vídeo para contar pessoas que cruzam uma região de interesse (ROI)."""
     
-    def __init__(self) -> None:
-        """Inicializa o contador com as configurações do projeto."""
+    def __init__(self, roi_coords: Optional[Tuple[int, int, int, int]] = None, threshold: Optional[int] = None,
+                 hysteresis: Optional[int] = None) -> None:
+        """
+        Inicializa o contador com as configurações do projeto.
+
+        Args:
+            roi_coords (Optional[Tuple[int, int, int, int]]): Sobrescreve a ROI (x, y, w, h) da configuração.
+            threshold (Optional[int]): Sobrescreve o limiar de pixels brancos da configuração.
+            hysteresis (Optional[int]): Sobrescreve a margem de histerese: o contador só é liberado
+                novamente abaixo de `threshold - hysteresis`.
+        """
         cfg = config.PEOPLE_COUNTING
-        self.roi_coords: Tuple[int, int, int, int] = cfg["roi_coords"]
-        self.threshold: int = cfg["threshold"]
+        self.roi_coords: Tuple[int, int, int, int] = roi_coords or cfg["roi_coords"]
+        self.threshold: int = cfg["threshold"] if threshold is None else threshold
+        self.hysteresis: int = cfg.get("hysteresis", 0) if hysteresis is None else hysteresis
+        self.pad: int = cfg.get("pad", 13)
         self.font: int = eval(cfg.get("font", "cv2.FONT_HERSHEY_SIMPLEX"))
         
         self.contador: int = 0
@@ -24,6 +35,67 @@ class PeopleCounter:
         kernel = np.ones((8, 8), np.uint8)
         return cv2.dilate(img_th, kernel, iterations=2)
 
+    def white_pixels(self, frame: np.ndarray) -> int:
+        """
+        Conta os pixels brancos da ROI no quadro pré-processado.
+
+        Apenas a ROI ampliada pela margem `pad` é pré-processada; com a margem padrão o resultado é
+        idêntico ao de pré-processar o quadro inteiro.
+
+        Args:
+            frame (np.ndarray): O quadro de vídeo (BGR).
+
+        Returns:
+            int: O número de pixels brancos dentro da ROI.
+        """
+        x0, y0, x1, y1 = utils.padded_roi(self.roi_coords, self.pad, frame.shape)
+        return self.white_pixels_crop(frame[y0:y1, x0:x1], (x0, y0))
+
+    def white_pixels_crop(self, crop: np.ndarray, origin: Tuple[int, int]) -> int:
+        """
+        Conta os pixels brancos da ROI a partir de um recorte do quadro que a contém.
+
+        Args:
+            crop (np.ndarray): O recorte do quadro (BGR), com margem suficiente em volta da ROI.
+            origin (Tuple[int, int]): A posição (x, y) do canto superior esquerdo do recorte no quadro.
+
+        Returns:
+            int: O número de pixels brancos dentro da ROI.
+        """
+        x, y, w, h = self.roi_coords
+        img_dil = self._preprocess(crop)
+        recorte = img_dil[y - origin[1]:y - origin[1] + h, x - origin[0]:x - origin[0] + w]
+        return cv2.countNonZero(recorte)
+
+    def update(self, brancos: int) -> int:
+        """
+        Atualiza a contagem a partir do número de pixels brancos da ROI (histerese de `liberado`).
+
+        Args:
+            brancos (int): O número de pixels brancos da ROI no quadro atual.
+
+        Returns:
+            int: A contagem atual.
+        """
+        if brancos > self.threshold and self.liberado:
+            self.contador += 1
+            self.liberado = False
+        elif brancos < self.threshold - self.hysteresis:
+            self.liberado = True
+        return self.contador
+
+    def count(self, frame: np.ndarray) -> int:
+        """
+        Processa um quadro e atualiza a contagem, sem desenhar anotações.
+
+        Args:
+            frame (np.ndarray): O quadro de vídeo a ser processado.
+
+        Returns:
+            int: A contagem atual.
+        """
+        return self.update(self.white_pixels(frame))
+
     def process_frame(self, frame: np.ndarray) -> Tuple[np.ndarray, int]:
         """
         Processa um único quadro de vídeo, atualiza a contagem e retorna o quadro com anotações.
@@ -37,16 +109,7 @@ class PeopleCounter:
         x, y, w, h = self.roi_coords
         frame_processed = frame.copy()
         
-        img_dil = self._preprocess(frame)
-        
-        recorte = img_dil[y:y+h, x:x+w]
-        brancos = cv2.countNonZero(recorte)
-        
-        if brancos > self.threshold and self.liberado:
-            self.contador += 1
-            self.liberado = False
-        elif brancos < self.threshold:
-            self.liberado = True
+        self.count(frame)
         
         cor = (0, 255, 0) if not self.liberado else (255, 0, 255)
         cv2.rectangle(frame_processed, (x, y), (x + w, y + h), cor, 4)
@@ -54,13 +117,39 @@ class PeopleCounter:
 
         return frame_processed, self.contador
 
+def create_counter(engine: Optional[str] = None) -> Any:
+    """
+    Cria o contador definido em `config.PEOPLE_COUNTING["engine"]`.
+
+    Todos os motores expõem `count(frame)`, `process_frame(frame)` e o atributo `contador`.
+
+    Args:
+        engine (Optional[str]): Sobrescreve o motor da configuração ("threshold", "timed", "background" ou "line_profile").
+
+    Returns:
+        Any: Uma instância de `PeopleCounter`, `TimedPeopleCounter`, `BackgroundSubtractionCounter` ou `LineProfileCounter`.
+    """
+    engine = engine or config.PEOPLE_COUNTING.get("engine", "threshold")
+    if engine == "threshold":
+        return PeopleCounter()
+    if engine == "timed":
+        from .timed_counting import TimedPeopleCounter
+        return TimedPeopleCounter()
+    if engine == "background":
+        from .background_counting import BackgroundSubtractionCounter
+        return BackgroundSubtractionCounter()
+    if engine == "line_profile":
+        from .line_counting import LineProfileCounter
+        return LineProfileCounter()
+    raise ValueError(f"Motor de contagem inválido: {engine}")
+
 # Bloco de teste permanece o mesmo
 if __name__ == '__main__':
     cfg = config.PEOPLE_COUNTING
     video = utils.load_video(cfg["video_path"])
     
     if video:
-        counter = PeopleCounter()
+        counter = create_counter()
         
         while True:
             ret, frame = video.read()
@@ -0,0 +1,268 @@
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+import cv2
+import numpy as np
+from . import config
+
+class LatestFrameGrabber:
+    """
+    Lê uma câmera (ou vídeo) em uma thread própria e mantém apenas o quadro mais recente.
+
+    Quadros que chegam antes do anterior ser consumido são descartados, de modo que o consumidor
+    sempre analisa o quadro mais novo disponível e o atraso não se acumula.
+    """
+
+    def __init__(self, capture: cv2.VideoCapture, on_frame: Optional[Callable[[], None]] = None) -> None:
+        """
+        Inicia a leitura em segundo plano.
+
+        Args:
+            capture (cv2.VideoCapture): A fonte de vídeo já aberta (ex.: `utils.load_video`).
+            on_frame (Optional[Callable[[], None]]): Chamada a cada quadro novo e no fim da fonte,
+                para acordar consumidores que atendem várias fontes.
+        """
+        self.capture = capture
+        self.on_frame = on_frame
+        self.captured: int = 0
+        self.dropped: int = 0
+        self._latest: Optional[Tuple[int, float, np.ndarray]] = None
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name="frame-grabber", daemon=True)
+        self._thread.start()
+
+    def _loop(self) -> None:
+        """Laço de captura."""
+        while self._running:
+            ret, frame = self.capture.read()
+            captured_at = time.monotonic()
+            with self._cond:
+                if not ret:
+                    self._running = False
+                    self._cond.notify_all()
+                else:
+                    if self._latest is not None:
+                        self.dropped += 1
+                    self._latest = (self.captured, captured_at, frame)
+                    self.captured += 1
+                    self._cond.notify_all()
+            if self.on_frame is not None:
+                self.on_frame()
+            if not ret:
+                return
+
+    def poll(self) -> Optional[Tuple[int, float, np.ndarray]]:
+        """Retorna o quadro mais recente ainda não consumido, sem esperar (None se não houver)."""
+        with self._cond:
+            latest, self._latest = self._latest, None
+            return latest
+
+    def read(self, timeout: Optional[float] = None) -> Optional[Tuple[int, float, np.ndarray]]:
+        """
+        Retorna o quadro mais recente ainda não consumido, aguardando se necessário.
+
+        Args:
+            timeout (Optional[float]): Tempo máximo de espera, em segundos.
+
+        Returns:
+            Optional[Tuple[int, float, np.ndarray]]: (índice, instante da captura, quadro), ou None se a
+                fonte terminou ou o tempo de espera esgotou.
+        """
+        with self._cond:
+            if self._latest is None and self._running:
+                self._cond.wait(timeout)
+            latest, self._latest = self._latest, None
+            return latest
+
+    @property
+    def running(self) -> bool:
+        """Indica se a fonte ainda está produzindo quadros."""
+        return self._running
+
+    def stop(self) -> None:
+        """Encerra a captura e libera a fonte."""
+        self._running = False
+        self._thread.join()
+        self.capture.release()
+
+class RealtimeProcessor:
+    """
+    Processa sempre o quadro mais recente e controla a latência captura-resultado.
+
+    A latência de cada quadro é medida desde a captura até o fim da análise. Quando o percentil 95
+    da janela recente ultrapassa o SLO, a resolução de detecção é reduzida e, no limite, a detecção
+    passa a rodar só a cada N quadros (os quadros intermediários reaproveitam o último resultado).
+    Quando a latência volta a ficar folgada, a qualidade é restaurada aos poucos.
+    """
+
+    def __init__(self, analyze: Callable[[np.ndarray, float], Any], slo_ms: Optional[float] = None,
+                 min_scale: Optional[float] = None, max_interval: Optional[int] = None,
+                 window: Optional[int] = None) -> None:
+        """
+        Inicializa o processador com as configurações do projeto.
+
+        Args:
+            analyze (Callable[[np.ndarray, float], Any]): Função de análise que recebe o quadro BGR e a
+                escala de detecção (1.0 = resolução original) e retorna os resultados do quadro.
+            slo_ms (Optional[float]): A latência alvo captura-resultado, em milissegundos.
+            min_scale (Optional[float]): A menor escala de detecção permitida.
+            max_interval (Optional[int]): O maior intervalo entre detecções, em quadros.
+            window (Optional[int]): O número de quadros usados para avaliar a latência recente.
+        """
+        cfg = config.REALTIME
+        self.analyze = analyze
+        self.slo: float = (slo_ms or cfg["slo_ms"]) / 1000.0
+        self.min_scale: float = min_scale or cfg["min_scale"]
+        self.max_interval: int = max_interval or cfg["max_interval"]
+        self.recover_ratio: float = cfg["recover_ratio"]
+        self.window: int = window or cfg["window"]
+
+        self.scale: float = 1.0
+        self.interval: int = 1
+        self.processed: int = 0
+        self.slo_violations: int = 0
+        self._latencies: Deque[float] = deque(maxlen=self.window)
+        self._history: Deque[float] = deque(maxlen=100000)
+        self._last_results: Any = None
+        self._since_adjust: int = 0
+
+    def _adapt(self) -> None:
+        """Ajusta escala e frequência de detecção de acordo com a latência recente."""
+        self._since_adjust += 1
+        if self._since_adjust < self.window // 2:
+            return
+        p95 = float(np.percentile(self._latencies, 95))
+        if p95 > self.slo:
+            if self.scale > self.min_scale:
+                self.scale = max(self.min_scale, self.scale * 0.75)
+            elif self.interval < self.max_interval:
+                self.interval += 1
+            else:
+                return
+        elif p95 < self.slo * self.recover_ratio:
+            if self.interval > 1:
+                self.interval -= 1
+            elif self.scale < 1.0:
+                self.scale = min(1.0, self.scale / 0.75)
+            else:
+                return
+        else:
+            return
+        self._since_adjust = 0
+        self._latencies.clear()
+
+    def process(self, index: int, captured_at: float, frame: np.ndarray) -> Dict[str, Any]:
+        """
+        Analisa um quadro (ou reaproveita o último resultado, se a detecção estiver espaçada).
+
+        Args:
+            index (int): O índice do quadro na fonte.
+            captured_at (float): O instante da captura, em `time.monotonic()`.
+            frame (np.ndarray): O quadro BGR.
+
+        Returns:
+            Dict[str, Any]: Um dicionário contendo "index", "results", "detected" (se houve detecção neste
+                quadro), "scale", "interval" e "latency_ms" (captura até resultado).
+        """
+        detected = self.processed % self.interval == 0 or self._last_results is None
+        if detected:
+            self._last_results = self.analyze(frame, self.scale)
+        latency = time.monotonic() - captured_at
+        self.processed += 1
+        self._latencies.append(latency)
+        self._history.append(latency)
+        if latency > self.slo:
+            self.slo_violations += 1
+        result = {
+            "index": index,
+            "results": self._last_results,
+            "detected": detected,
+            "scale": self.scale,
+            "interval": self.interval,
+            "latency_ms": latency * 1000.0,
+        }
+        self._adapt()
+        return result
+
+    def run(self, grabber: LatestFrameGrabber) -> Iterator[Dict[str, Any]]:
+        """
+        Processa a fonte até o fim, sempre pegando o quadro mais recente.
+
+        Args:
+            grabber (LatestFrameGrabber): A fonte de quadros.
+
+        Returns:
+            Iterator[Dict[str, Any]]: Os resultados de cada quadro analisado, como em `process`.
+        """
+        while True:
+            latest = grabber.read(timeout=1.0)
+            if latest is None:
+                if not grabber.running:
+                    return
+                continue
+            yield self.process(*latest)
+
+    def latency_stats(self) -> Dict[str, float]:
+        """Retorna os percentis de latência (ms) dos últimos quadros processados e a taxa de violações do SLO."""
+        if not self._history:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0, "slo_violation_rate": 0.0}
+        ms = np.array(self._history) * 1000.0
+        return {
+            "p50": float(np.percentile(ms, 50)),
+            "p95": float(np.percentile(ms, 95)),
+            "p99": float(np.percentile(ms, 99)),
+            "max": float(ms.max()),
+            "slo_violation_rate": self.slo_violations / self.processed,
+        }
+
+def face_analyzer(reference_encoding: np.ndarray) -> Callable[[np.ndarray, float], List[Dict[str, Any]]]:
+    """
+    Cria uma função de análise para `RealtimeProcessor` que detecta e compara rostos com uma referência.
+
+    Args:
+        reference_encoding (np.ndarray): O encoding do rosto de referência.
+
+    Returns:
+        Callable[[np.ndarray, float], List[Dict[str, Any]]]: A função de análise; as localizações dos
+            resultados ficam nas coordenadas do quadro original.
+    """
+    from . import face_detection, face_recognition
+
+    def analyze(frame: np.ndarray, scale: float) -> List[Dict[str, Any]]:
+        small = cv2.resize(frame, None, fx=scale, fy=scale) if scale != 1.0 else frame
+        rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+        locations = face_detection.locate_faces(rgb)
+        encodings = face_recognition.get_face_encodings(rgb, locations)
+        original = [tuple(int(round(v / scale)) for v in loc) for loc in locations]
+        return face_recognition.match_encodings(reference_encoding, encodings, original)
+
+    return analyze
+
+if __name__ == '__main__':
+    # Simula uma câmera a 30 fps e uma análise cujo custo cresce com a área analisada
+    class CameraSintetica:
+        def __init__(self, quadros: int) -> None:
+            self.restantes = quadros
+
+        def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+            time.sleep(1 / 30)
+            self.restantes -= 1
+            return self.restantes >= 0, np.zeros((720, 1280, 3), np.uint8)
+
+        def release(self) -> None:
+            pass
+
+    def analise_lenta(frame: np.ndarray, scale: float) -> List[Any]:
+        time.sleep(0.12 * scale * scale)
+        return []
+
+    grabber = LatestFrameGrabber(CameraSintetica(300))  # type: ignore[arg-type]
+    processor = RealtimeProcessor(analise_lenta, slo_ms=80)
+    for r in processor.run(grabber):
+        pass
+    print(f"capturados={grabber.captured} descartados={grabber.dropped} processados={processor.processed}")
+    print(f"escala final={processor.scale:.2f} intervalo={processor.interval}")
+    print(processor.latency_stats())
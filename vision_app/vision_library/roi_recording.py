@@ -0,0 +1,283 @@
+
+import json
+import struct
+import time
+import zlib
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+import cv2
+import numpy as np
+from . import config, utils
+from .people_counting import PeopleCounter
+
+_MAGIC = b"ROIREC1\n"
+_META = struct.Struct("<I")      # tamanho do cabeçalho JSON
+_CHUNK = struct.Struct("<IBII")  # quadros, compactado, tamanho e CRC32 do payload
+
+class RoiRecorder:
+    """
+    Grava apenas os recortes da ROI ampliada (e os seus instantes) de um fluxo de vídeo.
+
+    O arquivo começa com um cabeçalho JSON (ROI, origem e forma do recorte) seguido de blocos
+    independentes de `chunk_frames` quadros, cada um com CRC32 e opcionalmente compactado com zlib.
+    Um bloco incompleto no final (gravação interrompida) é ignorado na leitura.
+    """
+
+    def __init__(self, path: str, roi_coords: Optional[Tuple[int, int, int, int]] = None, pad: Optional[int] = None,
+                 compress: Optional[bool] = None, chunk_frames: Optional[int] = None) -> None:
+        """
+        Abre o arquivo de gravação.
+
+        Args:
+            path (str): O caminho do arquivo a ser criado.
+            roi_coords (Optional[Tuple[int, int, int, int]]): A ROI (x, y, w, h). Padrão de `config.PEOPLE_COUNTING`.
+            pad (Optional[int]): A margem gravada em volta da ROI. Padrão de `config.ROI_RECORDING`.
+            compress (Optional[bool]): Compacta os blocos com zlib. Padrão de `config.ROI_RECORDING`.
+            chunk_frames (Optional[int]): Quadros por bloco. Padrão de `config.ROI_RECORDING`.
+        """
+        cfg = config.ROI_RECORDING
+        self.path = path
+        self.roi_coords: Tuple[int, int, int, int] = roi_coords or config.PEOPLE_COUNTING["roi_coords"]
+        self.pad: int = cfg["pad"] if pad is None else pad
+        self.compress: bool = cfg["compress"] if compress is None else compress
+        self.level: int = cfg["level"]
+        self.chunk_frames: int = chunk_frames or cfg["chunk_frames"]
+        self.frames: int = 0
+        self.bytes_written: int = 0
+
+        self._file: Optional[BinaryIO] = open(path, "wb")
+        self._bounds: Optional[Tuple[int, int, int, int]] = None
+        self._frame_shape: Optional[Tuple[int, ...]] = None
+        self._crops: Optional[np.ndarray] = None
+        self._timestamps = np.empty(self.chunk_frames, dtype="<f8")
+        self._pending: int = 0
+
+    def _start(self, frame: np.ndarray) -> None:
+        """Fixa a região gravada a partir do primeiro quadro e escreve o cabeçalho."""
+        assert self._file is not None
+        self._frame_shape = frame.shape
+        self._bounds = utils.padded_roi(self.roi_coords, self.pad, frame.shape)
+        x0, y0, x1, y1 = self._bounds
+        crop_shape = (y1 - y0, x1 - x0) + frame.shape[2:]
+        self._crops = np.empty((self.chunk_frames,) + crop_shape, dtype=np.uint8)
+        meta = json.dumps({
+            "roi_coords": list(self.roi_coords),
+            "pad": self.pad,
+            "origin": [x0, y0],
+            "crop_shape": list(crop_shape),
+            "frame_shape": list(frame.shape),
+        }).encode("utf-8")
+        self._file.write(_MAGIC + _META.pack(len(meta)) + meta)
+        self.bytes_written += len(_MAGIC) + _META.size + len(meta)
+
+    def write(self, frame: np.ndarray, timestamp: Optional[float] = None) -> None:
+        """
+        Grava o recorte da ROI de um quadro.
+
+        Args:
+            frame (np.ndarray): O quadro de vídeo (BGR, uint8). Todos os quadros devem ter a mesma resolução.
+            timestamp (Optional[float]): O instante do quadro, em segundos. Padrão: `time.time()`.
+        """
+        if self._file is None:
+            raise RuntimeError("O gravador de recortes já foi fechado.")
+        if self._bounds is None:
+            self._start(frame)
+        elif frame.shape != self._frame_shape:
+            raise ValueError(f"Resolução diferente da gravação: {frame.shape} != {self._frame_shape}")
+        assert self._bounds is not None and self._crops is not None
+        x0, y0, x1, y1 = self._bounds
+        self._crops[self._pending] = frame[y0:y1, x0:x1]
+        self._timestamps[self._pending] = time.time() if timestamp is None else timestamp
+        self._pending += 1
+        self.frames += 1
+        if self._pending == self.chunk_frames:
+            self.flush()
+
+    def flush(self) -> None:
+        """Escreve os quadros pendentes como um bloco."""
+        if self._file is None or not self._pending:
+            return
+        assert self._crops is not None
+        n = self._pending
+        payload = self._timestamps[:n].tobytes() + self._crops[:n].tobytes()
+        if self.compress:
+            payload = zlib.compress(payload, self.level)
+        self._file.write(_CHUNK.pack(n, int(self.compress), len(payload), zlib.crc32(payload)) + payload)
+        self.bytes_written += _CHUNK.size + len(payload)
+        self._pending = 0
+
+    def close(self) -> None:
+        """Escreve o último bloco e fecha o arquivo."""
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._file = None
+
+    def __enter__(self) -> "RoiRecorder":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+class RoiReader:
+    """Lê um arquivo gravado por `RoiRecorder`, bloco a bloco."""
+
+    def __init__(self, path: str) -> None:
+        """
+        Abre o arquivo e lê o cabeçalho.
+
+        Args:
+            path (str): O caminho do arquivo de recortes.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            magic = f.read(len(_MAGIC))
+            if magic != _MAGIC:
+                raise IOError(f"Arquivo de recortes inválido: {path}")
+            (size,) = _META.unpack(f.read(_META.size))
+            self.meta: Dict[str, Any] = json.loads(f.read(size).decode("utf-8"))
+            self._data_offset = f.tell()
+        self.roi_coords: Tuple[int, int, int, int] = tuple(self.meta["roi_coords"])  # type: ignore[assignment]
+        self.origin: Tuple[int, int] = tuple(self.meta["origin"])  # type: ignore[assignment]
+        self.crop_shape: Tuple[int, ...] = tuple(self.meta["crop_shape"])
+
+    def chunks(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Percorre os blocos íntegros do arquivo.
+
+        Returns:
+            Iterator[Tuple[np.ndarray, np.ndarray]]: Para cada bloco, os instantes (n,) e os recortes
+                (n, altura, largura, canais). Os arrays são somente leitura.
+        """
+        frame_bytes = int(np.prod(self.crop_shape))
+        with open(self.path, "rb") as f:
+            f.seek(self._data_offset)
+            while True:
+                header = f.read(_CHUNK.size)
+                if len(header) < _CHUNK.size:
+                    return
+                n, compressed, size, crc = _CHUNK.unpack(header)
+                payload = f.read(size)
+                if len(payload) < size or zlib.crc32(payload) != crc:
+                    return
+                if compressed:
+                    payload = zlib.decompress(payload)
+                timestamps = np.frombuffer(payload, dtype="<f8", count=n)
+                crops = np.frombuffer(payload, dtype=np.uint8, count=n * frame_bytes, offset=8 * n)
+                yield timestamps, crops.reshape((n,) + self.crop_shape)
+
+    def __iter__(self) -> Iterator[Tuple[float, np.ndarray]]:
+        """Percorre os quadros gravados como pares (instante, recorte)."""
+        for timestamps, crops in self.chunks():
+            for timestamp, crop in zip(timestamps.tolist(), crops):
+                yield timestamp, crop
+
+def record_video(video_path: str, output_path: str, roi_coords: Optional[Tuple[int, int, int, int]] = None,
+                 frame_size: Optional[Tuple[int, int]] = utils.FROM_CONFIG, **kwargs: Any) -> Optional[Dict[str, Any]]:
+    """
+    Decodifica um vídeo uma vez e grava os recortes da ROI, com os instantes de cada quadro.
+
+    Args:
+        video_path (str): O caminho para o arquivo de vídeo.
+        output_path (str): O caminho do arquivo de recortes.
+        roi_coords (Optional[Tuple[int, int, int, int]]): A ROI (x, y, w, h). Padrão de `config.PEOPLE_COUNTING`.
+        frame_size (Optional[Tuple[int, int]]): Redimensiona os quadros para (largura, altura) antes de recortar
+            (None não redimensiona). Padrão de `config.OFFLINE_COUNTING`.
+        **kwargs: Repassados para `RoiRecorder` (pad, compress, chunk_frames).
+
+    Returns:
+        Optional[Dict[str, Any]]: Um dicionário contendo "frames", "bytes" e "elapsed", ou None se o vídeo
+            não puder ser aberto.
+    """
+    frame_size = config.OFFLINE_COUNTING["frame_size"] if frame_size is utils.FROM_CONFIG else frame_size
+    video = utils.load_video(video_path)
+    if video is None:
+        return None
+    start_time = time.perf_counter()
+    try:
+        with RoiRecorder(output_path, roi_coords, **kwargs) as recorder:
+            while True:
+                ret, frame = video.read()
+                if not ret:
+                    break
+                if frame_size is not None:
+                    frame = cv2.resize(frame, frame_size)
+                recorder.write(frame, video.get(cv2.CAP_PROP_POS_MSEC) / 1000.0)
+    finally:
+        video.release()
+    return {"frames": recorder.frames, "bytes": recorder.bytes_written, "elapsed": time.perf_counter() - start_time}
+
+def recount(path: str, counter: Optional[PeopleCounter] = None) -> Dict[str, Any]:
+    """
+    Refaz o pré-processamento e a contagem do `PeopleCounter` a partir de um arquivo de recortes.
+
+    Para testar outros parâmetros de pré-processamento, passe um contador configurado (ou uma
+    subclasse que sobrescreve `_preprocess`); a margem gravada deve cobrir o alcance do novo filtro.
+
+    Args:
+        path (str): O caminho do arquivo de recortes.
+        counter (Optional[PeopleCounter]): O contador a usar. Padrão: um `PeopleCounter` com a ROI gravada.
+
+    Returns:
+        Dict[str, Any]: Um dicionário contendo "count", "frames", "white_pixels" (a série por quadro,
+            utilizável em `calibration.calibrate`), "timestamps" e "elapsed".
+    """
+    reader = RoiReader(path)
+    counter = counter or PeopleCounter(reader.roi_coords)
+    start_time = time.perf_counter()
+    series: List[int] = []
+    timestamps: List[np.ndarray] = []
+    for chunk_timestamps, crops in reader.chunks():
+        timestamps.append(chunk_timestamps)
+        for crop in crops:
+            brancos = counter.white_pixels_crop(crop, reader.origin)
+            counter.update(brancos)
+            series.append(brancos)
+    return {
+        "count": counter.contador,
+        "frames": len(series),
+        "white_pixels": np.array(series, dtype=np.int64),
+        "timestamps": np.concatenate(timestamps) if timestamps else np.zeros(0),
+        "elapsed": time.perf_counter() - start_time,
+    }
+
+if __name__ == '__main__':
+    import os
+    import sys
+    import tempfile
+
+    cfg = config.PEOPLE_COUNTING
+    pasta = tempfile.mkdtemp()
+    caminho = sys.argv[1] if len(sys.argv) > 1 else cfg["video_path"]
+    if not os.path.exists(caminho):
+        # Gera um vídeo sintético com blocos texturizados cruzando a ROI
+        caminho = os.path.join(pasta, "sintetico.avi")
+        writer = cv2.VideoWriter(caminho, cv2.VideoWriter_fourcc(*"MJPG"), 30, (1100, 720))
+        rng = np.random.default_rng(0)
+        x, y, w, h = cfg["roi_coords"]
+        for i in range(1200):
+            frame = np.full((720, 1100, 3), 200, np.uint8)
+            if (i // 20) % 2 == 0:
+                top = y - 80 + (i % 20) * 8
+                frame[max(top, 0):top + 180, x - 10:x + w + 10] = rng.integers(0, 255, (180 + min(top, 0), w + 20, 3), dtype=np.uint8)
+            writer.write(frame)
+        writer.release()
+
+    # Contagem de referência: cada quadro decodificado e pré-processado por inteiro
+    inicio = time.perf_counter()
+    referencia = PeopleCounter()
+    video = utils.load_video(caminho)
+    while video is not None:
+        ret, frame = video.read()
+        if not ret:
+            break
+        frame = cv2.resize(frame, config.OFFLINE_COUNTING["frame_size"])
+        referencia.update(referencia.white_pixels_crop(frame, (0, 0)))
+    duracao = time.perf_counter() - inicio
+
+    saida = os.path.join(pasta, "recortes.roi")
+    gravacao = record_video(caminho, saida)
+    if gravacao is not None:
+        resultado = recount(saida)
+        print(f"decodificação completa: {referencia.contador} em {duracao:.2f}s | gravação: {gravacao['frames']} quadros, "
+              f"{gravacao['bytes'] / 1024:.0f} KiB | reanálise: {resultado['count']} em {resultado['elapsed']:.3f}s")
@@ -0,0 +1,293 @@
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+import numpy as np
+from . import config
+
+class _Job:
+    """Uma tarefa enfileirada."""
+    __slots__ = ("fn", "args", "kwargs", "fallback", "future", "priority", "tenant", "submitted", "deadline")
+
+    def __init__(self, fn: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any],
+                 fallback: Optional[Callable[..., Any]], priority: str, tenant: str, submitted: float,
+                 deadline: float) -> None:
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.fallback = fallback
+        self.future: Future = Future()
+        self.priority = priority
+        self.tenant = tenant
+        self.submitted = submitted
+        self.deadline = deadline
+
+class _TenantQueue:
+    """As tarefas pendentes de um tenant em uma classe, por prazo (EDF) e ordem de chegada."""
+
+    def __init__(self) -> None:
+        self.heap: List[Tuple[float, int, _Job]] = []
+        self.vtime: float = 0.0  # Tempo de execução recebido, dividido pelo peso do tenant
+
+class JobScheduler:
+    """
+    Executa tarefas da biblioteca com classes de prioridade, prazos e compartilhamento justo entre tenants.
+
+    - Prioridade: a próxima tarefa vem sempre da classe mais prioritária com tarefas pendentes
+      (ex.: verificações 1:1 "interactive" antes de varreduras de arquivo "bulk"). Com mais de um
+      worker, `reserved_workers` ficam livres para a classe mais prioritária, de modo que uma
+      tarefa interativa não espera o fim de uma tarefa em lote.
+    - Prazos: cada tarefa tem um prazo (padrão por classe). Uma tarefa que chega ao início da
+      execução com o prazo vencido executa a sua versão degradada (`fallback`), se houver, ou é
+      descartada com `TimeoutError`, liberando o worker para tarefas que ainda podem ser úteis.
+      Dentro de um tenant, a tarefa de prazo mais próximo sai primeiro.
+    - Justiça: dentro de uma classe, o próximo tenant é o que recebeu menos tempo de execução
+      (ponderado por `tenant_weights`); um tenant que fica ocioso não acumula crédito.
+
+    A execução não é preemptiva: a latência de uma tarefa interativa fica limitada pela duração de
+    uma tarefa em lote já em execução. Divida varreduras grandes em tarefas pequenas (ex.: uma imagem
+    por tarefa).
+    """
+
+    def __init__(self, workers: Optional[int] = None, classes: Optional[Tuple[str, ...]] = None,
+                 deadlines: Optional[Dict[str, Optional[float]]] = None, reserved_workers: Optional[int] = None,
+                 tenant_weights: Optional[Dict[str, float]] = None) -> None:
+        """
+        Inicia os workers.
+
+        Args:
+            workers (Optional[int]): O número de threads de execução. Padrão de `config.SCHEDULING`.
+            classes (Optional[Tuple[str, ...]]): As classes de prioridade, da mais para a menos prioritária.
+            deadlines (Optional[Dict[str, Optional[float]]]): O prazo padrão de cada classe, em segundos.
+            reserved_workers (Optional[int]): Os workers que só a classe mais prioritária pode ocupar.
+            tenant_weights (Optional[Dict[str, float]]): O peso de cada tenant (padrão 1.0).
+        """
+        cfg = config.SCHEDULING
+        self.workers: int = workers or cfg["workers"] or os.cpu_count() or 1
+        self.classes: Tuple[str, ...] = tuple(classes or cfg["classes"])
+        self.deadlines: Dict[str, Optional[float]] = {**cfg["deadlines"], **(deadlines or {})}
+        reserved = cfg["reserved_workers"] if reserved_workers is None else reserved_workers
+        # Com um único worker não há o que reservar: as classes inferiores ainda precisam progredir
+        self.lower_limit: int = max(self.workers - reserved, 1)
+        self.tenant_weights: Dict[str, float] = dict(cfg["tenant_weights"] if tenant_weights is None else tenant_weights)
+
+        self._queues: Dict[str, Dict[str, _TenantQueue]] = {c: {} for c in self.classes}
+        self._pending: Dict[str, int] = {c: 0 for c in self.classes}
+        self._clock: Dict[str, float] = {c: 0.0 for c in self.classes}
+        self._running_lower = 0
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self._counts: Dict[str, Dict[str, int]] = {
+            c: {"submitted": 0, "completed": 0, "degraded": 0, "dropped": 0, "failed": 0} for c in self.classes}
+        # Janelas limitadas, para que as estatísticas não cresçam indefinidamente em serviços longos
+        self._latencies: Dict[str, Deque[float]] = {c: deque(maxlen=10000) for c in self.classes}
+        self._service: Dict[str, float] = defaultdict(float)
+        self._threads = [threading.Thread(target=self._loop, name=f"scheduler-{i}", daemon=True)
+                         for i in range(self.workers)]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, fn: Callable[..., Any], *args: Any, priority: Optional[str] = None, tenant: str = "default",
+               deadline: Optional[float] = None, fallback: Optional[Callable[..., Any]] = None, **kwargs: Any) -> Future:
+        """
+        Enfileira uma tarefa.
+
+        Exemplo: `scheduler.submit(face_recognition.compare_faces, ref, img, locs, priority="interactive",
+        tenant="portaria", deadline=0.5)`.
+
+        Args:
+            fn (Callable[..., Any]): A função a executar com `*args` e `**kwargs`.
+            priority (Optional[str]): A classe de prioridade. Padrão: a menos prioritária.
+            tenant (str): O cliente/origem da tarefa, para o compartilhamento justo.
+            deadline (Optional[float]): O prazo, em segundos a partir de agora. Padrão: o prazo da classe.
+            fallback (Optional[Callable[..., Any]]): Uma versão degradada e mais barata de `fn` (mesmos
+                argumentos), executada no lugar dela se o prazo já tiver vencido.
+
+        Returns:
+            Future: Recebe o resultado; recebe `TimeoutError` se a tarefa for descartada por prazo vencido.
+        """
+        priority = priority or self.classes[-1]
+        if priority not in self._queues:
+            raise ValueError(f"Classe de prioridade desconhecida: {priority}")
+        if deadline is None:
+            deadline = self.deadlines.get(priority)
+        now = time.monotonic()
+        job = _Job(fn, args, kwargs, fallback, priority, tenant, now, float("inf") if deadline is None else now + deadline)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("O agendador de tarefas já foi encerrado.")
+            queues = self._queues[priority]
+            queue = queues.get(tenant)
+            if queue is None:
+                queue = queues[tenant] = _TenantQueue()
+            if not queue.heap:
+                # Tenant voltando da ociosidade: começa no relógio da classe, sem crédito acumulado
+                queue.vtime = max(queue.vtime, self._clock[priority])
+            heapq.heappush(queue.heap, (job.deadline, next(self._seq), job))
+            self._pending[priority] += 1
+            self._counts[priority]["submitted"] += 1
+            self._cond.notify()
+        return job.future
+
+    def _next_job(self, expired: List[_Job]) -> Optional[_Job]:
+        """Retira a próxima tarefa executável (com o lock); tarefas vencidas sem `fallback` vão para `expired`."""
+        now = time.monotonic()
+        for rank, priority in enumerate(self.classes):
+            if rank > 0 and self._running_lower >= self.lower_limit:
+                return None
+            queues = self._queues[priority]
+            while self._pending[priority]:
+                tenant, queue = min(((t, q) for t, q in queues.items() if q.heap), key=lambda tq: tq[1].vtime)
+                _, _, job = heapq.heappop(queue.heap)
+                self._pending[priority] -= 1
+                self._clock[priority] = queue.vtime
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+                if now > job.deadline and job.fallback is None:
+                    self._counts[priority]["dropped"] += 1
+                    expired.append(job)
+                    continue
+                if rank > 0:
+                    self._running_lower += 1
+                return job
+        return None
+
+    def _loop(self) -> None:
+        """Laço de cada worker."""
+        while True:
+            expired: List[_Job] = []
+            with self._cond:
+                job = self._next_job(expired)
+                while job is None and not expired:
+                    if self._closed and not any(self._pending.values()):
+                        return
+                    self._cond.wait()
+                    job = self._next_job(expired)
+            for late in expired:
+                late.future.set_exception(TimeoutError(
+                    f"Prazo vencido há {(time.monotonic() - late.deadline) * 1000:.0f} ms antes da execução."))
+            if job is not None:
+                self._run(job)
+
+    def _run(self, job: _Job) -> None:
+        """Executa uma tarefa (ou a sua versão degradada) e contabiliza o tempo para o tenant."""
+        start = time.monotonic()
+        degraded = job.fallback is not None and start > job.deadline
+        try:
+            result = (job.fallback if degraded else job.fn)(*job.args, **job.kwargs)
+            error: Optional[BaseException] = None
+        except Exception as exc:
+            error = exc
+        finished = time.monotonic()
+        with self._cond:
+            queue = self._queues[job.priority][job.tenant]
+            queue.vtime += (finished - start) / self.tenant_weights.get(job.tenant, 1.0)
+            self._service[job.tenant] += finished - start
+            counts = self._counts[job.priority]
+            counts["failed" if error is not None else "degraded" if degraded else "completed"] += 1
+            self._latencies[job.priority].append(finished - job.submitted)
+            if job.priority != self.classes[0]:
+                self._running_lower -= 1
+                self._cond.notify()
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(result)
+
+    def close(self, cancel_pending: bool = False) -> None:
+        """
+        Para de aceitar tarefas e encerra os workers.
+
+        Args:
+            cancel_pending (bool): Se True, cancela as tarefas ainda na fila; se False, executa-as antes de encerrar.
+        """
+        with self._cond:
+            self._closed = True
+            if cancel_pending:
+                for priority, queues in self._queues.items():
+                    for queue in queues.values():
+                        for _, _, job in queue.heap:
+                            job.future.cancel()
+                        queue.heap.clear()
+                    self._pending[priority] = 0
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join()
+
+    def __enter__(self) -> "JobScheduler":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna as estatísticas acumuladas.
+
+        Returns:
+            Dict[str, Any]: Um dicionário contendo, por classe, "pending", os contadores ("submitted", "completed",
+                "degraded", "dropped", "failed") e "latency_ms" (p50/p99 entre o envio e o fim, sobre as tarefas
+                mais recentes); e "service" (segundos de execução recebidos por tenant).
+        """
+        with self._cond:
+            result: Dict[str, Any] = {}
+            for priority in self.classes:
+                ms = np.array(self._latencies[priority]) * 1000.0 if self._latencies[priority] else np.zeros(1)
+                result[priority] = {"pending": self._pending[priority], **self._counts[priority],
+                                    "latency_ms": {"p50": float(np.percentile(ms, 50)), "p99": float(np.percentile(ms, 99))}}
+            result["service"] = dict(self._service)
+            return result
+
+if __name__ == '__main__':
+    from concurrent.futures import ThreadPoolExecutor
+
+    def trabalho(segundos: float) -> float:
+        """Simula uma tarefa que ocupa a CPU (ex.: detecção e encoding de uma imagem)."""
+        fim = time.perf_counter() + segundos
+        while time.perf_counter() < fim:
+            pass
+        return segundos
+
+    def cenario(enviar: Callable[..., Future]) -> Tuple[np.ndarray, List[Future]]:
+        """Duas varreduras em lote (600 e 200 tarefas de 10 ms) e 40 verificações interativas (5 ms) a cada 50 ms."""
+        lote = [enviar(trabalho, 0.010, "bulk", "arquivo-A") for _ in range(600)]
+        lote += [enviar(trabalho, 0.010, "bulk", "arquivo-B") for _ in range(200)]
+        latencias = []
+        for _ in range(40):
+            inicio = time.perf_counter()
+            try:
+                enviar(trabalho, 0.005, "interactive", "portaria").result()
+            except TimeoutError:
+                pass
+            latencias.append(time.perf_counter() - inicio)
+            time.sleep(0.05)
+        return np.array(latencias) * 1000.0, lote
+
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as fifo:
+        ms, _ = cenario(lambda fn, s, classe, tenant: fifo.submit(fn, s))
+        print(f"fila FIFO:       interativo p50 {np.percentile(ms, 50):7.1f} ms | p99 {np.percentile(ms, 99):7.1f} ms")
+        fifo.shutdown(cancel_futures=True)
+
+    agendador = JobScheduler()
+    ms, lote = cenario(lambda fn, s, classe, tenant: agendador.submit(fn, s, priority=classe, tenant=tenant))
+    print(f"com prioridades: interativo p50 {np.percentile(ms, 50):7.1f} ms | p99 {np.percentile(ms, 99):7.1f} ms")
+    servico = agendador.stats()["service"]
+    print(f"tempo de CPU por tenant durante as verificações: "
+          + ", ".join(f"{t} {s:.2f} s" for t, s in servico.items()))
+    agendador.close(cancel_pending=True)
+
+    # Prazos: a varredura aceita resultados em até 1 s; o que já venceu é descartado ou degradado
+    agendador = JobScheduler(deadlines={"bulk": 1.0})
+    for i in range(300):
+        agendador.submit(trabalho, 0.010, tenant="arquivo", fallback=(lambda s: 0.0) if i % 2 else None)
+    agendador.close()
+    st = agendador.stats()["bulk"]
+    print(f"varredura com prazo de 1 s: {st['completed']} concluídas, {st['degraded']} degradadas, "
+          f"{st['dropped']} descartadas | p99 {st['latency_ms']['p99']:.0f} ms")
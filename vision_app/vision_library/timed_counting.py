@@ -0,0 +1,166 @@
+
+import time
+from typing import Callable, Dict, Optional, Sequence, Tuple
+import numpy as np
+from . import config
+from .people_counting import PeopleCounter
+
+class TimedPeopleCounter(PeopleCounter):
+    """
+    Variante do `PeopleCounter` cuja histerese é medida em segundos, e não em quadros.
+
+    Cada amostra de pixels brancos vem com o seu instante. Uma mudança de nível (ocupado/livre) só é
+    aceita depois de se manter por `debounce` segundos; uma ocupação só é contada quando dura
+    `min_dwell` segundos; e uma nova ocupação que começa menos de `min_gap` segundos depois da
+    anterior é tratada como continuação dela. As durações são medidas entre a primeira e a última
+    amostra do mesmo nível, de modo que uma oscilação vista em um único quadro nunca é aceita e a
+    contagem não depende da taxa de quadros enquanto o intervalo entre quadros for menor que essas durações.
+    """
+
+    def __init__(self, roi_coords: Optional[Tuple[int, int, int, int]] = None, threshold: Optional[int] = None,
+                 hysteresis: Optional[int] = None, min_dwell: Optional[float] = None,
+                 min_gap: Optional[float] = None, debounce: Optional[float] = None) -> None:
+        """
+        Inicializa o contador com as configurações do projeto.
+
+        Args:
+            roi_coords (Optional[Tuple[int, int, int, int]]): Sobrescreve a ROI (x, y, w, h) da configuração.
+            threshold (Optional[int]): Sobrescreve o limiar de pixels brancos da configuração.
+            hysteresis (Optional[int]): Sobrescreve a margem de histerese, em pixels.
+            min_dwell (Optional[float]): Duração mínima, em segundos, de uma ocupação contada. Padrão de `config.TIMED_COUNTING`.
+            min_gap (Optional[float]): Intervalo livre mínimo, em segundos, entre duas ocupações distintas.
+            debounce (Optional[float]): Duração mínima, em segundos, de uma mudança de nível aceita.
+        """
+        super().__init__(roi_coords, threshold, hysteresis)
+        cfg = config.TIMED_COUNTING
+        self.min_dwell: float = cfg["min_dwell"] if min_dwell is None else min_dwell
+        self.min_gap: float = cfg["min_gap"] if min_gap is None else min_gap
+        self.debounce: float = cfg["debounce"] if debounce is None else debounce
+
+        self._raw: bool = False                 # Nível da amostra mais recente (com histerese em pixels)
+        self._run_start: Optional[float] = None  # Primeira e última amostra do nível atual
+        self._run_last: Optional[float] = None
+        self._occupied_since: float = 0.0
+        self._released_at: Optional[float] = None
+        self._counted: bool = False
+
+    def update(self, brancos: int, timestamp: Optional[float] = None) -> int:
+        """
+        Atualiza a contagem a partir do número de pixels brancos da ROI e do instante da amostra.
+
+        Args:
+            brancos (int): O número de pixels brancos da ROI no quadro atual.
+            timestamp (Optional[float]): O instante do quadro, em segundos. Padrão: `time.monotonic()`.
+
+        Returns:
+            int: A contagem atual.
+        """
+        now = time.monotonic() if timestamp is None else timestamp
+        if brancos > self.threshold:
+            raw = True
+        elif brancos < self.threshold - self.hysteresis:
+            raw = False
+        else:
+            raw = self._raw
+        if raw != self._raw or self._run_start is None:
+            self._raw = raw
+            self._run_start = now
+        self._run_last = now
+        run_start = self._run_start
+
+        occupied = not self.liberado
+        if raw != occupied and now - run_start >= self.debounce:
+            if raw:
+                # Ocupação que começa logo depois da anterior é a mesma passagem
+                if self._released_at is None or run_start - self._released_at >= self.min_gap or not self._counted:
+                    self._occupied_since = run_start
+                    self._counted = False
+            else:
+                self._released_at = run_start
+            self.liberado = not raw
+            occupied = raw
+
+        if occupied and raw and not self._counted and now - self._occupied_since >= self.min_dwell:
+            self.contador += 1
+            self._counted = True
+        return self.contador
+
+    def count(self, frame: np.ndarray, timestamp: Optional[float] = None) -> int:
+        """
+        Processa um quadro e atualiza a contagem, sem desenhar anotações.
+
+        Args:
+            frame (np.ndarray): O quadro de vídeo a ser processado.
+            timestamp (Optional[float]): O instante do quadro, em segundos. Padrão: `time.monotonic()`.
+
+        Returns:
+            int: A contagem atual.
+        """
+        return self.update(self.white_pixels(frame), timestamp)
+
+def replay(signal: Callable[[np.ndarray], np.ndarray], duration: float, fps_list: Sequence[float],
+           make_counter: Callable[[], PeopleCounter]) -> Dict[float, int]:
+    """
+    Reproduz a mesma sequência sintética em várias taxas de quadros e retorna a contagem de cada uma.
+
+    Args:
+        signal (Callable[[np.ndarray], np.ndarray]): Função vetorizada que retorna os pixels brancos da ROI
+            em cada instante (em segundos).
+        duration (float): A duração da sequência, em segundos.
+        fps_list (Sequence[float]): As taxas de quadros a testar.
+        make_counter (Callable[[], PeopleCounter]): Cria um contador novo para cada taxa. Contadores com
+            `update(brancos, timestamp)` (como `TimedPeopleCounter`) recebem o instante de cada quadro.
+
+    Returns:
+        Dict[float, int]: A contagem final para cada taxa de quadros.
+    """
+    result: Dict[float, int] = {}
+    for fps in fps_list:
+        instants = np.arange(0.0, duration, 1.0 / fps)
+        counter = make_counter()
+        timed = isinstance(counter, TimedPeopleCounter)
+        for t, brancos in zip(instants.tolist(), signal(instants).tolist()):
+            if timed:
+                counter.update(brancos, t)
+            else:
+                counter.update(brancos)
+        result[fps] = counter.contador
+    return result
+
+def synthetic_signal(passages: int = 30, seed: int = 0) -> Tuple[Callable[[np.ndarray], np.ndarray], float]:
+    """
+    Cria uma sequência de passagens com falhas rápidas: quedas breves no meio de cada passagem e
+    picos isolados de ruído entre elas.
+
+    Args:
+        passages (int): O número de passagens reais.
+        seed (int): A semente do gerador aleatório.
+
+    Returns:
+        Tuple[Callable[[np.ndarray], np.ndarray], float]: A função de sinal (veja `replay`) e a duração em segundos.
+    """
+    rng = np.random.default_rng(seed)
+    threshold = config.PEOPLE_COUNTING["threshold"]
+    starts = np.cumsum(rng.uniform(2.0, 4.0, passages))
+    lengths = rng.uniform(0.8, 1.6, passages)
+    dips = starts + lengths * rng.uniform(0.3, 0.7, passages)           # quedas de 60 ms durante a passagem
+    spikes = starts + lengths + rng.uniform(0.6, 1.2, passages)         # picos de 40 ms fora das passagens
+    duration = float(starts[-1] + lengths[-1] + 2.0)
+
+    def signal(t: np.ndarray) -> np.ndarray:
+        inside = ((t[:, None] >= starts) & (t[:, None] < starts + lengths)).any(axis=1)
+        dip = ((t[:, None] >= dips) & (t[:, None] < dips + 0.06)).any(axis=1)
+        spike = ((t[:, None] >= spikes) & (t[:, None] < spikes + 0.04)).any(axis=1)
+        high = (inside & ~dip) | spike
+        return np.where(high, threshold * 1.5, threshold * 0.2).astype(np.int64)
+
+    return signal, duration
+
+if __name__ == '__main__':
+    sinal, duracao = synthetic_signal(30)
+    taxas = (60, 30, 15, 10, 5)
+    por_quadro = replay(sinal, duracao, taxas, PeopleCounter)
+    por_tempo = replay(sinal, duracao, taxas, TimedPeopleCounter)
+    print("passagens reais: 30")
+    for fps in taxas:
+        print(f"{fps:3d} fps | PeopleCounter: {por_quadro[fps]:3d} | TimedPeopleCounter: {por_tempo[fps]:3d}")
@@ -1,24 +1,228 @@
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import cv2
 import numpy as np
-import face_recognition as fr
-from typing import Optional
+from typing import Any, List, Optional, Tuple, Union
+from . import config
 
-def load_image(path: str) -> Optional[np.ndarray]:
+# Qualquer objeto com o protocolo de buffer: bytes, bytearray, memoryview, mmap.mmap, ...
+ImageSource = Union[str, bytes, bytearray, memoryview, Any]
+
+# Fatores de redução que o decodificador JPEG aplica na própria IDCT
+_REDUCED_FLAGS = {1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4,
+                  8: cv2.IMREAD_REDUCED_COLOR_8}
+# Marcadores SOF (início de quadro) do JPEG, que trazem as dimensões da imagem
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# Padrão de argumentos em que None tem significado próprio (ex.: `frame_size=None` não redimensiona):
+# indica que o valor deve vir de `config`
+FROM_CONFIG: Any = object()
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_image_cache: Optional[Any] = None  # `image_cache.ImageCache` ativado por `enable_image_cache`
+
+def load_image(path: str, scale: Optional[float] = None,
+               target_size: Optional[Tuple[int, int]] = None) -> Optional[np.ndarray]:
     """Carrega uma imagem de um arquivo e a converte para o formato RGB.
 
     Args:
         path (str): O caminho para o arquivo de imagem.
+        scale (Optional[float]): Decodifica em resolução reduzida (veja `load_image_scaled`).
+        target_size (Optional[Tuple[int, int]]): Decodifica na menor resolução que ainda cobre (largura, altura).
 
     Returns:
         Optional[np.ndarray]: Uma matriz numpy representando a imagem em RGB, ou None se o arquivo não for encontrado.
+            Com o cache ativado (`enable_image_cache`), o array retornado é somente leitura.
     """
+    if _image_cache is not None:
+        return _image_cache.load(path, scale, target_size)[0]
+    return _read_image(path, scale, target_size)[0]
+
+def _read_image(path: str, scale: Optional[float] = None,
+                target_size: Optional[Tuple[int, int]] = None) -> Tuple[Optional[np.ndarray], float]:
+    """Lê e decodifica uma imagem, sem passar pelo cache; retorna a imagem e a escala decodificada."""
+    if scale is not None or target_size is not None:
+        return _decode_scaled(path, scale, target_size)
+    # Importado aqui para que usar apenas vídeo (ex.: `PeopleCounter`) não carregue o dlib
+    import face_recognition as fr
     try:
         img = fr.load_image_file(path)
-        return img
+        return img, 1.0
+    except FileNotFoundError:
+        print(f"Erro: Arquivo de imagem não encontrado em {path}")
+        return None, 1.0
+
+def _jpeg_size(buffer: np.ndarray) -> Optional[Tuple[int, int]]:
+    """Lê (largura, altura) do cabeçalho de um JPEG sem decodificá-lo; None se não for um JPEG válido."""
+    data = buffer.tobytes() if buffer.size < 65536 else buffer[:65536].tobytes()
+    if data[:2] != b"\xff\xd8":
+        return None
+    pos = 2
+    while pos + 9 <= len(data):
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker in _JPEG_SOF:
+            return int.from_bytes(data[pos + 7:pos + 9], "big"), int.from_bytes(data[pos + 5:pos + 7], "big")
+        pos += 2 + int.from_bytes(data[pos + 2:pos + 4], "big")
+    return None
+
+def _reduction_factor(scale: Optional[float], target_size: Optional[Tuple[int, int]],
+                      size: Optional[Tuple[int, int]]) -> int:
+    """Escolhe o maior fator (1, 2, 4 ou 8) que não reduz a imagem abaixo da escala ou do tamanho pedidos."""
+    factor = 1
+    for f in (2, 4, 8):
+        if scale is not None and 1.0 / f < scale:
+            break
+        if target_size is not None:
+            if size is None or -(-size[0] // f) < target_size[0] or -(-size[1] // f) < target_size[1]:
+                break
+        factor = f
+    return factor
+
+def load_image_scaled(path: str, scale: Optional[float] = None,
+                      target_size: Optional[Tuple[int, int]] = None) -> Tuple[Optional[np.ndarray], float]:
+    """Carrega uma imagem em resolução reduzida, usando a escala da IDCT do decodificador JPEG.
+
+    O fator de redução (1, 2, 4 ou 8) é o maior que mantém a imagem com pelo menos `scale` vezes o
+    tamanho original, ou com pelo menos `target_size`. Em JPEGs a redução acontece durante a
+    decodificação (`cv2.IMREAD_REDUCED_COLOR_*`), o que reduz tempo e memória em até o quadrado do
+    fator; em outros formatos a imagem é decodificada inteira e reduzida em seguida.
+
+    Args:
+        path (str): O caminho para o arquivo de imagem.
+        scale (Optional[float]): A escala mínima desejada em relação ao original (ex.: 0.25).
+        target_size (Optional[Tuple[int, int]]): O tamanho mínimo desejado (largura, altura).
+
+    Returns:
+        Tuple[Optional[np.ndarray], float]: A imagem em RGB (ou None se o arquivo não for encontrado) e a
+            escala decodificada/original, para converter coordenadas com `scale_locations`.
+    """
+    if _image_cache is not None:
+        return _image_cache.load(path, scale, target_size)
+    return _read_image(path, scale, target_size)
+
+def _decode_scaled(path: str, scale: Optional[float],
+                   target_size: Optional[Tuple[int, int]]) -> Tuple[Optional[np.ndarray], float]:
+    """Decodifica uma imagem com o OpenCV no fator de redução escolhido (veja `load_image_scaled`)."""
+    try:
+        buffer = np.fromfile(path, dtype=np.uint8)
+    except FileNotFoundError:
+        print(f"Erro: Arquivo de imagem não encontrado em {path}")
+        return None, 1.0
+    size = _jpeg_size(buffer)
+    if size is not None or target_size is None:
+        factor = _reduction_factor(scale, target_size, size)
+        img = cv2.imdecode(buffer, _REDUCED_FLAGS[factor] | cv2.IMREAD_IGNORE_ORIENTATION)
+    else:
+        # Sem cabeçalho JPEG o tamanho só é conhecido depois de decodificar
+        img = cv2.imdecode(buffer, cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION)
+        factor = 1 if img is None else _reduction_factor(scale, target_size, (img.shape[1], img.shape[0]))
+        if img is not None and factor > 1:
+            # Arredonda para cima, como a IDCT reduzida do JPEG e a verificação de `_reduction_factor`
+            size = (-(-img.shape[1] // factor), -(-img.shape[0] // factor))
+            img = cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+    if img is None:
+        print(f"Erro: Não foi possível decodificar a imagem em {path}")
+        return None, 1.0
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=img), 1.0 / factor
+
+def scale_locations(locations: List[tuple], scale: float) -> List[tuple]:
+    """Converte coordenadas (top, right, bottom, left) de uma imagem reduzida para a imagem original.
+
+    Args:
+        locations (List[tuple]): As coordenadas na imagem reduzida (ex.: de `face_detection.locate_faces`).
+        scale (float): A escala retornada por `load_image_scaled`.
+
+    Returns:
+        List[tuple]: As coordenadas na resolução original.
+    """
+    return [tuple(int(round(v / scale)) for v in location) for location in locations]
+
+def load_image_bytes(data: Any) -> Optional[np.ndarray]:
+    """Decodifica uma imagem em memória (JPEG, PNG, ...) e a converte para o formato RGB.
+
+    O buffer é lido sem cópia (`np.frombuffer`) e a conversão BGR -> RGB é feita no próprio array
+    decodificado. Como em `load_image`, a orientação EXIF é ignorada e imagens em tons de cinza ou
+    com transparência retornam 3 canais.
+
+    Args:
+        data (Any): O conteúdo do arquivo de imagem (bytes, bytearray, memoryview, mmap.mmap ou
+            qualquer objeto com o protocolo de buffer).
+
+    Returns:
+        Optional[np.ndarray]: Uma matriz numpy representando a imagem em RGB, ou None se os dados não
+            puderem ser decodificados.
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    img = cv2.imdecode(buffer, cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION) if buffer.size else None
+    if img is None:
+        print("Erro: Não foi possível decodificar a imagem em memória.")
+        return None
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=img)
+
+def _image_executor() -> ThreadPoolExecutor:
+    """Retorna o pool (limitado) de threads de decodificação, criando-o no primeiro uso."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=config.IMAGE_LOADING["workers"], thread_name_prefix="image-decode")
+        return _executor
+
+def _load_image_file(path: str) -> Optional[np.ndarray]:
+    """Lê um arquivo de imagem e o decodifica com o OpenCV (`load_image_bytes`), sem importar o dlib."""
+    try:
+        data = np.fromfile(path, dtype=np.uint8)
     except FileNotFoundError:
         print(f"Erro: Arquivo de imagem não encontrado em {path}")
         return None
+    return load_image_bytes(data)
+
+async def aload_image(source: ImageSource) -> Optional[np.ndarray]:
+    """Versão assíncrona de `load_image`/`load_image_bytes`, executada em um pool limitado de threads.
+
+    Caminhos e conteúdos em memória são decodificados pelo OpenCV (`load_image_bytes`), que libera o
+    GIL: várias imagens são decodificadas em paralelo sem bloquear o laço de eventos, e as threads do
+    pool não importam o face_recognition/dlib. O cache de `enable_image_cache` não é usado.
+
+    Args:
+        source (ImageSource): O caminho para o arquivo de imagem, ou o seu conteúdo em memória.
+
+    Returns:
+        Optional[np.ndarray]: Uma matriz numpy representando a imagem em RGB, ou None em caso de erro.
+    """
+    import asyncio
+    loader = _load_image_file if isinstance(source, str) else load_image_bytes
+    return await asyncio.get_running_loop().run_in_executor(_image_executor(), loader, source)
+
+def enable_image_cache(max_bytes: Optional[int] = None) -> Any:
+    """Ativa um cache LRU de imagens decodificadas para `load_image` e `load_image_scaled`.
+
+    As entradas são identificadas pelo caminho, data de modificação e tamanho do arquivo (e pelos
+    parâmetros de redução), de modo que um arquivo alterado é lido novamente.
+
+    Args:
+        max_bytes (Optional[int]): O orçamento de memória do cache. Padrão de `config.IMAGE_LOADING`.
+
+    Returns:
+        Any: O `image_cache.ImageCache` ativo (use `stats()` para as taxas de acerto).
+    """
+    global _image_cache
+    from .image_cache import ImageCache
+    _image_cache = ImageCache(max_bytes)
+    return _image_cache
+
+def disable_image_cache() -> None:
+    """Desativa e esvazia o cache de imagens decodificadas."""
+    global _image_cache
+    if _image_cache is not None:
+        _image_cache.clear()
+    _image_cache = None
 
 def load_video(path: str) -> Optional[cv2.VideoCapture]:
     """Carrega um vídeo de um arquivo.
@@ -34,3 +238,17 @@ def load_video(path: str) -> Optional[cv2.VideoCapture]:
         print(f"Erro ao abrir o vídeo: {path}")
         return None
     return video
+
+def padded_roi(roi_coords: Tuple[int, int, int, int], pad: int, frame_shape: Tuple[int, ...]) -> Tuple[int, int, int, int]:
+    """Calcula os limites de uma ROI ampliada por uma margem, recortados às bordas do quadro.
+
+    Args:
+        roi_coords (Tuple[int, int, int, int]): A ROI no formato (x, y, w, h).
+        pad (int): A margem, em pixels, adicionada em cada lado.
+        frame_shape (Tuple[int, ...]): O `shape` do quadro (altura, largura, ...).
+
+    Returns:
+        Tuple[int, int, int, int]: Os limites (x0, y0, x1, y1) da região ampliada, em coordenadas do quadro.
+    """
+    x, y, w, h = roi_coords
+    return max(x - pad, 0), max(y - pad, 0), min(x + w + pad, frame_shape[1]), min(y + h + pad, frame_shape[0])